@@ -11,6 +11,9 @@ from app.models.usuario import Usuario
 from app.models.proyecto import Proyecto
 from app.models.historia_usuario import HistoriaUsuario
 from app.models.ticket import Ticket
+from app.models.estadistica_ticket import EstadisticaTicket
+from app.models.version_coleccion import VersionColeccion
+from app.models.importacion import Importacion, ErrorImportacion
 
 
 # this is the Alembic Config object, which provides
@@ -28,6 +31,20 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Excluye de autogenerate los índices de búsqueda creados a mano (app/db/busqueda.py):
+    las tablas FTS5 de SQLite (y sus tablas internas) y la columna tsvector de PostgreSQL."""
+    if type_ == "table" and reflected and compare_to is None and "_fts" in name:
+        return False
+    if type_ == "column" and reflected and compare_to is None and name == "busqueda":
+        return False
+    if type_ == "index" and reflected and compare_to is None and name.endswith("_busqueda"):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,6 +67,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -73,7 +91,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,35 @@
+"""add versiones_colecciones for ETags
+
+Revision ID: 22f433eb7b75
+Revises: 47d23ba7a95e
+Create Date: 2026-10-18 12:20:44.873019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '22f433eb7b75'
+down_revision: Union[str, Sequence[str], None] = '47d23ba7a95e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'versiones_colecciones',
+        sa.Column('empresa_id', sa.Integer(), nullable=False),
+        sa.Column('coleccion', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('empresa_id', 'coleccion'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('versiones_colecciones')
@@ -0,0 +1,46 @@
+"""add estadisticas_tickets summary table
+
+Revision ID: 47d23ba7a95e
+Revises: a4fabd8a24aa
+Create Date: 2026-10-18 11:02:17.504113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '47d23ba7a95e'
+down_revision: Union[str, Sequence[str], None] = 'a4fabd8a24aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'estadisticas_tickets',
+        sa.Column('historia_usuario_id', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(length=50), nullable=False),
+        sa.Column('prioridad', sa.String(length=50), nullable=False),
+        sa.Column('empresa_id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['historia_usuario_id'], ['historias_usuario.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('historia_usuario_id', 'estado', 'prioridad'),
+    )
+    op.create_index('ix_estadisticas_tickets_empresa_id', 'estadisticas_tickets', ['empresa_id'], unique=False)
+
+    op.execute(
+        "INSERT INTO estadisticas_tickets (historia_usuario_id, empresa_id, estado, prioridad, total) "
+        "SELECT historia_usuario_id, empresa_id, COALESCE(estado, ''), COALESCE(prioridad, ''), COUNT(*) "
+        "FROM tickets GROUP BY historia_usuario_id, empresa_id, COALESCE(estado, ''), COALESCE(prioridad, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_estadisticas_tickets_empresa_id', table_name='estadisticas_tickets')
+    op.drop_table('estadisticas_tickets')
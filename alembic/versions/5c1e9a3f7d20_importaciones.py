@@ -0,0 +1,74 @@
+"""add clave_externa and importaciones tables
+
+Revision ID: 5c1e9a3f7d20
+Revises: 833d4ad486e3
+Create Date: 2026-10-18 18:40:12.481337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a3f7d20'
+down_revision: Union[str, Sequence[str], None] = '833d4ad486e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS = ('proyectos', 'historias_usuario', 'tickets')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabla in TABLAS:
+        op.add_column(tabla, sa.Column('clave_externa', sa.String(length=255), nullable=True))
+        # Varios NULL no chocan en un índice único: solo se restringen las filas importadas
+        op.create_index(f'ix_{tabla}_empresa_id_clave_externa', tabla, ['empresa_id', 'clave_externa'], unique=True)
+
+    op.create_table(
+        'importaciones',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('empresa_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('formato', sa.String(length=10), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('filas_procesadas', sa.Integer(), nullable=False),
+        sa.Column('filas_creadas', sa.Integer(), nullable=False),
+        sa.Column('filas_existentes', sa.Integer(), nullable=False),
+        sa.Column('filas_error', sa.Integer(), nullable=False),
+        sa.Column('fecha_creacion', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_importaciones_id'), 'importaciones', ['id'], unique=False)
+    op.create_index('ix_importaciones_empresa_id_id', 'importaciones', ['empresa_id', 'id'], unique=False)
+
+    op.create_table(
+        'errores_importacion',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('importacion_id', sa.Integer(), nullable=False),
+        sa.Column('linea', sa.Integer(), nullable=False),
+        sa.Column('detalle', sa.Text(), nullable=False),
+        sa.Column('datos', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['importacion_id'], ['importaciones.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_errores_importacion_id'), 'errores_importacion', ['id'], unique=False)
+    op.create_index('ix_errores_importacion_importacion_id_linea', 'errores_importacion', ['importacion_id', 'linea'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_errores_importacion_importacion_id_linea', table_name='errores_importacion')
+    op.drop_index(op.f('ix_errores_importacion_id'), table_name='errores_importacion')
+    op.drop_table('errores_importacion')
+    op.drop_index('ix_importaciones_empresa_id_id', table_name='importaciones')
+    op.drop_index(op.f('ix_importaciones_id'), table_name='importaciones')
+    op.drop_table('importaciones')
+    for tabla in reversed(TABLAS):
+        op.drop_index(f'ix_{tabla}_empresa_id_clave_externa', table_name=tabla)
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_column('clave_externa')
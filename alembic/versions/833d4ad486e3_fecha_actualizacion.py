@@ -0,0 +1,47 @@
+"""add fecha_actualizacion to proyectos, historias_usuario and tickets
+
+Revision ID: 833d4ad486e3
+Revises: 22f433eb7b75
+Create Date: 2026-10-18 14:05:31.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '833d4ad486e3'
+down_revision: Union[str, Sequence[str], None] = '22f433eb7b75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabla -> columna con la fecha de creación usada como valor inicial
+TABLAS = {
+    'proyectos': 'fecha_registro',
+    'historias_usuario': 'fecha_creacion',
+    'tickets': 'fecha_creacion',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabla, creacion in TABLAS.items():
+        # SQLite no admite ADD COLUMN con un default no constante: se agrega
+        # vacía, se rellena y el default se fija al recrear la tabla
+        op.add_column(tabla, sa.Column('fecha_actualizacion', sa.DateTime(timezone=True), nullable=True))
+        op.execute(f"UPDATE {tabla} SET fecha_actualizacion = {creacion}")
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.alter_column(
+                'fecha_actualizacion', existing_type=sa.DateTime(timezone=True), server_default=sa.func.now()
+            )
+        op.create_index(f'ix_{tabla}_empresa_id_fecha_actualizacion', tabla, ['empresa_id', 'fecha_actualizacion'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in reversed(list(TABLAS)):
+        op.drop_index(f'ix_{tabla}_empresa_id_fecha_actualizacion', table_name=tabla)
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_column('fecha_actualizacion')
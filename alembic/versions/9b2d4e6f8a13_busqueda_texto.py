@@ -0,0 +1,81 @@
+"""add full-text search indexes to tickets and historias_usuario
+
+Revision ID: 9b2d4e6f8a13
+Revises: 5c1e9a3f7d20
+Create Date: 2026-10-18 19:32:47.905118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2d4e6f8a13'
+down_revision: Union[str, Sequence[str], None] = '5c1e9a3f7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabla -> columnas indexadas; la primera pesa más en el ranking de PostgreSQL
+TABLAS = {
+    'tickets': ('asunto', 'descripcion'),
+    'historias_usuario': ('titulo', 'descripcion'),
+}
+
+
+def _upgrade_postgresql(tabla, columnas):
+    vector = " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({c}, '')), '{peso}')" for c, peso in zip(columnas, "ABCD")
+    )
+    # La columna generada se calcula para todas las filas existentes al agregarla
+    op.execute(f"ALTER TABLE {tabla} ADD COLUMN busqueda tsvector GENERATED ALWAYS AS ({vector}) STORED")
+    op.execute(f"CREATE INDEX ix_{tabla}_busqueda ON {tabla} USING gin (busqueda)")
+
+
+def _upgrade_sqlite(tabla, columnas):
+    fts = f"{tabla}_fts"
+    lista = ", ".join(columnas)
+    nuevos = ", ".join(f"new.{c}" for c in columnas)
+    viejos = ", ".join(f"old.{c}" for c in columnas)
+    op.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({lista}, content='{tabla}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    )
+    # Indexa las filas que ya existían
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialecto = op.get_bind().dialect.name
+    for tabla, columnas in TABLAS.items():
+        if dialecto == 'postgresql':
+            _upgrade_postgresql(tabla, columnas)
+        elif dialecto == 'sqlite':
+            _upgrade_sqlite(tabla, columnas)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialecto = op.get_bind().dialect.name
+    for tabla in reversed(list(TABLAS)):
+        if dialecto == 'postgresql':
+            op.execute(f"DROP INDEX ix_{tabla}_busqueda")
+            op.execute(f"ALTER TABLE {tabla} DROP COLUMN busqueda")
+        elif dialecto == 'sqlite':
+            for sufijo in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER {tabla}_fts_{sufijo}")
+            op.execute(f"DROP TABLE {tabla}_fts")
@@ -0,0 +1,83 @@
+"""denormalize empresa_id and add composite indexes
+
+Revision ID: a4fabd8a24aa
+Revises: 4417e42caecb
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4fabd8a24aa'
+down_revision: Union[str, Sequence[str], None] = '4417e42caecb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Filas por UPDATE durante el backfill: evita un único UPDATE gigante
+BATCH_SIZE = 5000
+
+
+def _backfill(tabla: str, origen: str) -> None:
+    conn = op.get_bind()
+    max_id = conn.scalar(sa.text(f"SELECT MAX(id) FROM {tabla}")) or 0
+    for desde in range(0, max_id, BATCH_SIZE):
+        conn.execute(
+            sa.text(
+                f"UPDATE {tabla} SET empresa_id = ({origen}) "
+                f"WHERE id > :desde AND id <= :hasta AND empresa_id IS NULL"
+            ),
+            {"desde": desde, "hasta": desde + BATCH_SIZE},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('historias_usuario', sa.Column('empresa_id', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('empresa_id', sa.Integer(), nullable=True))
+
+    _backfill(
+        'historias_usuario',
+        "SELECT p.empresa_id FROM proyectos p WHERE p.id = historias_usuario.proyecto_id",
+    )
+    _backfill(
+        'tickets',
+        "SELECT h.empresa_id FROM historias_usuario h WHERE h.id = tickets.historia_usuario_id",
+    )
+
+    # batch_alter_table recrea la tabla en SQLite, que no soporta ALTER COLUMN
+    with op.batch_alter_table('historias_usuario') as batch_op:
+        batch_op.alter_column('empresa_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_historias_usuario_empresa_id', 'empresas', ['empresa_id'], ['id'], ondelete='CASCADE'
+        )
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.alter_column('empresa_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_tickets_empresa_id', 'empresas', ['empresa_id'], ['id'], ondelete='CASCADE'
+        )
+
+    op.create_index('ix_proyectos_empresa_id_id', 'proyectos', ['empresa_id', 'id'], unique=False)
+    op.create_index('ix_historias_usuario_proyecto_id_id', 'historias_usuario', ['proyecto_id', 'id'], unique=False)
+    op.create_index('ix_historias_usuario_empresa_id_estado', 'historias_usuario', ['empresa_id', 'estado'], unique=False)
+    op.create_index('ix_tickets_historia_usuario_id_id', 'tickets', ['historia_usuario_id', 'id'], unique=False)
+    op.create_index('ix_tickets_empresa_id_estado', 'tickets', ['empresa_id', 'estado'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_empresa_id_estado', table_name='tickets')
+    op.drop_index('ix_tickets_historia_usuario_id_id', table_name='tickets')
+    op.drop_index('ix_historias_usuario_empresa_id_estado', table_name='historias_usuario')
+    op.drop_index('ix_historias_usuario_proyecto_id_id', table_name='historias_usuario')
+    op.drop_index('ix_proyectos_empresa_id_id', table_name='proyectos')
+
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_constraint('fk_tickets_empresa_id', type_='foreignkey')
+        batch_op.drop_column('empresa_id')
+    with op.batch_alter_table('historias_usuario') as batch_op:
+        batch_op.drop_constraint('fk_historias_usuario_empresa_id', type_='foreignkey')
+        batch_op.drop_column('empresa_id')
@@ -0,0 +1,62 @@
+"""ignore diacritics in PostgreSQL full-text search
+
+Revision ID: b6d1e4a7c093
+Revises: f3a8c2d6b417
+Create Date: 2026-10-19 10:12:41.530917
+
+El tokenizer de SQLite (unicode61 remove_diacritics 2) ya ignora las tildes;
+en PostgreSQL la columna `busqueda` usaba la configuración 'simple', que no, y
+"accion" no encontraba "acción". Se crea `simple_sin_tildes` (copia de
+'simple' con el diccionario `unaccent`) y se regenera la columna con ella.
+
+Una columna generada no se puede redefinir: se quita y se vuelve a agregar,
+lo que reescribe la tabla con un lock exclusivo. En tablas grandes conviene
+correrla en una ventana de mantenimiento.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1e4a7c093'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c2d6b417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONFIG = 'simple_sin_tildes'
+
+# tabla -> columnas indexadas; la primera pesa más en el ranking
+TABLAS = {
+    'tickets': ('asunto', 'descripcion'),
+    'historias_usuario': ('titulo', 'descripcion'),
+}
+
+
+def _regenerar(config):
+    for tabla, columnas in TABLAS.items():
+        vector = " || ".join(
+            f"setweight(to_tsvector('{config}', coalesce({c}, '')), '{peso}')" for c, peso in zip(columnas, "ABCD")
+        )
+        # Quitar la columna elimina también su índice
+        op.execute(f"ALTER TABLE {tabla} DROP COLUMN busqueda")
+        op.execute(f"ALTER TABLE {tabla} ADD COLUMN busqueda tsvector GENERATED ALWAYS AS ({vector}) STORED")
+        op.execute(f"CREATE INDEX ix_{tabla}_busqueda ON {tabla} USING gin (busqueda)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(f"CREATE TEXT SEARCH CONFIGURATION {CONFIG} (COPY = simple)")
+    op.execute(f"ALTER TEXT SEARCH CONFIGURATION {CONFIG} ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple")
+    _regenerar(CONFIG)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _regenerar('simple')
+    op.execute(f"DROP TEXT SEARCH CONFIGURATION {CONFIG}")
@@ -0,0 +1,41 @@
+"""add composite indexes for filtered ticket and historia listings
+
+Revision ID: e7a1c3b5d902
+Revises: 9b2d4e6f8a13
+Create Date: 2026-10-18 20:14:05.337812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c3b5d902'
+down_revision: Union[str, Sequence[str], None] = '9b2d4e6f8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = [
+    ('ix_tickets_historia_usuario_id_estado_id', 'tickets', ['historia_usuario_id', 'estado', 'id']),
+    ('ix_tickets_empresa_id_id', 'tickets', ['empresa_id', 'id']),
+    ('ix_tickets_empresa_id_estado_prioridad_id', 'tickets', ['empresa_id', 'estado', 'prioridad', 'id']),
+    ('ix_tickets_empresa_id_fecha_creacion_id', 'tickets', ['empresa_id', 'fecha_creacion', 'id']),
+    ('ix_historias_usuario_proyecto_id_estado_id', 'historias_usuario', ['proyecto_id', 'estado', 'id']),
+    ('ix_historias_usuario_proyecto_id_fecha_creacion_id', 'historias_usuario', ['proyecto_id', 'fecha_creacion', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False)
+    # (empresa_id, estado, prioridad, id) cubre todo lo que resolvía (empresa_id, estado)
+    op.drop_index('ix_tickets_empresa_id_estado', table_name='tickets')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_tickets_empresa_id_estado', 'tickets', ['empresa_id', 'estado'], unique=False)
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
@@ -0,0 +1,237 @@
+"""store estado and prioridad as SMALLINT codes
+
+Revision ID: f3a8c2d6b417
+Revises: e7a1c3b5d902
+Create Date: 2026-10-18 21:03:26.418230
+
+Migración en línea (PostgreSQL):
+
+1. Se agregan `estado_cod` / `prioridad_cod` vacías (sin reescribir la tabla)
+   y un trigger que las completa en cada INSERT / UPDATE de la versión anterior.
+2. Se completan las filas existentes por rangos de id, con un commit por rango,
+   normalizando los valores escritos a mano ("Abierto", "cerrada", ...).
+3. Se crean los índices nuevos con CREATE INDEX CONCURRENTLY.
+4. En una transacción corta se quita el trigger, se reemplazan las columnas
+   de texto por las de código y se reconstruye `estadisticas_tickets`.
+
+Antes de cambiar nada se buscan valores que no correspondan a ningún código:
+si los hay la migración se detiene y los lista, en vez de asignarles uno.
+
+Desde el paso 4 la versión anterior de la aplicación ya no puede escribir
+estado / prioridad: la migración y el despliegue van juntos.
+
+En SQLite las columnas se reemplazan con ALTER TABLE DROP / RENAME COLUMN:
+`batch_alter_table` recrearía las tablas y perdería los triggers de búsqueda.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c2d6b417'
+down_revision: Union[str, Sequence[str], None] = 'e7a1c3b5d902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOTE = 10000
+
+# código -> variantes aceptadas (normalizadas); el primer valor es el nombre del
+# miembro en app/schemas. Vacío o NULL va al código por defecto; cualquier otro
+# valor que no coincida detiene la migración (ver _verificar).
+_TERMINADO = (
+    'completado', 'completada', 'completo', 'completa', 'terminado', 'terminada',
+    'finalizado', 'finalizada', 'hecho', 'hecha', 'done',
+)
+_CERRADO = ('cerrado', 'cerrada', 'closed', 'resuelto', 'resuelta')
+ESTADOS_TICKET = {
+    1: ('abierto', 'abierta', 'open', 'nuevo', 'nueva'),
+    2: ('en_progreso', 'en_proceso', 'progreso', 'in_progress'),
+    3: _CERRADO + _TERMINADO,
+}
+ESTADOS_HISTORIA = {
+    1: ('pendiente', 'todo', 'nueva', 'nuevo'),
+    2: ('en_progreso', 'en_proceso', 'progreso', 'in_progress'),
+    3: _TERMINADO + _CERRADO,
+}
+PRIORIDADES = {
+    1: ('baja', 'bajo', 'low'),
+    2: ('media', 'medio', 'normal', 'medium'),
+    3: ('alta', 'alto', 'high', 'urgente'),
+}
+
+# tabla -> {columna: (variantes, código por defecto)}
+COLUMNAS = {
+    'tickets': {'estado': (ESTADOS_TICKET, 1), 'prioridad': (PRIORIDADES, 2)},
+    'historias_usuario': {'estado': (ESTADOS_HISTORIA, 1), 'prioridad': (PRIORIDADES, 2)},
+}
+
+INDICES = [
+    ('ix_tickets_historia_usuario_id_estado_id', 'tickets', ['historia_usuario_id', 'estado', 'id']),
+    ('ix_tickets_empresa_id_estado_prioridad_id', 'tickets', ['empresa_id', 'estado', 'prioridad', 'id']),
+    ('ix_historias_usuario_proyecto_id_estado_id', 'historias_usuario', ['proyecto_id', 'estado', 'id']),
+    ('ix_historias_usuario_empresa_id_estado', 'historias_usuario', ['empresa_id', 'estado']),
+]
+
+
+def _codigo(expresion, variantes, defecto):
+    """CASE que traduce el texto de `expresion` a su código.
+
+    Vacío o NULL da `defecto`; un valor desconocido da NULL, que la columna de
+    código rechaza (NOT NULL en SQLite, CHECK en PostgreSQL).
+    """
+    normalizado = f"replace(replace(lower(trim({expresion})), ' ', '_'), '-', '_')"
+    casos = " ".join(
+        f"WHEN {normalizado} IN ({', '.join(repr(v) for v in valores)}) THEN {codigo}"
+        for codigo, valores in variantes.items()
+    )
+    return f"CASE WHEN {expresion} IS NULL OR trim({expresion}) = '' THEN {defecto} {casos} END"
+
+
+def _texto(columna, variantes):
+    """CASE inverso: código -> nombre del miembro."""
+    casos = " ".join(f"WHEN {codigo} THEN '{valores[0]}'" for codigo, valores in variantes.items())
+    return f"CASE {columna} {casos} END"
+
+
+def _estadisticas(tipo):
+    op.create_table(
+        'estadisticas_tickets',
+        sa.Column('historia_usuario_id', sa.Integer(), nullable=False),
+        sa.Column('estado', tipo, nullable=False),
+        sa.Column('prioridad', tipo, nullable=False),
+        sa.Column('empresa_id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['historia_usuario_id'], ['historias_usuario.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('historia_usuario_id', 'estado', 'prioridad'),
+    )
+    op.create_index('ix_estadisticas_tickets_empresa_id', 'estadisticas_tickets', ['empresa_id'], unique=False)
+    op.execute(
+        "INSERT INTO estadisticas_tickets (historia_usuario_id, empresa_id, estado, prioridad, total) "
+        "SELECT historia_usuario_id, empresa_id, estado, prioridad, COUNT(*) "
+        "FROM tickets GROUP BY historia_usuario_id, empresa_id, estado, prioridad"
+    )
+
+
+def _verificar():
+    """Detiene la migración si algún estado o prioridad no corresponde a ningún código."""
+    conexion = op.get_bind()
+    desconocidos = []
+    for tabla, columnas in COLUMNAS.items():
+        for c, (variantes, defecto) in columnas.items():
+            filas = conexion.execute(sa.text(
+                f"SELECT {c}, COUNT(*), MIN(id) FROM {tabla} "
+                f"WHERE ({_codigo(c, variantes, defecto)}) IS NULL GROUP BY {c} ORDER BY {c}"
+            ))
+            desconocidos += [
+                f"{tabla}.{c} = {valor!r}: {total} fila(s), la primera con id {primera}"
+                for valor, total, primera in filas
+            ]
+    if desconocidos:
+        raise RuntimeError(
+            "Valores sin código: agrégalos a las variantes de esta migración o "
+            "corrígelos antes de migrar.\n  " + "\n  ".join(desconocidos)
+        )
+
+
+def _rellenar(tabla, asignaciones):
+    """UPDATE por rangos de id (en PostgreSQL corre en autocommit: un commit por rango)."""
+    conexion = op.get_bind()
+    maximo = conexion.execute(sa.text(f"SELECT MAX(id) FROM {tabla}")).scalar() or 0
+    for inicio in range(0, maximo, LOTE):
+        conexion.execute(sa.text(
+            f"UPDATE {tabla} SET {asignaciones} WHERE id > :inicio AND id <= :fin"
+        ), {"inicio": inicio, "fin": inicio + LOTE})
+
+
+def _upgrade_postgresql():
+    for tabla, columnas in COLUMNAS.items():
+        op.execute(f"ALTER TABLE {tabla} ADD COLUMN estado_cod smallint, ADD COLUMN prioridad_cod smallint")
+        asignaciones = "; ".join(
+            f"NEW.{c}_cod := {_codigo(f'NEW.{c}', variantes, defecto)}"
+            for c, (variantes, defecto) in columnas.items()
+        )
+        op.execute(
+            f"CREATE FUNCTION {tabla}_codigos() RETURNS trigger AS $$ "
+            f"BEGIN {asignaciones}; RETURN NEW; END $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            f"CREATE TRIGGER {tabla}_codigos BEFORE INSERT OR UPDATE OF estado, prioridad ON {tabla} "
+            f"FOR EACH ROW EXECUTE FUNCTION {tabla}_codigos()"
+        )
+
+    with op.get_context().autocommit_block():
+        for tabla, columnas in COLUMNAS.items():
+            _rellenar(tabla, ", ".join(
+                f"{c}_cod = {_codigo(c, variantes, defecto)}" for c, (variantes, defecto) in columnas.items()
+            ))
+            # Con NOT VALID + VALIDATE el SET NOT NULL posterior no recorre la tabla
+            op.execute(
+                f"ALTER TABLE {tabla} ADD CONSTRAINT ck_{tabla}_codigos "
+                f"CHECK (estado_cod IS NOT NULL AND prioridad_cod IS NOT NULL) NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {tabla} VALIDATE CONSTRAINT ck_{tabla}_codigos")
+        for nombre, tabla, columnas in INDICES:
+            columnas = ", ".join(f"{c}_cod" if c in ('estado', 'prioridad') else c for c in columnas)
+            op.execute(f"CREATE INDEX CONCURRENTLY {nombre}_cod ON {tabla} ({columnas})")
+
+    for tabla in COLUMNAS:
+        op.execute(f"DROP TRIGGER {tabla}_codigos ON {tabla}")
+        op.execute(f"DROP FUNCTION {tabla}_codigos()")
+        # Quitar la columna elimina también sus índices
+        op.execute(f"ALTER TABLE {tabla} DROP COLUMN estado, DROP COLUMN prioridad")
+        for c in ('estado', 'prioridad'):
+            op.execute(f"ALTER TABLE {tabla} RENAME COLUMN {c}_cod TO {c}")
+        op.execute(f"ALTER TABLE {tabla} ALTER COLUMN estado SET NOT NULL, ALTER COLUMN prioridad SET NOT NULL")
+        op.execute(f"ALTER TABLE {tabla} DROP CONSTRAINT ck_{tabla}_codigos")
+    for nombre, _, _ in INDICES:
+        op.execute(f"ALTER INDEX {nombre}_cod RENAME TO {nombre}")
+
+
+def _upgrade_sqlite():
+    for tabla, columnas in COLUMNAS.items():
+        for c, (_, defecto) in columnas.items():
+            op.execute(f"ALTER TABLE {tabla} ADD COLUMN {c}_cod SMALLINT NOT NULL DEFAULT {defecto}")
+        _rellenar(tabla, ", ".join(
+            f"{c}_cod = {_codigo(c, variantes, defecto)}" for c, (variantes, defecto) in columnas.items()
+        ))
+    for nombre, tabla, _ in INDICES:
+        op.drop_index(nombre, table_name=tabla)
+    for tabla, columnas in COLUMNAS.items():
+        for c in columnas:
+            op.execute(f"ALTER TABLE {tabla} DROP COLUMN {c}")
+            op.execute(f"ALTER TABLE {tabla} RENAME COLUMN {c}_cod TO {c}")
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _verificar()
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+    else:
+        _upgrade_sqlite()
+
+    # Las claves pasan de texto a código; se recalculan desde los tickets
+    op.drop_table('estadisticas_tickets')
+    _estadisticas(sa.SmallInteger())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nombre, tabla, _ in INDICES:
+        op.drop_index(nombre, table_name=tabla)
+    for tabla, columnas in COLUMNAS.items():
+        for c, (variantes, _) in columnas.items():
+            op.add_column(tabla, sa.Column(f'{c}_texto', sa.String(length=50), nullable=True))
+            op.execute(f"UPDATE {tabla} SET {c}_texto = {_texto(c, variantes)}")
+            op.execute(f"ALTER TABLE {tabla} DROP COLUMN {c}")
+            op.execute(f"ALTER TABLE {tabla} RENAME COLUMN {c}_texto TO {c}")
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False)
+
+    op.drop_table('estadisticas_tickets')
+    _estadisticas(sa.String(length=50))
@@ -0,0 +1,43 @@
+"""Verifica o reconstruye la tabla estadisticas_tickets.
+
+    python -m app.cli.estadisticas verificar
+    python -m app.cli.estadisticas reconstruir
+
+`verificar` termina con código 1 si encuentra diferencias.
+"""
+import argparse
+import sys
+
+from app import models  # noqa: F401  registra modelos y listeners
+from app.db.session import SessionLocal
+from app.services.estadisticas import recalcular, verificar
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accion", choices=("verificar", "reconstruir"))
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        diferencias = verificar(db)
+        for d in diferencias:
+            print(
+                f"historia={d['historia_usuario_id']} empresa={d['empresa_id']} "
+                f"estado={d['estado']} prioridad={d['prioridad']}: "
+                f"guardado={d['guardado']} real={d['real']}"
+            )
+        print(f"{len(diferencias)} diferencia(s)")
+
+        if args.accion == "reconstruir":
+            recalcular(db)
+            db.commit()
+            print("estadisticas_tickets reconstruida")
+            return 0
+        return 1 if diferencias else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
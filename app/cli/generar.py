@@ -0,0 +1,171 @@
+"""Genera empresas sintéticas con proyectos, historias y tickets para pruebas de volumen.
+
+    python -m app.cli.generar --proyectos 10000 --historias 500000 --tickets 5000000
+    python -m app.cli.generar --empresas 3 --proyectos 100 --historias 2000 --tickets 20000 --semilla 7
+
+Los volúmenes son por empresa. Con la misma semilla y volúmenes los datos son
+idénticos (en una base vacía también los ids). Las historias se concentran en
+los primeros proyectos y los tickets en las primeras historias, como en una
+empresa real con unos pocos proyectos grandes.
+
+Las filas se insertan por lotes (executemany), un commit por lote, con ids
+asignados aquí: no debe haber otras escrituras en la base mientras corre.
+estadisticas_tickets se llena al final de cada empresa con un solo GROUP BY;
+si se interrumpe, `python -m app.cli.estadisticas reconstruir` la corrige.
+Imprime una línea JSON de progreso por tabla y al final las credenciales de
+cada empresa.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, text
+
+from app import models  # noqa: F401  registra modelos y listeners
+from app.core.security import hash_password
+from app.db.session import engine
+from app.models.consistencia import incrementar_versiones
+from app.models.empresa import Empresa
+from app.models.estadistica_ticket import EstadisticaTicket
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.proyecto import Proyecto
+from app.models.ticket import Ticket
+from app.schemas.enums import Prioridad
+from app.schemas.historia_usuario import EstadoHistoria
+from app.schemas.ticket import EstadoTicket
+
+PASSWORD = "sintetica-123"
+LOTE = 10000
+# Fechas de creación repartidas en este periodo, en orden de id
+INICIO = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PERIODO = timedelta(days=730)
+
+PALABRAS = [
+    "error", "pago", "factura", "cliente", "reporte", "login", "pantalla", "lento", "exportar", "usuario",
+    "permiso", "correo", "notificación", "carga", "búsqueda", "filtro", "tablero", "integración", "sincronizar",
+    "cartera", "abono", "vencimiento", "saldo", "contraseña", "sesión", "móvil", "impresión", "archivo",
+    "migración", "configuración", "whatsapp", "mensaje", "plantilla", "cobro", "recordatorio", "descuento",
+    "impuesto", "moneda", "cuenta", "banco", "conciliación", "límite", "rendimiento", "timeout", "duplicado",
+]
+# (valores, pesos) de cada enum
+ESTADOS_TICKET = list(EstadoTicket), (5, 2, 3)
+ESTADOS_HISTORIA = list(EstadoHistoria), (4, 3, 3)
+PRIORIDADES = list(Prioridad), (2, 6, 2)
+
+
+def _texto(rnd: random.Random, minimo: int, maximo: int) -> str:
+    return " ".join(rnd.choices(PALABRAS, k=rnd.randint(minimo, maximo)))
+
+
+def _sesgado(rnd: random.Random, ids: range) -> int:
+    # random()**2 concentra la elección en los primeros ids
+    return ids[int(rnd.random() ** 2 * len(ids))]
+
+
+def _fecha(indice: int, total: int) -> datetime:
+    return INICIO + PERIODO * (indice / max(total, 1))
+
+
+def _nuevos_ids(conexion, modelo, total: int) -> range:
+    inicio = (conexion.execute(select(func.max(modelo.id))).scalar() or 0) + 1
+    return range(inicio, inicio + total)
+
+
+def _insertar(conexion, modelo, filas_por_indice, total: int, lote: int):
+    """Inserta `total` filas generadas por `filas_por_indice(i)`; un commit por lote."""
+    inicio = time.perf_counter()
+    for desde in range(0, total, lote):
+        conexion.execute(insert(modelo), [filas_por_indice(i) for i in range(desde, min(desde + lote, total))])
+        conexion.commit()
+    print(json.dumps({
+        "tabla": modelo.__tablename__, "filas": total, "segundos": round(time.perf_counter() - inicio, 1),
+    }), flush=True)
+
+
+def generar_empresa(conexion, numero: int, args, hashed_password: str) -> dict:
+    rnd = random.Random(f"{args.semilla}-{numero}")
+    identificacion = f"SINT-{args.semilla}-{numero}"
+    if conexion.execute(select(Empresa.id).where(Empresa.identificacion_tributaria == identificacion)).first():
+        raise ValueError(f"ya existe la empresa {identificacion}; usa otra --semilla")
+
+    email = f"sintetica{args.semilla}-{numero}@empresa.test"
+    empresa_id = conexion.execute(insert(Empresa).returning(Empresa.id), {
+        "nombre": f"Sintética {numero}", "identificacion_tributaria": identificacion,
+        "email_contacto": email, "hashed_password": hashed_password, "activa": True,
+    }).scalar_one()
+    conexion.commit()
+
+    proyectos = _nuevos_ids(conexion, Proyecto, args.proyectos)
+    _insertar(conexion, Proyecto, lambda i: {
+        "id": proyectos[i], "empresa_id": empresa_id,
+        "nombre": f"Proyecto {i + 1}", "descripcion": _texto(rnd, 3, 12),
+        "fecha_registro": _fecha(i, args.proyectos), "fecha_actualizacion": _fecha(i, args.proyectos),
+    }, args.proyectos, args.lote)
+
+    historias = _nuevos_ids(conexion, HistoriaUsuario, args.historias)
+    _insertar(conexion, HistoriaUsuario, lambda i: {
+        "id": historias[i], "empresa_id": empresa_id, "proyecto_id": _sesgado(rnd, proyectos),
+        "titulo": _texto(rnd, 2, 6).capitalize(), "descripcion": _texto(rnd, 5, 25),
+        "estado": rnd.choices(*ESTADOS_HISTORIA)[0], "prioridad": rnd.choices(*PRIORIDADES)[0],
+        "fecha_creacion": _fecha(i, args.historias), "fecha_actualizacion": _fecha(i, args.historias),
+    }, args.historias, args.lote)
+
+    tickets = _nuevos_ids(conexion, Ticket, args.tickets)
+    _insertar(conexion, Ticket, lambda i: {
+        "id": tickets[i], "empresa_id": empresa_id, "historia_usuario_id": _sesgado(rnd, historias),
+        "asunto": _texto(rnd, 3, 8).capitalize(), "descripcion": _texto(rnd, 10, 40),
+        "estado": rnd.choices(*ESTADOS_TICKET)[0], "prioridad": rnd.choices(*PRIORIDADES)[0],
+        "fecha_creacion": _fecha(i, args.tickets), "fecha_actualizacion": _fecha(i, args.tickets),
+    }, args.tickets, args.lote)
+
+    # INSERT Core: los conteos no pasan por los listeners del ORM. La empresa es
+    # nueva, así que no hay conteos previos que sumar
+    columnas = (Ticket.historia_usuario_id, Ticket.empresa_id, Ticket.estado, Ticket.prioridad)
+    conexion.execute(insert(EstadisticaTicket).from_select(
+        ["historia_usuario_id", "empresa_id", "estado", "prioridad", "total"],
+        select(*columnas, func.count()).where(Ticket.empresa_id == empresa_id).group_by(*columnas),
+    ))
+    incrementar_versiones(conexion, [(empresa_id, c) for c in ("proyectos", "historias", "tickets")])
+    conexion.commit()
+    return {"empresa_id": empresa_id, "email_contacto": email, "password": args.password}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--empresas", type=int, default=1)
+    parser.add_argument("--proyectos", type=int, default=100, help="por empresa")
+    parser.add_argument("--historias", type=int, default=5000, help="por empresa")
+    parser.add_argument("--tickets", type=int, default=50000, help="por empresa")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=LOTE, help="filas por INSERT y por commit")
+    parser.add_argument("--password", default=PASSWORD)
+    args = parser.parse_args(argv)
+    if args.proyectos < 1 or args.historias < 1 or args.tickets < 0:
+        parser.error("se necesita al menos un proyecto y una historia por empresa")
+
+    hashed_password = hash_password(args.password)
+    with engine.connect() as conexion:
+        try:
+            empresas = [generar_empresa(conexion, n, args, hashed_password) for n in range(1, args.empresas + 1)]
+        except ValueError as exc:
+            parser.error(str(exc))
+
+        if conexion.dialect.name == "postgresql":
+            # Los ids se asignaron a mano: las secuencias deben continuar desde el máximo
+            for tabla in ("proyectos", "historias_usuario", "tickets"):
+                conexion.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), (SELECT MAX(id) FROM {tabla}))"
+                ))
+        # Estadísticas del planificador al día para las consultas siguientes
+        conexion.execute(text("ANALYZE"))
+        conexion.commit()
+
+    print(json.dumps({"empresas": empresas}), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
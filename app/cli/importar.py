@@ -0,0 +1,51 @@
+"""Importa proyectos, historias o tickets desde un archivo CSV o NDJSON.
+
+    python -m app.cli.importar tickets.csv --empresa-id 1 --tipo tickets
+    python -m app.cli.importar tickets.csv --empresa-id 1 --tipo tickets --reanudar 42
+
+El formato se deduce de la extensión si no se indica. Termina con código 1 si
+alguna fila fue rechazada; el detalle queda en errores_importacion.
+"""
+import argparse
+import json
+import sys
+
+from app import models  # noqa: F401  registra modelos y listeners
+from app.core.config import IMPORT_LOTE
+from app.db.session import SessionLocal
+from app.services.importacion import FILAS, FORMATOS, crear_importacion, obtener_importacion, procesar_importacion
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archivo")
+    parser.add_argument("--empresa-id", type=int, required=True)
+    parser.add_argument("--tipo", choices=tuple(FILAS), required=True)
+    parser.add_argument("--formato", choices=FORMATOS)
+    parser.add_argument("--lote", type=int, default=IMPORT_LOTE)
+    parser.add_argument("--reanudar", type=int, metavar="IMPORTACION_ID", help="continúa una importación interrumpida")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or ("csv" if args.archivo.lower().endswith(".csv") else "ndjson")
+
+    db = SessionLocal()
+    try:
+        if args.reanudar is None:
+            importacion = crear_importacion(db, args.empresa_id, args.tipo, formato)
+        else:
+            importacion = obtener_importacion(db, args.reanudar, args.empresa_id)
+            if importacion is None or importacion.tipo != args.tipo:
+                parser.error(f"importación {args.reanudar} no encontrada")
+            if importacion.estado == "completada":
+                parser.error(f"la importación {args.reanudar} ya está completada")
+
+        with open(args.archivo, encoding="utf-8-sig", newline="") as texto:
+            for progreso in procesar_importacion(db, importacion, texto, args.lote):
+                print(json.dumps(progreso), flush=True)
+        return 1 if importacion.filas_error else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Genera el valor del header X-Perfil para perfilar requests (app/core/perfiles.py).
+
+    PERFILES_SECRETO=... python -m app.cli.perfiles firmar --minutos 30
+
+    curl -H "X-Perfil: <valor>" -H "Authorization: Bearer ..." .../proyectos/proyectos/7/tablero
+
+El perfil queda en PERFILES_DIR del servidor con el nombre que devuelve el
+header X-Perfil de la respuesta.
+"""
+import argparse
+import sys
+
+from app.core.config import PERFILES_SECRETO
+from app.core.perfiles import firmar
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accion", choices=("firmar",))
+    parser.add_argument("--minutos", type=int, default=15, help="vigencia de la firma")
+    args = parser.parse_args(argv)
+
+    if not PERFILES_SECRETO:
+        parser.error("define PERFILES_SECRETO (el mismo que usa el servidor)")
+    print(firmar(args.minutos * 60))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import logging
+import queue
+import select
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import CacheTTL
+from app.core.config import ACTOR_CACHE_TTL, ACTOR_CACHE_MAXSIZE, ACTOR_CACHE_CHANNEL
+from app.models.empresa import Empresa
+from app.models.usuario import Usuario
+
+logger = logging.getLogger(__name__)
+
+
+# Snapshots desacoplados de la sesión: los routers solo usan id / empresa_id
+@dataclass(frozen=True)
+class EmpresaActual:
+    id: int
+    nombre: str
+    email_contacto: str
+    activa: bool = True
+
+
+@dataclass(frozen=True)
+class UsuarioActual:
+    id: int
+    empresa_id: int
+    nombre: str
+    email: str
+    rol: Optional[str]
+    activo: bool = True
+
+
+def snapshot_actor(actor):
+    if isinstance(actor, Empresa):
+        return EmpresaActual(id=actor.id, nombre=actor.nombre, email_contacto=actor.email_contacto)
+    return UsuarioActual(
+        id=actor.id,
+        empresa_id=actor.empresa_id,
+        nombre=actor.nombre,
+        email=actor.email,
+        rol=actor.rol,
+    )
+
+
+class ActorCache:
+    """Cache de actores resueltos por (tipo, id, email).
+
+    `version` se incrementa con cada invalidación: un request que leyó de la
+    base antes de una invalidación no puede volver a cachear el dato viejo.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = CacheTTL(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.version = 0
+        self.canal = None
+
+    @property
+    def habilitado(self) -> bool:
+        return self._cache.habilitado
+
+    def get(self, tipo: str, entidad_id, email):
+        if not self.habilitado:
+            return None
+        return self._cache.get((tipo, entidad_id, email))
+
+    def set(self, tipo: str, entidad_id, email, actor, version: int):
+        with self._lock:
+            if version != self.version:
+                return
+            self._cache.set((tipo, entidad_id, email), actor)
+
+    def invalidar(self, tipo: str, entidad_id):
+        with self._lock:
+            self.version += 1
+            self._cache.delete_where(lambda clave: clave[0] == tipo and clave[1] == entidad_id)
+
+    def limpiar(self):
+        with self._lock:
+            self.version += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "canal": ACTOR_CACHE_CHANNEL or None}
+
+
+actor_cache = ActorCache(maxsize=ACTOR_CACHE_MAXSIZE, ttl=ACTOR_CACHE_TTL)
+
+
+# --- Invalidación por escrituras ---
+
+_PENDIENTES = "actores_invalidados"
+
+
+def _marcar(tipo: str):
+    def listener(mapper, connection, target):
+        actor_cache.invalidar(tipo, target.id)
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault(_PENDIENTES, set()).add((tipo, target.id))
+    return listener
+
+
+for _modelo, _tipo in ((Empresa, "empresa"), (Usuario, "usuario")):
+    event.listen(_modelo, "after_update", _marcar(_tipo))
+    event.listen(_modelo, "after_delete", _marcar(_tipo))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session):
+    pendientes = session.info.pop(_PENDIENTES, None)
+    if not pendientes:
+        return
+    for tipo, entidad_id in pendientes:
+        # Segunda invalidación: cubre lecturas concurrentes entre el flush y el commit
+        actor_cache.invalidar(tipo, entidad_id)
+        if actor_cache.canal is not None:
+            actor_cache.canal.publicar(f"{tipo}:{entidad_id}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendientes(session):
+    session.info.pop(_PENDIENTES, None)
+
+
+# --- Canal entre workers (PostgreSQL LISTEN/NOTIFY) ---
+
+class CanalPostgres:
+    def __init__(self, url: str, canal: str):
+        self.canal = canal
+        self._engine = create_engine(url, poolclass=NullPool)
+        self._salida = queue.Queue()
+        self._detenido = threading.Event()
+        self._hilos = []
+
+    def iniciar(self):
+        for objetivo in (self._escuchar, self._publicar_pendientes):
+            hilo = threading.Thread(target=objetivo, name=f"actor-cache-{objetivo.__name__}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def detener(self):
+        self._detenido.set()
+        self._salida.put(None)
+        self._engine.dispose()
+
+    def publicar(self, mensaje: str):
+        self._salida.put(mensaje)
+
+    def _publicar_pendientes(self):
+        while not self._detenido.is_set():
+            mensaje = self._salida.get()
+            if mensaje is None:
+                return
+            try:
+                with self._engine.connect() as conn:
+                    conn.execute(text("SELECT pg_notify(:canal, :mensaje)"), {"canal": self.canal, "mensaje": mensaje})
+                    conn.commit()
+            except Exception:
+                logger.exception("No se pudo publicar la invalidación %s", mensaje)
+
+    def _escuchar(self):
+        while not self._detenido.is_set():
+            proxy = None
+            try:
+                proxy = self._engine.raw_connection()
+                conn = proxy.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.canal}"')
+                # Mientras no escuchábamos pudimos perder invalidaciones
+                actor_cache.limpiar()
+                while not self._detenido.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._aplicar(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Canal de invalidación '%s' caído, reintentando", self.canal)
+                self._detenido.wait(5)
+            finally:
+                if proxy is not None:
+                    proxy.close()
+
+    @staticmethod
+    def _aplicar(payload: str):
+        tipo, _, entidad_id = payload.partition(":")
+        if entidad_id.isdigit():
+            actor_cache.invalidar(tipo, int(entidad_id))
+
+
+def iniciar_canal(url: str):
+    if not ACTOR_CACHE_CHANNEL or not actor_cache.habilitado:
+        return None
+    actor_cache.canal = CanalPostgres(url, ACTOR_CACHE_CHANNEL)
+    actor_cache.canal.iniciar()
+    return actor_cache.canal
+
+
+def detener_canal():
+    if actor_cache.canal is not None:
+        actor_cache.canal.detener()
+        actor_cache.canal = None
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class CacheTTL:
+    """Cache LRU en memoria con expiración por entrada. Thread-safe.
+
+    Con `max_peso` también se limita la suma de `peso(valor)` de las entradas
+    (por ejemplo bytes, con `peso=len`).
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_peso: int = 0, peso=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_peso = max_peso
+        self._peso = peso if max_peso else None
+        self._peso_total = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            expira, valor = entrada
+            if expira <= monotonic():
+                self._quitar(clave)
+                self.misses += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def set(self, clave, valor):
+        if not self.habilitado:
+            return
+        if self._peso is not None and self._peso(valor) > self.max_peso:
+            return
+        with self._lock:
+            self._quitar(clave)
+            self._datos[clave] = (monotonic() + self.ttl, valor)
+            if self._peso is not None:
+                self._peso_total += self._peso(valor)
+            while len(self._datos) > self.maxsize or (self._peso is not None and self._peso_total > self.max_peso):
+                self._quitar(next(iter(self._datos)))
+                self.evictions += 1
+
+    def _quitar(self, clave):
+        entrada = self._datos.pop(clave, None)
+        if entrada is not None and self._peso is not None:
+            self._peso_total -= self._peso(entrada[1])
+
+    def delete(self, clave):
+        with self._lock:
+            self._quitar(clave)
+
+    def delete_where(self, predicado) -> int:
+        with self._lock:
+            claves = [c for c in self._datos if predicado(c)]
+            for clave in claves:
+                self._quitar(clave)
+            return len(claves)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+            self._peso_total = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entradas": len(self._datos),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                **({"peso": self._peso_total, "max_peso": self.max_peso} if self._peso is not None else {}),
+            }
@@ -0,0 +1,30 @@
+from typing import Optional
+
+
+def _calidad(parametros: list) -> float:
+    for parametro in parametros:
+        nombre, _, valor = parametro.partition("=")
+        if nombre.strip().lower() == "q":
+            try:
+                return min(max(float(valor.strip()), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def acepta_codificacion(accept_encoding: Optional[str], codificacion: str) -> bool:
+    """Si `Accept-Encoding` admite `codificacion` con q > 0 (RFC 9110 §12.5.3).
+
+    Una mención explícita manda sobre `*`: "gzip;q=0, *" rechaza gzip.
+    """
+    if not accept_encoding:
+        return False
+    comodin = None
+    for elemento in accept_encoding.split(","):
+        nombre, *parametros = elemento.split(";")
+        nombre = nombre.strip().lower()
+        if nombre == codificacion:
+            return _calidad(parametros) > 0
+        if nombre == "*":
+            comodin = _calidad(parametros)
+    return comodin is not None and comodin > 0
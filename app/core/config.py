@@ -0,0 +1,106 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(nombre: str, default: bool) -> bool:
+    valor = os.getenv(nombre)
+    if valor is None:
+        return default
+    return valor.strip().lower() in ("1", "true", "yes", "si", "on")
+
+
+def _env_int(nombre: str, default: int) -> int:
+    valor = os.getenv(nombre)
+    return int(valor) if valor not in (None, "") else default
+
+
+# --- Base de datos ---
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Modo de acceso a la base de datos: "sync" (driver bloqueante + threadpool)
+# o "async" (AsyncEngine con asyncpg / aiosqlite). Se elige al arrancar.
+DB_MODE = os.getenv("DB_MODE", "sync").strip().lower()
+
+# Si no se define, se deriva de DATABASE_URL cambiando el driver
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+
+# --- Pool de conexiones (ignorado en SQLite) ---
+# "queue": pool propio de SQLAlchemy; "pgbouncer": sin pool local (NullPool)
+# y sin prepared statements cacheados, compatible con PgBouncer en modo transaction
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").strip().lower()
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)  # segundos esperando una conexión libre
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)  # segundos; -1 desactiva el reciclado
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+
+# --- Cache de actores autenticados (get_current_empresa) ---
+ACTOR_CACHE_TTL = _env_int("ACTOR_CACHE_TTL", 60)  # segundos; 0 desactiva el cache
+ACTOR_CACHE_MAXSIZE = _env_int("ACTOR_CACHE_MAXSIZE", 10000)
+# Canal LISTEN/NOTIFY de PostgreSQL para invalidar entre workers (vacío = solo local)
+ACTOR_CACHE_CHANNEL = os.getenv("ACTOR_CACHE_CHANNEL", "")
+
+
+# --- Hashing de contraseñas (bcrypt) ---
+# Cambiar el costo provoca el rehash automático en el siguiente login exitoso
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+# Procesos dedicados a bcrypt; 0 usa el threadpool (útil en desarrollo)
+PASSWORD_WORKERS = _env_int("PASSWORD_WORKERS", min(2, os.cpu_count() or 1))
+# Operaciones que pueden esperar turno además de las que están corriendo
+PASSWORD_QUEUE_LIMIT = _env_int("PASSWORD_QUEUE_LIMIT", 32)
+
+
+# --- Paginación de listados ---
+PAGINA_LIMITE_DEFECTO = _env_int("PAGINA_LIMITE_DEFECTO", 50)
+PAGINA_LIMITE_MAXIMO = _env_int("PAGINA_LIMITE_MAXIMO", 200)
+
+
+# --- Cache de respuestas de lectura ---
+RESPONSE_CACHE_TTL = _env_int("RESPONSE_CACHE_TTL", 30)  # segundos; 0 desactiva el cache
+RESPONSE_CACHE_MAXSIZE = _env_int("RESPONSE_CACHE_MAXSIZE", 5000)
+RESPONSE_CACHE_MAX_MB = _env_int("RESPONSE_CACHE_MAX_MB", 64)  # memoria máxima del backend en proceso
+# redis://... comparte el cache entre workers (requiere el paquete `redis`); vacío = en proceso
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+# Listados de historias y tickets serializados con orjson desde las columnas, sin Pydantic (requiere `orjson`)
+JSON_RAPIDO = _env_bool("JSON_RAPIDO", False)
+
+
+# --- Operaciones en lote ---
+BULK_MAX_ITEMS = _env_int("BULK_MAX_ITEMS", 1000)
+# Filas por lote (y por commit) en las importaciones desde archivo
+IMPORT_LOTE = _env_int("IMPORT_LOTE", 5000)
+
+
+# --- Métricas (GET /metrics) ---
+# Agrega Server-Timing (consultas y tiempo en la base) a cada respuesta
+SERVER_TIMING = _env_bool("SERVER_TIMING", True)
+# Guarda cada sentencia SQL del request y su origen para detectar N+1 (caro: solo en desarrollo y tests)
+CONSULTAS_DEBUG = _env_bool("CONSULTAS_DEBUG", False)
+# Veces que una sentencia idéntica puede repetirse en un request antes de reportarla
+N_MAS_1_UMBRAL = _env_int("N_MAS_1_UMBRAL", 3)
+# Presupuesto de consultas por ruta: off | aviso (log) | error (responde 500 con el reporte)
+PRESUPUESTO_CONSULTAS = os.getenv("PRESUPUESTO_CONSULTAS", "aviso").strip().lower()
+# Token del header X-Metricas-Token que pide GET /metricas/consultas (expone SQL); vacío = deshabilitado
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+
+# --- Perfiles por request (app/core/perfiles.py) ---
+# Directorio de los perfiles capturados
+PERFILES_DIR = os.getenv("PERFILES_DIR", "perfiles")
+# Clave HMAC del header X-Perfil; vacío = solo el flag ?perfilar de usuarios admin
+PERFILES_SECRETO = os.getenv("PERFILES_SECRETO", "")
+# Capturas por minuto en el proceso (una a la vez); 0 desactiva los perfiles
+PERFILES_MAX_POR_MINUTO = _env_int("PERFILES_MAX_POR_MINUTO", 2)
+PERFILES_INTERVALO_MS = _env_int("PERFILES_INTERVALO_MS", 10)
+# Una captura deja de muestrear pasado este tiempo (streaming largo)
+PERFILES_MAX_SEGUNDOS = _env_int("PERFILES_MAX_SEGUNDOS", 60)
+# Retención: se borran los más viejos al pasar cualquiera de los dos límites
+PERFILES_MAX_ARCHIVOS = _env_int("PERFILES_MAX_ARCHIVOS", 50)
+PERFILES_MAX_MB = _env_int("PERFILES_MAX_MB", 100)
+# collapsed (flamegraph.pl, speedscope, inferno) o speedscope (JSON)
+PERFILES_FORMATO = os.getenv("PERFILES_FORMATO", "collapsed").strip().lower()
@@ -0,0 +1,142 @@
+"""Presupuesto de consultas por ruta y detector de N+1.
+
+- `@presupuesto_consultas(n)` declara en un endpoint cuántas consultas SQL
+  puede hacer un request en el peor caso: autenticación sin cache de actores
+  y, en los logins, el rehash de la contraseña incluidos. Las rutas que leen o
+  escriben por bloques (tablero, exportación, importación) declaran None:
+  sus consultas crecen con los datos a propósito y no se revisan.
+- Con CONSULTAS_DEBUG=true se guarda además cada sentencia con el lugar de
+  app/ que la originó, y las sentencias idénticas repetidas N_MAS_1_UMBRAL
+  veces o más se reportan como posible N+1 (un lazy-load dentro de un loop
+  repite el mismo SELECT con otro id).
+
+PRESUPUESTO_CONSULTAS decide qué pasa con un request que se excede:
+"aviso" lo registra en el log, "error" además responde 500 con el reporte
+(pensado para tests y benchmarks) y "off" no revisa nada. Si la respuesta ya
+empezó a enviarse (streaming) solo queda el log. Las infracciones se guardan
+en memoria y se consultan en GET /metricas/consultas.
+"""
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from typing import Optional
+
+from app.core.config import N_MAS_1_UMBRAL, PRESUPUESTO_CONSULTAS
+
+logger = logging.getLogger(__name__)
+
+if PRESUPUESTO_CONSULTAS not in ("off", "aviso", "error"):
+    raise ValueError("PRESUPUESTO_CONSULTAS debe ser 'off', 'aviso' o 'error'")
+
+_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# Módulos que están en medio de toda consulta y no dicen nada sobre su origen
+_INTERMEDIOS = tuple(
+    os.path.join(_APP, *ruta) for ruta in (("core", "consultas.py"), ("core", "metricas.py"), ("db", "session.py"))
+)
+_SQLALCHEMY = os.sep + "sqlalchemy" + os.sep
+SITIOS_POR_SENTENCIA = 5
+MAX_INFRACCIONES = 200
+
+_infracciones = deque(maxlen=MAX_INFRACCIONES)
+_lock = threading.Lock()
+
+
+class Presupuesto:
+    __slots__ = ("maximo", "repeticiones")
+
+    def __init__(self, maximo: Optional[int], repeticiones: Optional[int] = None):
+        self.maximo = maximo
+        self.repeticiones = repeticiones
+
+
+def presupuesto_consultas(maximo: Optional[int], repeticiones: Optional[int] = None):
+    """Decorador de endpoints: máximo de consultas por request (None: sin revisar).
+
+    `repeticiones` reemplaza a N_MAS_1_UMBRAL en rutas que repiten una
+    sentencia a propósito un número acotado de veces.
+    """
+    def decorador(endpoint):
+        endpoint.presupuesto_consultas = Presupuesto(maximo, repeticiones)
+        return endpoint
+    return decorador
+
+
+def _sitio(frame, raiz: str) -> str:
+    return f"{os.path.relpath(frame.f_code.co_filename, raiz)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def sitio_llamada() -> str:
+    """Frames de app/ más cercanos a la consulta en curso ('archivo:línea función').
+
+    Sin frames de app/ (p. ej. un lazy-load al serializar la respuesta) se
+    devuelve el primero fuera de SQLAlchemy.
+    """
+    sitios = []
+    externo = None
+    frame = sys._getframe(1)
+    while frame is not None and len(sitios) < 3:
+        archivo = frame.f_code.co_filename
+        if archivo.startswith(_APP):
+            if not archivo.startswith(_INTERMEDIOS):
+                sitios.append(_sitio(frame, os.path.dirname(os.path.dirname(_APP))))
+        elif externo is None and _SQLALCHEMY not in archivo:
+            externo = _sitio(frame, os.path.dirname(os.path.dirname(archivo)))
+        frame = frame.f_back
+    return " <- ".join(sitios) or externo or "desconocido"
+
+
+def registrar_sentencia(sentencias: dict, sentencia: str):
+    veces_y_sitios = sentencias.setdefault(sentencia, [0, set()])
+    veces_y_sitios[0] += 1
+    if len(veces_y_sitios[1]) < SITIOS_POR_SENTENCIA:
+        veces_y_sitios[1].add(sitio_llamada())
+
+
+def revisar(metodo: str, ruta: str, endpoint, consultas: int, sentencias: Optional[dict]) -> Optional[dict]:
+    """Reporte del request si excede su presupuesto o repite sentencias; None si está bien."""
+    if PRESUPUESTO_CONSULTAS == "off":
+        return None
+    presupuesto = getattr(endpoint, "presupuesto_consultas", None)
+    if presupuesto is not None and presupuesto.maximo is None:
+        return None
+    umbral = presupuesto.repeticiones if presupuesto and presupuesto.repeticiones else N_MAS_1_UMBRAL
+    repetidas = [
+        {"sentencia": sentencia, "veces": veces, "sitios": sorted(sitios)}
+        for sentencia, (veces, sitios) in (sentencias or {}).items() if veces >= umbral
+    ]
+    excedido = presupuesto is not None and consultas > presupuesto.maximo
+    if not excedido and not repetidas:
+        return None
+
+    reporte = {
+        "ruta": f"{metodo} {ruta}",
+        "consultas": consultas,
+        "presupuesto": presupuesto.maximo if presupuesto else None,
+        "repetidas": sorted(repetidas, key=lambda r: -r["veces"]),
+    }
+    with _lock:
+        _infracciones.append(reporte)
+    return reporte
+
+
+def registrar_en_log(reporte: dict, respuesta_enviada: bool):
+    nivel = logging.ERROR if PRESUPUESTO_CONSULTAS == "error" else logging.WARNING
+    lineas = [f"{reporte['ruta']}: {reporte['consultas']} consultas (presupuesto {reporte['presupuesto']})"]
+    for r in reporte["repetidas"]:
+        lineas.append(f"  {r['veces']}x {r['sentencia'][:200]}")
+        lineas.extend(f"      desde {sitio}" for sitio in r["sitios"])
+    if respuesta_enviada and PRESUPUESTO_CONSULTAS == "error":
+        lineas.append("  (la respuesta ya se estaba enviando: no se pudo responder 500)")
+    logger.log(nivel, "\n".join(lineas))
+
+
+def infracciones() -> list:
+    with _lock:
+        return list(_infracciones)
+
+
+def limpiar_infracciones():
+    with _lock:
+        _infracciones.clear()
@@ -1,21 +1,53 @@
-from fastapi import Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from app.core.config import PAGINA_LIMITE_DEFECTO, PAGINA_LIMITE_MAXIMO
 from app.core.security import SECRET_KEY, ALGORITHM
-from app.db.session import get_db
+from app.core.actor_cache import actor_cache, snapshot_actor
+from app.core.etag import calcular_etag, etag_coincide
+from app.core.response_cache import response_cache
+from app.db.session import get_db, run_db
 from app.models.empresa import Empresa
 from app.models.usuario import Usuario
+from app.schemas.enums import Prioridad
+from app.services.versiones import versiones_colecciones
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_actor(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido o expirado",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _buscar_empresa_por_email(db: Session, email: str):
+    return db.query(Empresa).filter(Empresa.email_contacto == email).first()
+
+
+def _resolver_actor(db: Session, entity_type: str, entity_id: int, email: str):
+    if entity_type == "empresa":
+        empresa = db.query(Empresa).filter(Empresa.id == entity_id, Empresa.email_contacto == email).first()
+        if not empresa or not empresa.activa:
+            return None
+        return empresa
+
+    elif entity_type == "usuario":
+        usuario = db.query(Usuario).filter(Usuario.id == entity_id, Usuario.email == email).first()
+        if not usuario or not usuario.activo:
+            return None
+        return usuario
+
+    return None
+
+
+async def get_current_actor(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
@@ -24,38 +56,108 @@ def get_current_actor(token: str = Depends(oauth2_scheme), db: Session = Depends
     except JWTError:
         raise credentials_exception
 
-    empresa = db.query(Empresa).filter(Empresa.email_contacto == email).first()
+    empresa = await run_db(db, _buscar_empresa_por_email, email)
     if empresa is None:
         raise credentials_exception
     return empresa
 
 
-def get_current_empresa(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token inválido o expirado",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def get_current_empresa(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    credentials_exception = _credentials_exception()
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        entity_type = payload.get("type")
-        entity_id = payload.get("id")
-        email = payload.get("sub")
+    except JWTError:
+        raise credentials_exception
 
-        if entity_type == "empresa":
-            empresa = db.query(Empresa).filter(Empresa.id == entity_id, Empresa.email_contacto == email).first()
-            if not empresa or not empresa.activa:
-                raise credentials_exception
-            return empresa
+    entity_type, entity_id, email = payload.get("type"), payload.get("id"), payload.get("sub")
 
-        elif entity_type == "usuario":
-            usuario = db.query(Usuario).filter(Usuario.id == entity_id, Usuario.email == email).first()
-            if not usuario or not usuario.activo:
-                raise credentials_exception
-            return usuario
+    actor = actor_cache.get(entity_type, entity_id, email)
+    if actor is not None:
+        return actor
 
+    version = actor_cache.version
+    actor = await run_db(db, _resolver_actor, entity_type, entity_id, email)
+    if actor is None:
         raise credentials_exception
 
-    except JWTError:
-        raise credentials_exception
\ No newline at end of file
+    actor = snapshot_actor(actor)
+    actor_cache.set(entity_type, entity_id, email, actor, version)
+    return actor
+
+
+class Paginacion:
+    """Parámetros comunes de los listados paginados por cursor."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Valor de `siguiente_cursor` de la página anterior"),
+        limite: int = Query(PAGINA_LIMITE_DEFECTO, ge=1, le=PAGINA_LIMITE_MAXIMO),
+    ):
+        self.cursor = cursor
+        self.limite = limite
+
+
+class FiltrosListado:
+    """Filtros y orden de los listados de historias y tickets (ver `filtros_listado`)."""
+
+    def __init__(self, estado=None, prioridad=None, creado_desde=None, creado_hasta=None, orden="id"):
+        self.estado = estado
+        self.prioridad = prioridad
+        self.creado_desde = creado_desde
+        self.creado_hasta = creado_hasta
+        self.orden = orden
+
+
+def filtros_listado(estados):
+    """Dependencia que lee un `FiltrosListado` del query string; `estados` es el Enum de estados válidos.
+
+    `estado` y `prioridad` se pueden repetir (`?estado=abierto&estado=en_progreso`).
+    """
+    def dependencia(
+        estado: Optional[List[estados]] = Query(None, description="Uno o más estados"),
+        prioridad: Optional[List[Prioridad]] = Query(None, description="Una o más prioridades"),
+        creado_desde: Optional[datetime] = Query(None, description="fecha_creacion >= creado_desde"),
+        creado_hasta: Optional[datetime] = Query(None, description="fecha_creacion < creado_hasta"),
+        orden: str = Query("id", pattern="^-?(id|fecha_creacion)$", description="Campo de orden; '-' para descendente"),
+    ) -> FiltrosListado:
+        return FiltrosListado(estado, prioridad, creado_desde, creado_hasta, orden)
+    return dependencia
+
+
+class LecturaColeccion:
+    """Resultado de `ETagColeccion`: sabe responder desde el cache de respuestas."""
+
+    def __init__(self, etag: str, etiquetas: tuple, headers: dict):
+        self.etag = etag
+        self.etiquetas = etiquetas
+        self.headers = headers
+
+    async def responder(self, producir, modelo):
+        """`producir` es una corrutina que devuelve lo mismo que devolvería el handler."""
+        return await response_cache.responder(self.etag, self.etiquetas, producir, modelo, self.headers)
+
+
+class ETagColeccion:
+    """GET condicional y cacheado para lecturas de una o varias colecciones de la empresa.
+
+    El ETag combina las versiones de las colecciones con la ruta y los query
+    params; si coincide con `If-None-Match` se responde 304 antes de ejecutar
+    la consulta o serializar. El mismo ETag es la clave del cache de respuestas.
+    """
+
+    def __init__(self, *colecciones: str):
+        self.colecciones = colecciones
+
+    async def __call__(self, request: Request, db=Depends(get_db),
+                       current_actor=Depends(get_current_empresa)) -> LecturaColeccion:
+        empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+        versiones = await run_db(db, versiones_colecciones, empresa_id, self.colecciones)
+        etag = calcular_etag(
+            empresa_id, sorted(versiones.items()), request.url.path, sorted(request.query_params.multi_items())
+        )
+        # private: cada empresa ve datos distintos en la misma URL
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_coincide(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return LecturaColeccion(etag, tuple((empresa_id, c) for c in self.colecciones), headers)
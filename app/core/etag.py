@@ -0,0 +1,18 @@
+import hashlib
+from typing import Optional
+
+
+def calcular_etag(*partes) -> str:
+    """ETag débil a partir de todo lo que determina el contenido de la respuesta."""
+    digest = hashlib.blake2b(repr(partes).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil contra la lista de `If-None-Match` (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaco = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == opaco for candidato in if_none_match.split(","))
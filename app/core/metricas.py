@@ -0,0 +1,247 @@
+"""Métricas de la API en el formato de texto de Prometheus (GET /metrics).
+
+- Por ruta: histograma de latencia, contador por código de estado, y número de
+  consultas SQL y tiempo en la base por request.
+- Requests en curso por método (la ruta solo se conoce después del routing).
+- Lo que registren otros módulos con `registrar_recolector` (p. ej. el pool).
+
+El mismo middleware revisa el presupuesto de consultas de cada ruta y, con
+CONSULTAS_DEBUG, las sentencias repetidas (ver app/core/consultas.py).
+
+Los valores son del proceso: con varios workers cada uno expone los suyos y
+Prometheus los agrega al consultar. La ruta es la plantilla (`/tickets/{id}`),
+así que el número de series no crece con los ids.
+"""
+import json
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from app.core import consultas as presupuesto
+from app.core.config import CONSULTAS_DEBUG, SERVER_TIMING
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+# Rutas que no coinciden con ninguna (404 de escáneres, etc.) comparten etiqueta
+SIN_RUTA = "sin_ruta"
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres: tuple, valores: tuple, extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._lock = threading.Lock()
+        self._valores = {}
+
+    def cabecera(self) -> list:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valores: tuple = (), n: float = 1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + n
+
+    def exponer(self) -> list:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return self.cabecera() + [
+            f"{self.nombre}{_etiquetas(self.etiquetas, k)} {_numero(v)}" for k, v in valores
+        ]
+
+
+class Indicador(Contador):
+    """Gauge: sube y baja."""
+    tipo = "gauge"
+
+    def dec(self, valores: tuple = (), n: float = 1):
+        self.inc(valores, -n)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple = (), buckets: tuple = BUCKETS_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(buckets)
+
+    def observar(self, valores: tuple, valor: float):
+        with self._lock:
+            serie = self._valores.get(valores)
+            if serie is None:
+                # [conteo por bucket (no acumulado) ..., +Inf] y suma
+                serie = self._valores[valores] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][bisect_left(self.buckets, valor)] += 1
+            serie[1] += valor
+
+    def exponer(self) -> list:
+        with self._lock:
+            valores = sorted((k, (list(c), s)) for k, (c, s) in self._valores.items())
+        lineas = self.cabecera()
+        for k, (conteos, suma) in valores:
+            acumulado = 0
+            for limite, n in zip(self.buckets + ("+Inf",), conteos):
+                acumulado += n
+                le = 'le="' + (limite if isinstance(limite, str) else _numero(float(limite))) + '"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, k, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, k)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, k)} {acumulado}")
+        return lineas
+
+
+REQUESTS = Contador("http_requests_total", "Requests atendidos.", ("method", "route", "status"))
+LATENCIA = Histograma("http_request_duration_seconds", "Duración del request hasta el último byte.", ("method", "route"))
+EN_CURSO = Indicador("http_requests_in_progress", "Requests en curso.", ("method",))
+CONSULTAS = Histograma(
+    "db_queries_per_request", "Consultas SQL por request.", ("method", "route"), buckets=BUCKETS_CONSULTAS,
+)
+TIEMPO_DB = Histograma("db_time_per_request_seconds", "Tiempo en la base por request.", ("method", "route"))
+
+_METRICAS = [REQUESTS, LATENCIA, EN_CURSO, CONSULTAS, TIEMPO_DB]
+_RECOLECTORES = []
+
+
+def registrar_recolector(funcion):
+    """`funcion()` devuelve [(nombre, tipo, ayuda, valor)] calculados al exponer."""
+    _RECOLECTORES.append(funcion)
+
+
+def exponer() -> str:
+    lineas = []
+    for metrica in _METRICAS:
+        lineas.extend(metrica.exponer())
+    for recolector in _RECOLECTORES:
+        for nombre, tipo, ayuda, valor in recolector():
+            lineas.extend([f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}", f"{nombre} {_numero(valor)}"])
+    return "\n".join(lineas) + "\n"
+
+
+# --- Consultas por request ---
+
+class MedicionRequest:
+    __slots__ = ("consultas", "segundos_db", "sentencias")
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos_db = 0.0
+        # sentencia -> [veces, sitios de llamada]; solo con CONSULTAS_DEBUG
+        self.sentencias = {} if CONSULTAS_DEBUG else None
+
+
+# El objeto es compartido: los hilos de run_db y las tareas del streaming
+# reciben una copia del contexto, pero apuntan a la misma medición
+_medicion: ContextVar[Optional[MedicionRequest]] = ContextVar("medicion_request", default=None)
+
+
+def registrar_consulta(segundos: float, sentencia: str):
+    """Llamado por los eventos del engine (app/db/session.py) tras cada consulta."""
+    medicion = _medicion.get()
+    if medicion is not None:
+        medicion.consultas += 1
+        medicion.segundos_db += segundos
+        if medicion.sentencias is not None:
+            presupuesto.registrar_sentencia(medicion.sentencias, sentencia)
+
+
+def _server_timing(medicion: MedicionRequest, segundos: float) -> bytes:
+    return (
+        f'db;dur={medicion.segundos_db * 1000:.1f};desc="{medicion.consultas} consultas", '
+        f"app;dur={segundos * 1000:.1f}"
+    ).encode()
+
+
+class MetricasMiddleware:
+    """Middleware ASGI: mide cada request y agrega `Server-Timing` a la respuesta.
+
+    El header sale con lo medido hasta enviar los headers; en las respuestas
+    por streaming las métricas incluyen además lo que pase mientras se envía
+    el cuerpo.
+
+    Con PRESUPUESTO_CONSULTAS=error, un request que ya excedió su presupuesto
+    al enviar los headers recibe un 500 con el reporte en lugar de su respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionRequest()
+        token = _medicion.set(medicion)
+        metodo = scope["method"]
+        inicio = perf_counter()
+        status = 500
+        iniciada = reemplazada = False
+
+        def revisar():
+            return presupuesto.revisar(
+                metodo, getattr(scope.get("route"), "path", None) or SIN_RUTA, scope.get("endpoint"),
+                medicion.consultas, medicion.sentencias,
+            )
+
+        async def enviar(mensaje):
+            nonlocal status, iniciada, reemplazada
+            if reemplazada:
+                return
+            if mensaje["type"] == "http.response.start":
+                if presupuesto.PRESUPUESTO_CONSULTAS == "error" and (reporte := revisar()):
+                    presupuesto.registrar_en_log(reporte, respuesta_enviada=False)
+                    reemplazada = True
+                    status = 500
+                    cuerpo = json.dumps({"detail": "Presupuesto de consultas excedido", "reporte": reporte}).encode()
+                    await send({"type": "http.response.start", "status": 500, "headers": [
+                        (b"content-type", b"application/json"), (b"content-length", str(len(cuerpo)).encode()),
+                    ]})
+                    await send({"type": "http.response.body", "body": cuerpo})
+                    return
+                status = mensaje["status"]
+                iniciada = True
+                if SERVER_TIMING:
+                    mensaje["headers"] = [
+                        *mensaje.get("headers", ()), (b"server-timing", _server_timing(medicion, perf_counter() - inicio)),
+                    ]
+            await send(mensaje)
+
+        EN_CURSO.inc((metodo,))
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = perf_counter() - inicio
+            EN_CURSO.dec((metodo,))
+            _medicion.reset(token)
+            # En modo error ya se revisó al enviar los headers; se repite por lo
+            # consultado durante el streaming
+            if not reemplazada and (reporte := revisar()):
+                presupuesto.registrar_en_log(reporte, respuesta_enviada=iniciada)
+            ruta = getattr(scope.get("route"), "path", None) or SIN_RUTA
+            REQUESTS.inc((metodo, ruta, str(status)))
+            LATENCIA.observar((metodo, ruta), duracion)
+            CONSULTAS.observar((metodo, ruta), medicion.consultas)
+            TIEMPO_DB.observar((metodo, ruta), medicion.segundos_db)
@@ -0,0 +1,347 @@
+"""Perfiles de CPU y espera de un request puntual, a pedido.
+
+Un request se perfila si trae alguna de estas dos marcas:
+
+- el header `X-Perfil: <expira>.<firma>` con una firma HMAC de PERFILES_SECRETO
+  vigente (`python -m app.cli.perfiles firmar` la genera);
+- el parámetro `?perfilar=1` junto con el token de un usuario con rol admin.
+
+Mientras dura el request, un hilo toma cada PERFILES_INTERVALO_MS la pila de
+todos los hilos y se queda con las que pasan por el request: el middleware
+(handler, dependencias y cuerpo de streaming en el event loop) y las funciones
+que `run_db` y `get_db` ejecutan en el threadpool o en el greenlet de
+SQLAlchemy. Los instantes en que el request no está en ninguna pila (esperando
+a la base en modo async, a bcrypt, o cola del threadpool) se cuentan como
+"(en espera)", así el perfil es de tiempo de reloj.
+
+El resultado se guarda en PERFILES_DIR en formato collapsed (flamegraph.pl,
+speedscope, inferno) o JSON de speedscope, con el peso de cada pila en
+microsegundos, y su nombre vuelve en el header
+`X-Perfil` de la respuesta. Hay una sola captura a la vez y a lo sumo
+PERFILES_MAX_POR_MINUTO por proceso (si no, la respuesta lleva
+`X-Perfil: limite`); los archivos más viejos se borran al pasar
+PERFILES_MAX_ARCHIVOS o PERFILES_MAX_MB.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+from urllib.parse import parse_qs
+
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import (
+    PERFILES_DIR, PERFILES_SECRETO, PERFILES_MAX_POR_MINUTO, PERFILES_INTERVALO_MS, PERFILES_MAX_SEGUNDOS,
+    PERFILES_MAX_ARCHIVOS, PERFILES_MAX_MB, PERFILES_FORMATO,
+)
+from app.core.security import SECRET_KEY, ALGORITHM
+
+logger = logging.getLogger(__name__)
+
+if PERFILES_FORMATO not in ("collapsed", "speedscope"):
+    raise ValueError("PERFILES_FORMATO debe ser 'collapsed' o 'speedscope'")
+
+EXTENSIONES = {"collapsed": ".txt", "speedscope": ".speedscope.json"}
+ESPERA = "(en espera)"
+_RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep
+
+
+# --- Quién puede pedir un perfil ---
+
+def firmar(segundos: int, secreto: str = PERFILES_SECRETO) -> str:
+    """Valor del header X-Perfil válido durante `segundos`."""
+    expira = str(int(time.time()) + segundos)
+    return f"{expira}.{hmac.new(secreto.encode(), expira.encode(), hashlib.sha256).hexdigest()}"
+
+
+def _firma_valida(valor: str) -> bool:
+    if not PERFILES_SECRETO:
+        return False
+    expira, _, firma = valor.partition(".")
+    if not expira.isdigit() or int(expira) < time.time():
+        return False
+    esperada = hmac.new(PERFILES_SECRETO.encode(), expira.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(firma, esperada)
+
+
+def _es_admin(autorizacion: str) -> bool:
+    esquema, _, token = autorizacion.partition(" ")
+    if esquema.lower() != "bearer":
+        return False
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("type") == "usuario" and payload.get("rol") == "admin"
+
+
+def _solicitado(scope) -> bool:
+    headers = dict(scope["headers"])
+    if b"x-perfil" in headers:
+        return _firma_valida(headers[b"x-perfil"].decode("latin-1"))
+    if b"perfilar=" in scope["query_string"]:
+        valores = parse_qs(scope["query_string"].decode("latin-1")).get("perfilar", [])
+        return valores[-1:] in (["1"], ["true"]) and _es_admin(headers.get(b"authorization", b"").decode("latin-1"))
+    return False
+
+
+class _Limitador:
+    """Una captura a la vez y a lo sumo `por_minuto` en la última ventana de 60 s."""
+
+    def __init__(self, por_minuto: int):
+        self.por_minuto = por_minuto
+        self._inicios = deque()
+        self._activa = False
+        self._lock = threading.Lock()
+
+    def reservar(self) -> bool:
+        with self._lock:
+            ahora = time.monotonic()
+            while self._inicios and ahora - self._inicios[0] > 60:
+                self._inicios.popleft()
+            if self._activa or len(self._inicios) >= self.por_minuto:
+                return False
+            self._inicios.append(ahora)
+            self._activa = True
+            return True
+
+    def liberar(self):
+        with self._lock:
+            self._activa = False
+
+
+_limitador = _Limitador(PERFILES_MAX_POR_MINUTO)
+
+
+# --- Captura ---
+
+_nombres = {}
+
+
+def _nombre(code) -> str:
+    nombre = _nombres.get(code)
+    if nombre is None:
+        archivo = code.co_filename
+        if "site-packages" + os.sep in archivo:
+            archivo = archivo.split("site-packages" + os.sep, 1)[1]
+        elif archivo.startswith(_RAIZ_REPO):
+            archivo = archivo[len(_RAIZ_REPO):]
+        else:
+            archivo = os.path.basename(archivo)
+        nombre = _nombres[code] = f"{code.co_qualname} ({archivo}:{code.co_firstlineno})"
+    return nombre
+
+
+class Captura:
+    def __init__(self, scope):
+        self.scope = scope
+        # Frames desde los que una pila pertenece al request
+        self.raices = set()
+        self.tarea = None
+        self.muestras = Counter()
+        self.truncada = False
+        self.inicio = time.time()
+        self.duracion = 0.0
+        self._archivo = None
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name="perfil", daemon=True)
+
+    @property
+    def ruta(self) -> str:
+        return getattr(self.scope.get("route"), "path", None) or "sin_ruta"
+
+    @property
+    def archivo(self) -> str:
+        # La ruta se conoce después del routing: el nombre se fija la primera vez que se pide
+        if self._archivo is None:
+            marca = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.inicio))
+            ruta = re.sub(r"[^A-Za-z0-9]+", "_", self.ruta).strip("_") or "raiz"
+            self._archivo = f"{marca}-{self.scope['method']}-{ruta}-{uuid.uuid4().hex[:6]}{EXTENSIONES[PERFILES_FORMATO]}"
+        return self._archivo
+
+    def iniciar(self, raiz):
+        self.raices.add(raiz)
+        self.tarea = asyncio.current_task()
+        self._hilo.start()
+
+    def seguir_tarea_actual(self):
+        """Agrega como raíz la tarea que está enviando la respuesta.
+
+        StreamingResponse envía el cuerpo desde una tarea propia, cuya pila no
+        pasa por el middleware.
+        """
+        tarea = asyncio.current_task()
+        if tarea is not None and tarea is not self.tarea:
+            frame = getattr(tarea.get_coro(), "cr_frame", None)
+            if frame is not None:
+                self.raices.add(frame)
+
+    def detener(self):
+        self._detener.set()
+        self._hilo.join()
+        self.duracion = time.time() - self.inicio
+
+    def _pila(self, frame) -> Optional[tuple]:
+        nombres = []
+        while frame is not None:
+            if frame in self.raices:
+                nombres.reverse()
+                return tuple(nombres)
+            nombres.append(_nombre(frame.f_code))
+            frame = frame.f_back
+        return None
+
+    def _muestrear(self):
+        propio = threading.get_ident()
+        intervalo = PERFILES_INTERVALO_MS / 1000
+        anterior = time.perf_counter()
+        limite = anterior + PERFILES_MAX_SEGUNDOS
+        while not self._detener.wait(intervalo):
+            # Este hilo necesita el GIL para muestrear: con la CPU ocupada en
+            # Python el intervalo real se estira hasta sys.getswitchinterval(),
+            # así que cada muestra pesa los microsegundos que pasaron de verdad
+            ahora = time.perf_counter()
+            if ahora > limite:
+                self.truncada = True
+                return
+            peso = round((ahora - anterior) * 1_000_000)
+            anterior = ahora
+            en_pila = False
+            for hilo, frame in sys._current_frames().items():
+                if hilo != propio and (pila := self._pila(frame)) is not None:
+                    self.muestras[pila] += peso
+                    en_pila = True
+            if not en_pila:
+                self.muestras[(ESPERA,)] += peso
+
+    def _collapsed(self, etiqueta: str) -> str:
+        return "".join(f"{';'.join((etiqueta, *pila))} {n}\n" for pila, n in sorted(self.muestras.items()))
+
+    def _speedscope(self, etiqueta: str) -> str:
+        indices = {}
+        muestras = [[indices.setdefault(nombre, len(indices)) for nombre in pila] for pila in self.muestras]
+        pesos = list(self.muestras.values())
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": nombre} for nombre in indices]},
+            "profiles": [{
+                "type": "sampled", "name": etiqueta, "unit": "microseconds",
+                "startValue": 0, "endValue": sum(pesos), "samples": muestras, "weights": pesos,
+            }],
+            "name": etiqueta,
+            "exporter": "app.core.perfiles",
+        })
+
+    def guardar(self):
+        etiqueta = f"{self.scope['method']} {self.ruta} ({self.duracion * 1000:.0f} ms"
+        etiqueta += ", truncado)" if self.truncada else ")"
+        contenido = self._collapsed(etiqueta) if PERFILES_FORMATO == "collapsed" else self._speedscope(etiqueta)
+        try:
+            os.makedirs(PERFILES_DIR, exist_ok=True)
+            with open(os.path.join(PERFILES_DIR, self.archivo), "w", encoding="utf-8") as archivo:
+                archivo.write(contenido)
+            _podar()
+        except OSError:
+            logger.exception("No se pudo guardar el perfil %s", self.archivo)
+
+
+def _podar():
+    """Borra los perfiles más viejos hasta cumplir PERFILES_MAX_ARCHIVOS y PERFILES_MAX_MB."""
+    with os.scandir(PERFILES_DIR) as entradas:
+        archivos = sorted(
+            (e.stat().st_mtime, e.stat().st_size, e.path) for e in entradas
+            if e.is_file() and e.name.endswith(tuple(EXTENSIONES.values()))
+        )
+    total = sum(tamano for _, tamano, _ in archivos)
+    while archivos and (len(archivos) > PERFILES_MAX_ARCHIVOS or total > PERFILES_MAX_MB * 1024 * 1024):
+        _, tamano, ruta = archivos.pop(0)
+        os.remove(ruta)
+        total -= tamano
+
+
+_captura: ContextVar[Optional[Captura]] = ContextVar("captura_perfil", default=None)
+
+
+def en_perfil(fn):
+    """`fn` marcada como raíz de la captura en curso, para las pilas de otros hilos o greenlets."""
+    captura = _captura.get()
+    if captura is None:
+        return fn
+
+    @wraps(fn)
+    def raiz(*args, **kwargs):
+        frame = sys._getframe()
+        captura.raices.add(frame)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            captura.raices.discard(frame)
+    return raiz
+
+
+class raiz_perfil:
+    """`with raiz_perfil():` marca como raíz el frame que lo usa (p. ej. un generador en el threadpool)."""
+
+    def __enter__(self):
+        self.captura = _captura.get()
+        if self.captura is not None:
+            self.frame = sys._getframe(1)
+            self.captura.raices.add(self.frame)
+
+    def __exit__(self, *exc):
+        if self.captura is not None:
+            self.captura.raices.discard(self.frame)
+
+
+class PerfilesMiddleware:
+    """Middleware ASGI: perfila los requests que lo piden (ver el docstring del módulo)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PERFILES_MAX_POR_MINUTO or not _solicitado(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _limitador.reservar():
+            async def enviar_limitado(mensaje):
+                if mensaje["type"] == "http.response.start":
+                    mensaje["headers"] = [*mensaje.get("headers", ()), (b"x-perfil", b"limite")]
+                await send(mensaje)
+
+            await self.app(scope, receive, enviar_limitado)
+            return
+
+        captura = Captura(scope)
+        token = _captura.set(captura)
+        captura.iniciar(sys._getframe())
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                captura.seguir_tarea_actual()
+                mensaje["headers"] = [*mensaje.get("headers", ()), (b"x-perfil", captura.archivo.encode())]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            captura.detener()
+            _captura.reset(token)
+            try:
+                await run_in_threadpool(captura.guardar)
+            finally:
+                _limitador.liberar()
+
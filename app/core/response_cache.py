@@ -0,0 +1,269 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheTTL
+from app.core.config import RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAXSIZE, RESPONSE_CACHE_MAX_MB, RESPONSE_CACHE_URL
+from app.models.empresa import Empresa
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.proyecto import Proyecto
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+
+# --- Backends ---
+# Una entrada es (clave, etiquetas) -> bytes. Las etiquetas son pares
+# (empresa_id, coleccion) y permiten invalidar todo lo que depende de una colección.
+
+class BackendMemoria:
+    """LRU en proceso limitado por número de entradas y por bytes."""
+
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float):
+        self._cache = CacheTTL(maxsize=maxsize, ttl=ttl, max_peso=max_bytes, peso=len)
+
+    @property
+    def habilitado(self) -> bool:
+        return self._cache.habilitado
+
+    async def get(self, clave: str, etiquetas: tuple) -> Optional[bytes]:
+        return self._cache.get((etiquetas, clave))
+
+    async def set(self, clave: str, etiquetas: tuple, valor: bytes):
+        self._cache.set((etiquetas, clave), valor)
+
+    def invalidar(self, etiquetas: set):
+        self._cache.delete_where(lambda clave: not etiquetas.isdisjoint(clave[0]))
+
+    async def cerrar(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memoria", **self._cache.stats()}
+
+
+class BackendCompartido:
+    """Cache compartido entre workers sobre un cliente con la API de `redis.asyncio`.
+
+    Solo usa get/set/sadd/expire/smembers/delete, así que en pruebas basta
+    cualquier objeto local que implemente esas corrutinas.
+    """
+
+    def __init__(self, cliente, ttl: float, prefijo: str = "gp:respuestas:"):
+        self.cliente = cliente
+        self.ttl = int(ttl)
+        self.prefijo = prefijo
+        self.hits = 0
+        self.misses = 0
+        self.errores = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return self.ttl > 0
+
+    def _etiqueta(self, etiqueta) -> str:
+        empresa_id, coleccion = etiqueta
+        return f"{self.prefijo}etiqueta:{empresa_id}:{coleccion}"
+
+    async def get(self, clave: str, etiquetas: tuple) -> Optional[bytes]:
+        try:
+            valor = await self.cliente.get(self.prefijo + clave)
+        except Exception:
+            # Un backend caído no debe tumbar las lecturas: se trata como miss
+            self.errores += 1
+            logger.exception("Error leyendo del cache de respuestas")
+            valor = None
+        if valor is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return valor
+
+    async def set(self, clave: str, etiquetas: tuple, valor: bytes):
+        try:
+            await self.cliente.set(self.prefijo + clave, valor, ex=self.ttl)
+            for etiqueta in etiquetas:
+                await self.cliente.sadd(self._etiqueta(etiqueta), self.prefijo + clave)
+                await self.cliente.expire(self._etiqueta(etiqueta), self.ttl)
+        except Exception:
+            self.errores += 1
+            logger.exception("Error escribiendo en el cache de respuestas")
+
+    async def _invalidar(self, etiquetas: set):
+        try:
+            for etiqueta in etiquetas:
+                claves = await self.cliente.smembers(self._etiqueta(etiqueta))
+                await self.cliente.delete(self._etiqueta(etiqueta), *claves)
+        except Exception:
+            self.errores += 1
+            logger.exception("Error invalidando el cache de respuestas")
+
+    def invalidar(self, etiquetas: set):
+        # Se llama desde el after_commit (hilo del threadpool o greenlet de run_sync)
+        if response_cache.loop is not None:
+            asyncio.run_coroutine_threadsafe(self._invalidar(etiquetas), response_cache.loop)
+
+    async def cerrar(self):
+        await self.cliente.aclose()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "compartido",
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errores": self.errores,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def crear_backend():
+    if not RESPONSE_CACHE_URL:
+        return BackendMemoria(RESPONSE_CACHE_MAXSIZE, RESPONSE_CACHE_MAX_MB * 1024 * 1024, RESPONSE_CACHE_TTL)
+    try:
+        from redis import asyncio as redis_asyncio
+    except ImportError as exc:
+        raise RuntimeError("RESPONSE_CACHE_URL requiere el paquete 'redis' (pip install redis)") from exc
+    return BackendCompartido(redis_asyncio.from_url(RESPONSE_CACHE_URL), RESPONSE_CACHE_TTL)
+
+
+# --- Cache de respuestas ---
+
+@lru_cache(maxsize=None)
+def _adaptador(modelo) -> TypeAdapter:
+    return TypeAdapter(modelo)
+
+
+def serializar(modelo, payload) -> bytes:
+    """Mismo JSON que produciría FastAPI con `response_model=modelo`."""
+    adaptador = _adaptador(modelo)
+    return adaptador.dump_json(adaptador.validate_python(payload, from_attributes=True))
+
+
+class CacheRespuestas:
+    """Cache de respuestas JSON serializadas con protección contra estampidas.
+
+    Si varios requests piden la misma clave sin entrada, solo el primero
+    ejecuta la consulta; los demás esperan su resultado.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.loop = None
+        self._en_vuelo = {}
+        self.generacion = 0
+        self.coalescidos = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return self.backend.habilitado
+
+    async def iniciar(self):
+        self.loop = asyncio.get_running_loop()
+
+    async def cerrar(self):
+        await self.backend.cerrar()
+        self.loop = None
+
+    def invalidar(self, etiquetas: set):
+        self.generacion += 1
+        self.backend.invalidar(etiquetas)
+
+    async def obtener(self, clave: str, etiquetas: tuple, producir) -> tuple:
+        """Devuelve (bytes, hit). `producir` es una corrutina sin argumentos que genera los bytes."""
+        if not self.habilitado:
+            return await producir(), False
+
+        valor = await self.backend.get(clave, etiquetas)
+        if valor is not None:
+            return valor, True
+
+        pendiente = self._en_vuelo.get(clave)
+        if pendiente is not None:
+            self.coalescidos += 1
+            return await asyncio.shield(pendiente), True
+
+        pendiente = asyncio.get_running_loop().create_future()
+        self._en_vuelo[clave] = pendiente
+        generacion = self.generacion
+        try:
+            valor = await producir()
+        except asyncio.CancelledError:
+            pendiente.cancel()
+            raise
+        except BaseException as exc:
+            pendiente.set_exception(exc)
+            pendiente.exception()  # marcado como leído aunque nadie más lo espere
+            raise
+        else:
+            pendiente.set_result(valor)
+            # Una invalidación durante la consulta deja el resultado en duda: no se guarda
+            if generacion == self.generacion:
+                await self.backend.set(clave, etiquetas, valor)
+            return valor, False
+        finally:
+            del self._en_vuelo[clave]
+
+    async def responder(self, clave: str, etiquetas: tuple, producir, modelo, headers: Optional[dict] = None) -> Response:
+        """Respuesta JSON desde el cache o, si no está, desde `producir()` serializado con `modelo`.
+
+        Si `producir()` ya devuelve bytes (JSON_RAPIDO) se usan tal cual.
+        """
+        async def producir_bytes():
+            payload = await producir()
+            return payload if isinstance(payload, bytes) else serializar(modelo, payload)
+
+        contenido, hit = await self.obtener(clave, etiquetas, producir_bytes)
+        return Response(
+            content=contenido,
+            media_type="application/json",
+            headers={**(headers or {}), "X-Cache": "HIT" if hit else "MISS"},
+        )
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "en_vuelo": len(self._en_vuelo), "coalescidos": self.coalescidos}
+
+
+response_cache = CacheRespuestas(crear_backend())
+
+
+# --- Invalidación por escrituras ---
+# Las claves de los listados ya incluyen la versión de sus colecciones, así que
+# una escritura nunca deja servir datos viejos; invalidar libera esas entradas
+# enseguida y cubre el resumen público de empresas, que no tiene versión.
+
+_PENDIENTES = "respuestas_invalidadas"
+ETIQUETA_EMPRESAS = (None, "empresas")
+
+
+def _marcar(coleccion: Optional[str]):
+    def listener(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is not None:
+            etiqueta = (target.empresa_id, coleccion) if coleccion else ETIQUETA_EMPRESAS
+            session.info.setdefault(_PENDIENTES, set()).add(etiqueta)
+    return listener
+
+
+for _modelo, _coleccion in ((Proyecto, "proyectos"), (HistoriaUsuario, "historias"), (Ticket, "tickets"), (Empresa, None)):
+    for _evento in ("after_insert", "after_update", "after_delete"):
+        event.listen(_modelo, _evento, _marcar(_coleccion))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session):
+    pendientes = session.info.pop(_PENDIENTES, None)
+    if pendientes:
+        response_cache.invalidar(pendientes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendientes(session):
+    session.info.pop(_PENDIENTES, None)
@@ -1,10 +1,16 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 import os
 
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_WORKERS, PASSWORD_QUEUE_LIMIT
+
 #configracion de bycrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,6 +18,71 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Devuelve (valida, nuevo_hash); nuevo_hash solo si el costo configurado cambió."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordPool:
+    """Ejecuta bcrypt fuera del proceso del servidor, con cupo limitado.
+
+    Si ya hay `workers + queue_limit` operaciones en curso se rechaza con 503
+    en lugar de encolar sin límite y bloquear el resto del tráfico.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.capacidad = max(workers, 1) + queue_limit
+        self.en_curso = 0
+        self.rechazadas = 0
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.en_curso >= self.capacidad:
+            self.rechazadas += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servicio de autenticación saturado, intenta de nuevo",
+                headers={"Retry-After": "1"},
+            )
+        self.en_curso += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            self.en_curso -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "capacidad": self.capacidad,
+            "en_curso": self.en_curso,
+            "rechazadas": self.rechazadas,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(workers=PASSWORD_WORKERS, queue_limit=PASSWORD_QUEUE_LIMIT)
+
+# bcrypt es CPU puro: nunca debe correr dentro del event loop
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    return await password_pool.run(verify_and_update_password, plain_password, hashed_password)
+
 # configuracion de algoritmo y clave secreta
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
@@ -0,0 +1,56 @@
+"""Serialización rápida de listados: columnas de la consulta -> JSON con orjson.
+
+Con JSON_RAPIDO=true los listados de historias y tickets (y el tablero)
+consultan solo las columnas de su schema de respuesta y arman el JSON
+directamente, sin crear objetos del ORM ni validarlos uno por uno con
+Pydantic. El JSON es el mismo que produce `serializar` (mismos campos en el
+mismo orden, fechas ISO 8601 con "Z" en UTC) y el response_model de las rutas
+no cambia, así que el esquema OpenAPI tampoco.
+
+Los valores vienen de columnas con sus tipos y restricciones, por eso se
+puede saltar la validación; un schema con validadores o campos calculados
+no sirve para este camino.
+"""
+from typing import Optional
+
+import orjson
+
+from app.core.config import JSON_RAPIDO
+
+
+class Forma:
+    """Campos de `schema` en el orden en que Pydantic los serializa, leídos de las columnas de `modelo`.
+
+    `extras` son columnas que se consultan sin ir al JSON (p. ej. para agrupar).
+    """
+
+    def __init__(self, schema, modelo, extras: tuple = ()):
+        self.campos = tuple(schema.model_fields)
+        self.columnas = tuple(getattr(modelo, campo) for campo in (*self.campos, *extras))
+
+    def dicts(self, filas) -> list:
+        campos = self.campos
+        return [dict(zip(campos, fila)) for fila in filas]
+
+    def json(self, fila) -> str:
+        return orjson.dumps(dict(zip(self.campos, fila)), option=orjson.OPT_UTC_Z).decode()
+
+
+def forma_rapida(schema, modelo, extras: tuple = ()) -> Optional[Forma]:
+    """La `Forma` de `schema` si JSON_RAPIDO está activo; None si no."""
+    return Forma(schema, modelo, extras) if JSON_RAPIDO else None
+
+
+def con_forma(query, forma: Optional[Forma]):
+    """`query` reducida a las columnas de `forma` (sin forma, sin cambios)."""
+    return query if forma is None else query.with_entities(*forma.columnas)
+
+
+def contenido_pagina(forma: Optional[Forma], filas, siguiente_cursor, limite: int):
+    """Cuerpo de una `Pagina`: bytes ya serializados con forma, o el dict para `serializar`."""
+    if forma is None:
+        return {"items": filas, "siguiente_cursor": siguiente_cursor, "limite": limite}
+    return orjson.dumps(
+        {"items": forma.dicts(filas), "siguiente_cursor": siguiente_cursor, "limite": limite},
+        option=orjson.OPT_UTC_Z,
+    )
@@ -0,0 +1,104 @@
+import io
+
+from sqlalchemy import column, insert, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+# Filas por sentencia: 1000 filas x ~6 columnas queda lejos del límite de
+# parámetros de SQLite (32766) y de PostgreSQL (65535)
+FILAS_POR_INSERT = 1000
+
+
+def insertar_multifila(db: Session, tabla, valores: list, filas_por_insert: int = FILAS_POR_INSERT) -> list:
+    """INSERT ... VALUES (...), (...) RETURNING * por bloques; devuelve las filas ordenadas por id."""
+    creados = []
+    for inicio in range(0, len(valores), filas_por_insert):
+        bloque = valores[inicio:inicio + filas_por_insert]
+        creados.extend(db.execute(insert(tabla).values(bloque).returning(*tabla.c)).all())
+    return sorted(creados, key=lambda fila: fila.id)
+
+
+def _registros_copy(tabla, columnas: list, valores: list, dialect) -> list:
+    """Filas de `valores` como tuplas, con cada valor convertido por el tipo de su columna.
+
+    COPY no pasa por el bind de SQLAlchemy: sin esto un TypeDecorator (p. ej.
+    CodigoEnum, que guarda un SMALLINT) recibiría el valor de Python sin convertir.
+    """
+    procesadores = [tabla.c[c].type.dialect_impl(dialect).bind_processor(dialect) for c in columnas]
+    return [
+        tuple(
+            valor if procesar is None or valor is None else procesar(valor)
+            for procesar, valor in zip(procesadores, (fila[c] for c in columnas))
+        )
+        for fila in valores
+    ]
+
+
+def _campo_copy(valor) -> str:
+    # CSV de COPY: todo valor va entre comillas y solo \N sin comillas es NULL
+    return r"\N" if valor is None else '"' + str(valor).replace('"', '""') + '"'
+
+
+def _csv_copy(registros: list) -> str:
+    return "".join(",".join(_campo_copy(valor) for valor in registro) + "\n" for registro in registros)
+
+
+def _copiar_a_temporal(db: Session, tabla, columnas: list, valores: list) -> str:
+    """Carga `valores` con COPY en una tabla temporal con la forma de `tabla`; devuelve su nombre."""
+    temporal = f"_copia_{tabla.name}"
+    conexion = db.connection()
+    # ON COMMIT DROP: no sobrevive a la transacción (compatible con PgBouncer en modo transaction)
+    conexion.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {temporal} "
+        f"(LIKE {tabla.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+    )
+    crudo = conexion.connection.driver_connection
+    registros = _registros_copy(tabla, columnas, valores, conexion.dialect)
+    if conexion.dialect.driver == "asyncpg":
+        # Dentro de run_sync: await_only cede al event loop desde el greenlet
+        await_only(crudo.copy_records_to_table(temporal, records=registros, columns=columnas))
+    else:
+        buffer = io.StringIO(_csv_copy(registros))
+        with crudo.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {temporal} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+            )
+    return temporal
+
+
+def insertar_omitiendo_duplicados(db: Session, tabla, valores: list, indice: tuple) -> list:
+    """Inserta las filas que no chocan con el índice único `indice`; devuelve las insertadas ordenadas por id.
+
+    En PostgreSQL las filas entran con COPY a una tabla temporal y pasan con un
+    único INSERT ... SELECT ... ON CONFLICT DO NOTHING; en el resto con INSERT
+    multi-fila por bloques.
+    """
+    if not valores:
+        return []
+    columnas = list(valores[0])
+    conflicto = [tabla.c[c] for c in indice]
+
+    if db.get_bind().dialect.name == "postgresql":
+        temporal = _copiar_a_temporal(db, tabla, columnas, valores)
+        origen = table(temporal, *(column(c) for c in columnas))
+        stmt = (
+            postgresql.insert(tabla)
+            .from_select(columnas, select(*origen.c))
+            .on_conflict_do_nothing(index_elements=conflicto)
+            .returning(*tabla.c)
+        )
+        creados = db.execute(stmt).all()
+        db.execute(text(f"TRUNCATE {temporal}"))
+        return sorted(creados, key=lambda fila: fila.id)
+
+    creados = []
+    for inicio in range(0, len(valores), FILAS_POR_INSERT):
+        stmt = (
+            sqlite.insert(tabla)
+            .values(valores[inicio:inicio + FILAS_POR_INSERT])
+            .on_conflict_do_nothing(index_elements=conflicto)
+            .returning(*tabla.c)
+        )
+        creados.extend(db.execute(stmt).all())
+    return sorted(creados, key=lambda fila: fila.id)
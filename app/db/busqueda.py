@@ -0,0 +1,150 @@
+"""Búsqueda de texto completo con el índice nativo de cada base.
+
+- PostgreSQL: columna generada `busqueda` (tsvector) con índice GIN.
+- SQLite: tabla virtual FTS5 `<tabla>_fts` de contenido externo, sincronizada
+  con la tabla por triggers, con índices de prefijos de 2 y 3 caracteres (los
+  prefijos cortos son los que más términos expanden).
+
+Las dos ignoran mayúsculas y tildes ("accion" encuentra "acción"): en SQLite
+con `remove_diacritics` del tokenizer y en PostgreSQL con la configuración
+CONFIG_POSTGRESQL, una copia de 'simple' que pasa cada palabra por el
+diccionario `unaccent` (requiere la extensión del mismo nombre, incluida en
+contrib). `unaccent()` no es IMMUTABLE y no sirve en una columna generada;
+`to_tsvector` con una configuración fija sí.
+
+La columna y la tabla virtual no forman parte de los modelos: se crean con DDL
+de cada dialecto, en `create_all` con `indexar_texto` y en las bases existentes
+con la migración correspondiente.
+
+En SQLite, `batch_alter_table` sobre una tabla indexada la recrea y se pierden
+sus triggers: una migración así debe volver a crearlos y hacer 'rebuild'.
+"""
+import re
+
+from sqlalchemy import DDL, Float, and_, bindparam, column, event, func, literal_column, or_, table
+
+from app.db.paginacion import codificar_cursor, decodificar_cursor
+
+# Sin stemming ni stopwords y sin tildes: se comporta igual que el tokenizer
+# unicode61 con remove_diacritics de SQLite
+CONFIG_POSTGRESQL = "simple_sin_tildes"
+# Términos considerados por búsqueda; el resto se ignora
+MAX_TERMINOS = 8
+
+_PALABRA = re.compile(r"\w+")
+
+
+def terminos(texto: str) -> list:
+    """Palabras de la búsqueda del usuario, sin operadores ni comillas."""
+    return _PALABRA.findall(texto.lower())[:MAX_TERMINOS]
+
+
+def ddl_config_postgresql() -> list:
+    """Extensión unaccent y CONFIG_POSTGRESQL; se puede ejecutar más de una vez."""
+    return [
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        f"DO $$ BEGIN "
+        f"IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIG_POSTGRESQL}') THEN "
+        f"CREATE TEXT SEARCH CONFIGURATION {CONFIG_POSTGRESQL} (COPY = simple); "
+        f"ALTER TEXT SEARCH CONFIGURATION {CONFIG_POSTGRESQL} "
+        f"ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple; "
+        f"END IF; END $$",
+    ]
+
+
+def _ddl_postgresql(tabla: str, columnas: tuple) -> list:
+    # El primer campo (asunto / título) pesa más que el resto al ordenar
+    pesos = "ABCD"
+    vector = " || ".join(
+        f"setweight(to_tsvector('{CONFIG_POSTGRESQL}', coalesce({c}, '')), '{pesos[i]}')"
+        for i, c in enumerate(columnas)
+    )
+    return [
+        *ddl_config_postgresql(),
+        f"ALTER TABLE {tabla} ADD COLUMN busqueda tsvector GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX ix_{tabla}_busqueda ON {tabla} USING gin (busqueda)",
+    ]
+
+
+def _ddl_sqlite(tabla: str, columnas: tuple) -> list:
+    fts = f"{tabla}_fts"
+    lista = ", ".join(columnas)
+    nuevos = ", ".join(f"new.{c}" for c in columnas)
+    viejos = ", ".join(f"old.{c}" for c in columnas)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({lista}, content='{tabla}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END",
+    ]
+
+
+def indexar_texto(tabla, *columnas: str):
+    """Registra la DDL de búsqueda de `tabla` para que `create_all` / `drop_all` la incluyan."""
+    for sentencia in _ddl_postgresql(tabla.name, columnas):
+        event.listen(tabla, "after_create", DDL(sentencia).execute_if(dialect="postgresql"))
+    for sentencia in _ddl_sqlite(tabla.name, columnas):
+        event.listen(tabla, "after_create", DDL(sentencia).execute_if(dialect="sqlite"))
+    event.listen(tabla, "before_drop", DDL(f"DROP TABLE IF EXISTS {tabla.name}_fts").execute_if(dialect="sqlite"))
+
+
+def _coincidencias(query, modelo, palabras: list):
+    """Filtra `query` por las filas que contienen todas las palabras (como prefijo).
+
+    Devuelve (query, relevancia); mayor relevancia = mejor coincidencia.
+    """
+    tabla = modelo.__table__.name
+    if query.session.get_bind().dialect.name == "postgresql":
+        consulta = func.to_tsquery(
+            CONFIG_POSTGRESQL, bindparam("busqueda", " & ".join(f"{p}:*" for p in palabras))
+        )
+        vector = literal_column(f"{tabla}.busqueda")
+        return query.filter(vector.op("@@")(consulta)), func.ts_rank_cd(vector, consulta, type_=Float)
+
+    fts = table(f"{tabla}_fts", column("rowid"))
+    # En FTS5 el nombre de la tabla hace de columna para MATCH y bm25()
+    fts_columna = literal_column(fts.name)
+    query = query.join(fts, fts.c.rowid == modelo.id).filter(
+        fts_columna.op("MATCH")(bindparam("busqueda", " ".join(f'"{p}"*' for p in palabras)))
+    )
+    # bm25 es menor cuanto mejor la coincidencia
+    return query, -func.bm25(fts_columna, type_=Float)
+
+
+def buscar(query, modelo, texto: str, cursor=None, limite=50, forma=None):
+    """Filtra `query` (sobre `modelo`) por `texto` y pagina por relevancia.
+
+    El cursor es (relevancia, id): el orden es relevancia descendente y, a
+    igual relevancia, id ascendente. Devuelve (filas, siguiente_cursor); con
+    `forma` (app.core.serializacion) las filas son solo sus columnas.
+    """
+    palabras = terminos(texto)
+    if not palabras:
+        return [], None
+    if forma is not None:
+        query = query.with_entities(*forma.columnas)
+
+    query, relevancia = _coincidencias(query, modelo, palabras)
+    relevancia = relevancia.label("relevancia")
+    if cursor:
+        valor, ultimo_id = decodificar_cursor(cursor, (relevancia, modelo.id))
+        query = query.filter(or_(
+            relevancia.element < valor,
+            and_(relevancia.element == valor, modelo.id > ultimo_id),
+        ))
+
+    filas = query.add_columns(relevancia).order_by(relevancia.desc(), modelo.id.asc()).limit(limite + 1).all()
+
+    siguiente_cursor = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente_cursor = codificar_cursor([ultima.relevancia, ultima.id if forma is not None else ultima[0].id])
+    if forma is not None:
+        return [fila[:-1] for fila in filas], siguiente_cursor
+    return [fila[0] for fila in filas], siguiente_cursor
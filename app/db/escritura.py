@@ -0,0 +1,66 @@
+"""Escrituras de una fila en una sola sentencia con RETURNING.
+
+Reemplazan el SELECT de pertenencia + flush del ORM + refresh tras el commit:
+la condición de empresa va en la misma sentencia y la fila devuelta se
+serializa tal cual. Son sentencias Core y no pasan por los listeners de
+app/models/consistencia.py: quien las usa aplica las estadísticas y las
+versiones de colecciones (como en las operaciones en lote).
+"""
+from sqlalchemy import insert, literal, select, update
+
+
+def insertar_fila(db, tabla, valores: dict):
+    """INSERT ... RETURNING * de una fila; devuelve la fila creada."""
+    return db.execute(insert(tabla).values(**valores).returning(*tabla.c)).one()
+
+
+def insertar_bajo_padre(db, tabla, valores: dict, padre, padre_id: int, empresa_id: int):
+    """INSERT ... SELECT ... FROM padre WHERE padre.id = :padre_id AND padre.empresa_id = :empresa_id RETURNING *.
+
+    El empresa_id de la fila nueva se copia del padre. Devuelve la fila creada
+    o None si el padre no existe o es de otra empresa (no se inserta nada).
+    """
+    origen = select(
+        *(literal(valor, tabla.c[columna].type) for columna, valor in valores.items()),
+        padre.c.empresa_id,
+    ).where(padre.c.id == padre_id, padre.c.empresa_id == empresa_id)
+    stmt = insert(tabla).from_select([*valores, "empresa_id"], origen).returning(*tabla.c)
+    return db.execute(stmt).first()
+
+
+def actualizar_de_empresa(db, tabla, fila_id: int, empresa_id: int, valores: dict, anteriores: tuple = ()):
+    """UPDATE tabla SET ... WHERE id = :fila_id AND empresa_id = :empresa_id RETURNING *.
+
+    Devuelve (fila actualizada, {columna: valor previo} de `anteriores`), o
+    (None, None) si la fila no existe o es de otra empresa.
+
+    En PostgreSQL los valores previos salen de la misma sentencia: un
+    SELECT ... FOR UPDATE en el FROM bloquea la fila antes de leerlos, así que
+    una escritura concurrente no los deja desactualizados. SQLite no permite
+    devolver columnas del FROM y los lee antes con un SELECT (sin red de por
+    medio, y con un solo escritor a la vez).
+    """
+    condiciones = (tabla.c.id == fila_id, tabla.c.empresa_id == empresa_id)
+    stmt = update(tabla).where(*condiciones).values(**valores)
+    if not anteriores:
+        return db.execute(stmt.returning(*tabla.c)).first(), None
+
+    if db.get_bind().dialect.name == "postgresql":
+        previa = (
+            select(tabla.c.id, *(tabla.c[c] for c in anteriores))
+            .where(*condiciones)
+            .with_for_update()
+            .subquery("anterior")
+        )
+        stmt = stmt.where(tabla.c.id == previa.c.id).returning(
+            *tabla.c, *(previa.c[c].label(f"anterior_{c}") for c in anteriores)
+        )
+        fila = db.execute(stmt).first()
+        if fila is None:
+            return None, None
+        return fila, {c: fila._mapping[f"anterior_{c}"] for c in anteriores}
+
+    previa = db.execute(select(*(tabla.c[c] for c in anteriores)).where(*condiciones)).first()
+    if previa is None:
+        return None, None
+    return db.execute(stmt.returning(*tabla.c)).first(), dict(zip(anteriores, previa))
@@ -0,0 +1,32 @@
+from app.db.paginacion import valor_comparable
+
+# orden -> columnas del keyset; el id final desempata y hace el orden total
+ORDENES = {
+    "id": ("id",),
+    "-id": ("id",),
+    "fecha_creacion": ("fecha_creacion", "id"),
+    "-fecha_creacion": ("fecha_creacion", "id"),
+}
+
+
+def filtrar_listado(query, modelo, filtros):
+    """Aplica los filtros de estado, prioridad y fecha de creación de un listado.
+
+    Devuelve (query, columnas, descendente), listo para `paginar`. Con
+    `filtros=None` el listado queda sin filtrar y ordenado por id.
+    """
+    if filtros is None:
+        return query, (modelo.id,), False
+
+    dialecto = query.session.get_bind().dialect.name
+    if filtros.estado:
+        query = query.filter(modelo.estado.in_(filtros.estado))
+    if filtros.prioridad:
+        query = query.filter(modelo.prioridad.in_(filtros.prioridad))
+    if filtros.creado_desde is not None:
+        query = query.filter(modelo.fecha_creacion >= valor_comparable(dialecto, filtros.creado_desde))
+    if filtros.creado_hasta is not None:
+        query = query.filter(modelo.fecha_creacion < valor_comparable(dialecto, filtros.creado_hasta))
+
+    columnas = tuple(getattr(modelo, nombre) for nombre in ORDENES[filtros.orden])
+    return query, columnas, filtros.orden.startswith("-")
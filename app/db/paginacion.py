@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import String, literal, tuple_
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def codificar_cursor(valores) -> str:
+    crudo = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, columnas) -> list:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(crudo)
+        if not isinstance(valores, list) or len(valores) != len(columnas):
+            raise CursorInvalido(cursor)
+        return [
+            datetime.fromisoformat(v) if columna.type.python_type is datetime else columna.type.python_type(v)
+            for columna, v in zip(columnas, valores)
+        ]
+    except CursorInvalido:
+        raise
+    except (ValueError, TypeError, NotImplementedError):
+        raise CursorInvalido(cursor)
+
+
+def valor_comparable(dialecto: str, valor):
+    """`valor` listo para compararse en SQL con una columna de la tabla.
+
+    SQLite guarda las fechas como texto UTC: CURRENT_TIMESTAMP escribe
+    'YYYY-MM-DD HH:MM:SS' pero SQLAlchemy enlaza con microsegundos, así que el
+    mismo instante no compara como igual (y el keyset se salta los empates).
+    """
+    if dialecto != "sqlite" or not isinstance(valor, datetime):
+        return valor
+    if valor.tzinfo is not None:
+        valor = valor.astimezone(timezone.utc).replace(tzinfo=None)
+    return literal(valor.isoformat(sep=" ", timespec="microseconds" if valor.microsecond else "seconds"), String())
+
+
+def paginar(query, columnas, cursor=None, limite=50, descendente=False):
+    """Paginación keyset: filtra por la última clave vista en vez de usar OFFSET.
+
+    `columnas` debe terminar en una columna única (normalmente el id) para que
+    el orden sea total. Devuelve (filas, siguiente_cursor).
+    """
+    if cursor:
+        dialecto = query.session.get_bind().dialect.name
+        valores = [valor_comparable(dialecto, v) for v in decodificar_cursor(cursor, columnas)]
+        if len(columnas) == 1:
+            clave, valor = columnas[0], valores[0]
+        else:
+            clave, valor = tuple_(*columnas), tuple_(*valores)
+        query = query.filter(clave < valor if descendente else clave > valor)
+
+    orden = [c.desc() if descendente else c.asc() for c in columnas]
+    filas = query.order_by(*orden).limit(limite + 1).all()
+
+    siguiente_cursor = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente_cursor = codificar_cursor([getattr(ultima, c.key) for c in columnas])
+    return filas, siguiente_cursor
@@ -0,0 +1,105 @@
+import threading
+from time import perf_counter
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class EsperaPool:
+    """Acumula cuánto tardan los checkouts en obtener una conexión del pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.segundos_total = 0.0
+        self.segundos_max = 0.0
+
+    def registrar(self, segundos: float, timeout: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.segundos_total += segundos
+            if segundos > self.segundos_max:
+                self.segundos_max = segundos
+            if timeout:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            promedio = self.segundos_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "espera_total_s": round(self.segundos_total, 6),
+                "espera_promedio_s": round(promedio, 6),
+                "espera_max_s": round(self.segundos_max, 6),
+            }
+
+
+class _EsperaMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.espera = EsperaPool()
+
+    def recreate(self):
+        # dispose() recrea el pool: conservamos el acumulado de esperas
+        nuevo = super().recreate()
+        nuevo.espera = self.espera
+        return nuevo
+
+    def _do_get(self):
+        inicio = perf_counter()
+        try:
+            conexion = super()._do_get()
+        except PoolTimeoutError:
+            self.espera.registrar(perf_counter() - inicio, timeout=True)
+            raise
+        self.espera.registrar(perf_counter() - inicio)
+        return conexion
+
+
+class MedidoQueuePool(_EsperaMixin, QueuePool):
+    pass
+
+
+class MedidoAsyncAdaptedQueuePool(_EsperaMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def estado_pool(engine) -> dict:
+    pool = engine.pool
+    estado = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        estado.update({
+            "tamano": pool.size(),
+            "en_uso": pool.checkedout(),
+            "libres": pool.checkedin(),
+            # overflow() es negativo mientras no se haya llenado el pool base
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    espera = getattr(pool, "espera", None)
+    if espera is not None:
+        estado["espera"] = espera.snapshot()
+    return estado
+
+
+def metricas_pool(engine) -> list:
+    """estado_pool en forma de métricas de Prometheus: [(nombre, tipo, ayuda, valor)]."""
+    estado = estado_pool(engine)
+    metricas = []
+    if "tamano" in estado:
+        metricas += [
+            ("db_pool_size", "gauge", "Conexiones del pool base.", estado["tamano"]),
+            ("db_pool_checked_out", "gauge", "Conexiones en uso.", estado["en_uso"]),
+            ("db_pool_checked_in", "gauge", "Conexiones libres.", estado["libres"]),
+            ("db_pool_overflow", "gauge", "Conexiones abiertas por encima del pool base.", estado["overflow"]),
+        ]
+    espera = estado.get("espera")
+    if espera is not None:
+        metricas += [
+            ("db_pool_checkouts_total", "counter", "Conexiones obtenidas del pool.", espera["checkouts"]),
+            ("db_pool_timeouts_total", "counter", "Esperas de conexión que vencieron.", espera["timeouts"]),
+            ("db_pool_wait_seconds_total", "counter", "Tiempo total esperando una conexión.", espera["espera_total_s"]),
+        ]
+    return metricas
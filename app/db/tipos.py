@@ -0,0 +1,28 @@
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class CodigoEnum(TypeDecorator):
+    """Columna SMALLINT que se lee y escribe como un miembro de `enum`.
+
+    El código es la posición del miembro (desde 1): reordenar o quitar miembros
+    cambia el significado de los datos guardados, solo se agregan al final.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum):
+        super().__init__()
+        self.enum = enum
+        self._codigos = {miembro: codigo for codigo, miembro in enumerate(enum, start=1)}
+        self._miembros = {codigo: miembro for miembro, codigo in self._codigos.items()}
+
+    def codigo(self, valor) -> int:
+        return self._codigos[self.enum(valor)]
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.codigo(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self._miembros[value]
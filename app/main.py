@@ -1,9 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Request
-from app.routers import auth_empresa, usuarios, proyectos, historias_usuario, tickets
+from fastapi.responses import JSONResponse, Response
+from app.core.actor_cache import iniciar_canal, detener_canal
+from app.core.consultas import presupuesto_consultas
+from app.core.metricas import CONTENT_TYPE, MetricasMiddleware, exponer
+from app.core.perfiles import PerfilesMiddleware
+from app.core.response_cache import response_cache
+from app.core.security import password_pool
+from app.db.paginacion import CursorInvalido
+from app.db.session import dispose_engines, SQLALCHEMY_DATABASE_URL
+from app.routers import auth_empresa, usuarios, proyectos, historias_usuario, tickets, metricas, importaciones
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    iniciar_canal(SQLALCHEMY_DATABASE_URL)
+    await response_cache.iniciar()
+    yield
+    detener_canal()
+    await response_cache.cerrar()
+    password_pool.shutdown()
+    await dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(CursorInvalido)
+async def cursor_invalido_handler(request: Request, exc: CursorInvalido):
+    return JSONResponse(status_code=400, content={"detail": "Cursor de paginación inválido"})
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,15 +42,27 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PerfilesMiddleware)
+# Último en agregarse = el más externo: mide también lo que hacen los demás middlewares
+app.add_middleware(MetricasMiddleware)
 
 @app.get("/test")
+@presupuesto_consultas(0)
 async def test(request: Request):
     print("Origin: ", request.headers.get("origin"))
     print("IP: ", request.client.host if request.client else "No client")
     return {"message": "Hola no mas cartera API!"}
 
+@app.get("/metrics", include_in_schema=False)
+@presupuesto_consultas(0)
+async def metrics():
+    """Métricas en formato de texto de Prometheus (ver app/core/metricas.py)."""
+    return Response(exponer(), media_type=CONTENT_TYPE)
+
 app.include_router(auth_empresa.router, prefix="/auth", tags=["Autenticación Empresa"])
 app.include_router(usuarios.router, prefix="/usuarios", tags=["Usuarios"])
 app.include_router(proyectos.router, prefix="/proyectos", tags=["Proyectos"])
 app.include_router(historias_usuario.router, prefix="/historias-usuario", tags=["Historias de Usuario"])
 app.include_router(tickets.router, prefix="/tickets", tags=["Tickets"])
+app.include_router(importaciones.router, prefix="/importaciones", tags=["Importaciones"])
+app.include_router(metricas.router, prefix="/metricas", tags=["Métricas"])
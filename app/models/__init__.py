@@ -3,7 +3,11 @@ from app.models.usuario import Usuario
 from app.models.proyecto import Proyecto
 from app.models.historia_usuario import HistoriaUsuario
 from app.models.ticket import Ticket
+from app.models.estadistica_ticket import EstadisticaTicket
+from app.models.version_coleccion import VersionColeccion
+from app.models.importacion import Importacion, ErrorImportacion
+from app.models import consistencia  # noqa: F401  listeners de datos denormalizados
 
 
 # Exporta los modelos para que Alembic los vea
-__all__ = ["Empresa", "Usuario", "Proyecto", "HistoriaUsuario", "Ticket"]
+__all__ = ["Empresa", "Usuario", "Proyecto", "HistoriaUsuario", "Ticket", "EstadisticaTicket", "VersionColeccion", "Importacion", "ErrorImportacion"]
@@ -0,0 +1,231 @@
+# app/models/consistencia.py
+# Mantiene sincronizados los datos denormalizados: las copias de empresa_id en
+# historias_usuario y tickets, los conteos de estadisticas_tickets y las
+# versiones de colecciones usadas para los ETags
+from collections import Counter
+
+from sqlalchemy import delete, event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.proyecto import Proyecto
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.ticket import Ticket
+from app.models.estadistica_ticket import EstadisticaTicket
+from app.models.version_coleccion import VersionColeccion
+from app.schemas.enums import Prioridad
+from app.schemas.ticket import EstadoTicket
+
+
+def _upsert_sumando(connection, tabla, filas: list, indice: tuple, columna: str, reemplazar: tuple = ()):
+    """INSERT ... ON CONFLICT (indice) DO UPDATE SET columna = columna + excluded.columna."""
+    dialecto = postgresql if connection.dialect.name == "postgresql" else sqlite
+    # Mismo orden de filas en todas las transacciones: evita deadlocks entre escrituras
+    filas = sorted(filas, key=lambda fila: tuple(fila[c] for c in indice))
+    stmt = dialecto.insert(tabla).values(filas)
+    set_ = {columna: tabla.c[columna] + stmt.excluded[columna]}
+    set_.update({c: stmt.excluded[c] for c in reemplazar})
+    connection.execute(stmt.on_conflict_do_update(index_elements=[tabla.c[c] for c in indice], set_=set_))
+
+
+def _cambio(target, atributo: str) -> bool:
+    return inspect(target).attrs[atributo].history.has_changes()
+
+
+@event.listens_for(HistoriaUsuario, "before_insert")
+@event.listens_for(HistoriaUsuario, "before_update")
+def _empresa_de_historia(mapper, connection, target):
+    if target.empresa_id is None or _cambio(target, "proyecto_id"):
+        target.empresa_id = connection.scalar(
+            select(Proyecto.empresa_id).where(Proyecto.id == target.proyecto_id)
+        )
+
+
+@event.listens_for(Ticket, "before_insert")
+@event.listens_for(Ticket, "before_update")
+def _empresa_de_ticket(mapper, connection, target):
+    if target.empresa_id is None or _cambio(target, "historia_usuario_id"):
+        target.empresa_id = connection.scalar(
+            select(HistoriaUsuario.empresa_id).where(HistoriaUsuario.id == target.historia_usuario_id)
+        )
+
+
+@event.listens_for(HistoriaUsuario, "after_update")
+def _mover_tickets_de_historia(mapper, connection, target):
+    if _cambio(target, "empresa_id"):
+        connection.execute(
+            update(Ticket.__table__)
+            .where(Ticket.__table__.c.historia_usuario_id == target.id)
+            .values(empresa_id=target.empresa_id)
+        )
+        connection.execute(
+            update(EstadisticaTicket.__table__)
+            .where(EstadisticaTicket.__table__.c.historia_usuario_id == target.id)
+            .values(empresa_id=target.empresa_id)
+        )
+
+
+@event.listens_for(Proyecto, "after_update")
+def _mover_hijos_de_proyecto(mapper, connection, target):
+    if _cambio(target, "empresa_id"):
+        historias = HistoriaUsuario.__table__
+        connection.execute(
+            update(historias)
+            .where(historias.c.proyecto_id == target.id)
+            .values(empresa_id=target.empresa_id)
+        )
+        connection.execute(
+            update(Ticket.__table__)
+            .where(Ticket.__table__.c.historia_usuario_id.in_(
+                select(historias.c.id).where(historias.c.proyecto_id == target.id)
+            ))
+            .values(empresa_id=target.empresa_id)
+        )
+        connection.execute(
+            update(EstadisticaTicket.__table__)
+            .where(EstadisticaTicket.__table__.c.historia_usuario_id.in_(
+                select(historias.c.id).where(historias.c.proyecto_id == target.id)
+            ))
+            .values(empresa_id=target.empresa_id)
+        )
+
+
+# --- Estadísticas de tickets ---
+
+_CLAVE = ("historia_usuario_id", "empresa_id", "estado", "prioridad")
+_DELTAS = "deltas_estadisticas"
+_HISTORIAS_BORRADAS = "historias_borradas"
+
+
+def clave_estadistica(fila):
+    """(historia, empresa, estado, prioridad) de un ticket o de una fila con esas columnas."""
+    return (fila.historia_usuario_id, fila.empresa_id, EstadoTicket(fila.estado), Prioridad(fila.prioridad))
+
+
+def sumar_estadisticas(connection, deltas: Counter):
+    """Aplica los deltas con un único INSERT ... ON CONFLICT DO UPDATE."""
+    filas = [
+        {"historia_usuario_id": h, "empresa_id": e, "estado": estado, "prioridad": prioridad, "total": n}
+        for (h, e, estado, prioridad), n in deltas.items() if n
+    ]
+    if filas:
+        _upsert_sumando(
+            connection, EstadisticaTicket.__table__, filas,
+            ("historia_usuario_id", "estado", "prioridad"), "total", reemplazar=("empresa_id",),
+        )
+
+
+def _acumular(target, clave, n: int):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_DELTAS, Counter())[clave] += n
+
+
+def _clave_anterior(connection, target):
+    estado = inspect(target)
+    valores = {}
+    for atributo in _CLAVE:
+        historial = estado.attrs[atributo].history
+        previos = historial.deleted or historial.unchanged
+        if not previos:
+            break
+        valores[atributo] = previos[0]
+    else:
+        return (valores["historia_usuario_id"], valores["empresa_id"],
+                EstadoTicket(valores["estado"]), Prioridad(valores["prioridad"]))
+
+    # Atributo asignado sin haberse cargado: el valor previo solo está en la base
+    tickets = Ticket.__table__
+    fila = connection.execute(
+        select(*(tickets.c[a] for a in _CLAVE)).where(tickets.c.id == target.id)
+    ).one()
+    return clave_estadistica(fila)
+
+
+@event.listens_for(Ticket, "after_insert")
+def _contar_ticket_nuevo(mapper, connection, target):
+    _acumular(target, clave_estadistica(target), 1)
+
+
+@event.listens_for(Ticket, "before_update")
+def _mover_conteo_de_ticket(mapper, connection, target):
+    estado = inspect(target)
+    if not any(estado.attrs[atributo].history.has_changes() for atributo in _CLAVE):
+        return
+    _acumular(target, _clave_anterior(connection, target), -1)
+    _acumular(target, clave_estadistica(target), 1)
+
+
+@event.listens_for(Ticket, "after_delete")
+def _descontar_ticket(mapper, connection, target):
+    _acumular(target, clave_estadistica(target), -1)
+
+
+@event.listens_for(HistoriaUsuario, "after_delete")
+def _marcar_historia_borrada(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_HISTORIAS_BORRADAS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_flush")
+def _aplicar_deltas(session, flush_context):
+    deltas = session.info.pop(_DELTAS, None)
+    borradas = session.info.pop(_HISTORIAS_BORRADAS, None)
+    if borradas:
+        # Los conteos de una historia borrada se van con ella: sumarle los
+        # descuentos de sus tickets insertaría filas que apuntan a una
+        # historia que ya no existe (la FK las rechaza)
+        if deltas:
+            deltas = Counter({clave: n for clave, n in deltas.items() if clave[0] not in borradas})
+        estadisticas = EstadisticaTicket.__table__
+        session.connection().execute(
+            delete(estadisticas).where(estadisticas.c.historia_usuario_id.in_(borradas))
+        )
+    if deltas:
+        sumar_estadisticas(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_deltas(session):
+    session.info.pop(_DELTAS, None)
+    session.info.pop(_HISTORIAS_BORRADAS, None)
+
+
+# --- Versiones de colecciones (ETags) ---
+
+_COLECCIONES = {Proyecto: "proyectos", HistoriaUsuario: "historias", Ticket: "tickets"}
+_MODIFICADAS = "colecciones_modificadas"
+
+
+def incrementar_versiones(connection, claves):
+    """Suma 1 a la versión de cada (empresa_id, coleccion)."""
+    filas = [{"empresa_id": empresa_id, "coleccion": coleccion, "version": 1} for empresa_id, coleccion in set(claves)]
+    if filas:
+        _upsert_sumando(connection, VersionColeccion.__table__, filas, ("empresa_id", "coleccion"), "version")
+
+
+def _marcar_coleccion(coleccion: str):
+    def listener(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault(_MODIFICADAS, set()).add((target.empresa_id, coleccion))
+    return listener
+
+
+for _modelo, _coleccion in _COLECCIONES.items():
+    for _evento in ("after_insert", "after_update", "after_delete"):
+        event.listen(_modelo, _evento, _marcar_coleccion(_coleccion))
+
+
+@event.listens_for(Session, "after_flush")
+def _aplicar_versiones(session, flush_context):
+    modificadas = session.info.pop(_MODIFICADAS, None)
+    if modificadas:
+        incrementar_versiones(session.connection(), modificadas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_versiones(session):
+    session.info.pop(_MODIFICADAS, None)
+
@@ -0,0 +1,24 @@
+# app/models/estadistica_ticket.py
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.db.base import Base
+from app.db.tipos import CodigoEnum
+from app.schemas.enums import Prioridad
+from app.schemas.ticket import EstadoTicket
+
+class EstadisticaTicket(Base):
+    """Conteo de tickets por historia, estado y prioridad.
+
+    Se mantiene en la misma transacción que las escrituras de tickets
+    (ver app/models/consistencia.py), así las estadísticas no escanean tickets.
+    """
+    __tablename__ = "estadisticas_tickets"
+    __table_args__ = (
+        Index("ix_estadisticas_tickets_empresa_id", "empresa_id"),
+    )
+
+    historia_usuario_id = Column(Integer, ForeignKey("historias_usuario.id", ondelete="CASCADE"), primary_key=True)
+    estado = Column(CodigoEnum(EstadoTicket), primary_key=True)
+    prioridad = Column(CodigoEnum(Prioridad), primary_key=True)
+    empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), nullable=False)
+
+    total = Column(Integer, nullable=False, default=0)
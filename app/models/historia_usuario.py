@@ -1,21 +1,43 @@
 # app/models/historia_usuario.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.busqueda import indexar_texto
+from app.db.tipos import CodigoEnum
+from app.schemas.enums import Prioridad
+from app.schemas.historia_usuario import EstadoHistoria
 
 class HistoriaUsuario(Base):
     __tablename__ = "historias_usuario"
+    __table_args__ = (
+        Index("ix_historias_usuario_proyecto_id_id", "proyecto_id", "id"),
+        # Filtros y orden de los listados (app/db/filtros.py)
+        Index("ix_historias_usuario_proyecto_id_estado_id", "proyecto_id", "estado", "id"),
+        Index("ix_historias_usuario_proyecto_id_fecha_creacion_id", "proyecto_id", "fecha_creacion", "id"),
+        Index("ix_historias_usuario_empresa_id_estado", "empresa_id", "estado"),
+        Index("ix_historias_usuario_empresa_id_fecha_actualizacion", "empresa_id", "fecha_actualizacion"),
+        Index("ix_historias_usuario_empresa_id_clave_externa", "empresa_id", "clave_externa", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id", ondelete="CASCADE"), nullable=False)
+    # Copia de proyectos.empresa_id: permite filtrar por empresa sin join
+    empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), nullable=False)
 
     titulo = Column(String(255), nullable=False)
     descripcion = Column(Text, nullable=True)
-    estado = Column(String(50), default="pendiente")
-    prioridad = Column(String(50), default="media")
+    estado = Column(CodigoEnum(EstadoHistoria), nullable=False, default=EstadoHistoria.pendiente)
+    prioridad = Column(CodigoEnum(Prioridad), nullable=False, default=Prioridad.media)
+    # Identificador en el sistema de origen de una importación (único por empresa)
+    clave_externa = Column(String(255), nullable=True)
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    # Última escritura; la usa la exportación incremental (updated_since)
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     proyecto = relationship("Proyecto", back_populates="historias_usuario")
 
     # Correcto: relación con tickets
     tickets = relationship("Ticket", back_populates="historia_usuario", cascade="all, delete")
+
+
+indexar_texto(HistoriaUsuario.__table__, "titulo", "descripcion")
@@ -0,0 +1,44 @@
+# app/models/importacion.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+class Importacion(Base):
+    """Carga masiva de proyectos, historias o tickets desde un archivo.
+
+    `filas_procesadas` se actualiza en la misma transacción que cada lote, así
+    que una importación interrumpida se reanuda saltando exactamente esas filas.
+    """
+    __tablename__ = "importaciones"
+    __table_args__ = (
+        Index("ix_importaciones_empresa_id_id", "empresa_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), nullable=False)
+
+    tipo = Column(String(20), nullable=False)      # proyectos, historias, tickets
+    formato = Column(String(10), nullable=False)   # csv, ndjson
+    estado = Column(String(20), nullable=False, default="en_curso")  # en_curso, completada
+    filas_procesadas = Column(Integer, nullable=False, default=0)
+    filas_creadas = Column(Integer, nullable=False, default=0)
+    # Filas cuya clave_externa ya existía (p. ej. al repetir un lote)
+    filas_existentes = Column(Integer, nullable=False, default=0)
+    filas_error = Column(Integer, nullable=False, default=0)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    errores = relationship("ErrorImportacion", cascade="all, delete", passive_deletes=True)
+
+
+class ErrorImportacion(Base):
+    __tablename__ = "errores_importacion"
+    __table_args__ = (
+        Index("ix_errores_importacion_importacion_id_linea", "importacion_id", "linea"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    importacion_id = Column(Integer, ForeignKey("importaciones.id", ondelete="CASCADE"), nullable=False)
+    linea = Column(Integer, nullable=False)  # número de registro en el archivo (1 = primer dato)
+    detalle = Column(Text, nullable=False)
+    datos = Column(Text, nullable=True)      # el registro original, en JSON
@@ -1,17 +1,26 @@
 # app/models/proyecto.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Proyecto(Base):
     __tablename__ = "proyectos"
+    __table_args__ = (
+        Index("ix_proyectos_empresa_id_id", "empresa_id", "id"),
+        Index("ix_proyectos_empresa_id_fecha_actualizacion", "empresa_id", "fecha_actualizacion"),
+        Index("ix_proyectos_empresa_id_clave_externa", "empresa_id", "clave_externa", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), nullable=False)
 
     nombre = Column(String(255), nullable=False)
     descripcion = Column(String(500), nullable=True)
+    # Identificador en el sistema de origen de una importación (único por empresa)
+    clave_externa = Column(String(255), nullable=True)
     fecha_registro = Column(DateTime(timezone=True), server_default=func.now())
+    # Última escritura; la usa la exportación incremental (updated_since)
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     empresa = relationship("Empresa", back_populates="proyectos")
     historias_usuario = relationship("HistoriaUsuario", back_populates="proyecto", cascade="all, delete")
@@ -1,19 +1,42 @@
 # app/models/ticket.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.busqueda import indexar_texto
+from app.db.tipos import CodigoEnum
+from app.schemas.enums import Prioridad
+from app.schemas.ticket import EstadoTicket
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_historia_usuario_id_id", "historia_usuario_id", "id"),
+        # Filtros y orden de los listados (app/db/filtros.py)
+        Index("ix_tickets_historia_usuario_id_estado_id", "historia_usuario_id", "estado", "id"),
+        Index("ix_tickets_empresa_id_id", "empresa_id", "id"),
+        Index("ix_tickets_empresa_id_estado_prioridad_id", "empresa_id", "estado", "prioridad", "id"),
+        Index("ix_tickets_empresa_id_fecha_creacion_id", "empresa_id", "fecha_creacion", "id"),
+        Index("ix_tickets_empresa_id_fecha_actualizacion", "empresa_id", "fecha_actualizacion"),
+        Index("ix_tickets_empresa_id_clave_externa", "empresa_id", "clave_externa", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     historia_usuario_id = Column(Integer, ForeignKey("historias_usuario.id", ondelete="CASCADE"), nullable=False)
+    # Copia de proyectos.empresa_id (vía la historia): permite filtrar por empresa sin joins
+    empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), nullable=False)
 
     asunto = Column(String(255), nullable=False)
     descripcion = Column(Text, nullable=True)
-    estado = Column(String(50), default="abierto")
-    prioridad = Column(String(50), default="media")
+    estado = Column(CodigoEnum(EstadoTicket), nullable=False, default=EstadoTicket.abierto)
+    prioridad = Column(CodigoEnum(Prioridad), nullable=False, default=Prioridad.media)
+    # Identificador en el sistema de origen de una importación (único por empresa)
+    clave_externa = Column(String(255), nullable=True)
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    # Última escritura; la usa la exportación incremental (updated_since)
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relación correcta con historia_usuario
     historia_usuario = relationship("HistoriaUsuario", back_populates="tickets")
+
+
+indexar_texto(Ticket.__table__, "asunto", "descripcion")
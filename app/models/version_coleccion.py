@@ -0,0 +1,15 @@
+# app/models/version_coleccion.py
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.db.base import Base
+
+class VersionColeccion(Base):
+    """Contador de cambios por empresa y colección ("proyectos", "historias", "tickets").
+
+    Cada escritura lo incrementa en su misma transacción; los ETags de los
+    listados se calculan a partir de él sin consultar la colección.
+    """
+    __tablename__ = "versiones_colecciones"
+
+    empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), primary_key=True)
+    coleccion = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
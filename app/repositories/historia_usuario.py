@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Session
+from app.models.historia_usuario import HistoriaUsuario
+
+
+def query_historias_de_empresa(db: Session, empresa_id: int):
+    return db.query(HistoriaUsuario).filter(HistoriaUsuario.empresa_id == empresa_id)
+
+
+def historia_de_empresa(db: Session, historia_id: int, empresa_id: int):
+    """Historia si existe y pertenece a la empresa, resuelto en un solo SELECT."""
+    return query_historias_de_empresa(db, empresa_id).filter(HistoriaUsuario.id == historia_id).first()
+
+
+def ids_historias_de_empresa(db: Session, historia_ids, empresa_id: int) -> set:
+    """Subconjunto de `historia_ids` que pertenece a la empresa (una sola consulta)."""
+    filas = db.query(HistoriaUsuario.id).filter(HistoriaUsuario.id.in_(historia_ids), HistoriaUsuario.empresa_id == empresa_id)
+    return {fila.id for fila in filas}
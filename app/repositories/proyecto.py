@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Session
+from app.models.proyecto import Proyecto
+
+
+def query_proyectos_de_empresa(db: Session, empresa_id: int):
+    return db.query(Proyecto).filter(Proyecto.empresa_id == empresa_id)
+
+
+def proyecto_de_empresa(db: Session, proyecto_id: int, empresa_id: int):
+    """Proyecto si existe y pertenece a la empresa; None en cualquier otro caso."""
+    return query_proyectos_de_empresa(db, empresa_id).filter(Proyecto.id == proyecto_id).first()
+
+
+def ids_proyectos_de_empresa(db: Session, proyecto_ids, empresa_id: int) -> set:
+    """Subconjunto de `proyecto_ids` que pertenece a la empresa (una sola consulta)."""
+    filas = db.query(Proyecto.id).filter(Proyecto.id.in_(proyecto_ids), Proyecto.empresa_id == empresa_id)
+    return {fila.id for fila in filas}
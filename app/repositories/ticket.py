@@ -0,0 +1,11 @@
+from sqlalchemy.orm import Session
+from app.models.ticket import Ticket
+
+
+def query_tickets_de_empresa(db: Session, empresa_id: int):
+    return db.query(Ticket).filter(Ticket.empresa_id == empresa_id)
+
+
+def ticket_de_empresa(db: Session, ticket_id: int, empresa_id: int):
+    """Ticket si existe y pertenece a la empresa, sin joins ni lazy-loads."""
+    return query_tickets_de_empresa(db, empresa_id).filter(Ticket.id == ticket_id).first()
@@ -1,28 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from datetime import timedelta
-from app.db.session import get_db
-from app.services.empresa import autenticar_empresa, crear_empresa
+from app.db.session import get_db, run_db
+from app.services.empresa import autenticar_empresa, crear_empresa, obtener_empresa_por_email, listar_empresas as listar_empresas_service, resumen_empresas
 from app.schemas.empresa import EmpresaCreate, EmpresaLogin, EmpresaResponse
 from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.models.empresa import Empresa
+from app.core.deps import Paginacion
+from app.core.consultas import presupuesto_consultas
+from app.core.etag import calcular_etag
+from app.core.response_cache import response_cache, ETIQUETA_EMPRESAS
+from app.schemas.paginacion import Pagina
 router = APIRouter(prefix="/auth", tags=["Autenticación Empresa"])
 from typing import List
 from app.schemas.empresa import EmpresaListResponse
 
 
 @router.post("/registro", response_model=EmpresaResponse)
-def registro_empresa(data: EmpresaCreate, db: Session = Depends(get_db)):
-    empresa_existente = db.query(Empresa).filter(Empresa.email_contacto == data.email_contacto).first()
+@presupuesto_consultas(3)
+async def registro_empresa(data: EmpresaCreate, db=Depends(get_db)):
+    empresa_existente = await run_db(db, obtener_empresa_por_email, data.email_contacto)
     if empresa_existente:
         raise HTTPException(status_code=400, detail="Ya existe una empresa con este correo.")
-    empresa = crear_empresa(db, data)
+    empresa = await crear_empresa(db, data)
     return empresa
 
 
 @router.post("/login")
-def login_empresa(data: EmpresaLogin, db: Session = Depends(get_db)):
-    empresa = autenticar_empresa(db, data.email_contacto, data.password)
+@presupuesto_consultas(3)
+async def login_empresa(data: EmpresaLogin, db=Depends(get_db)):
+    empresa = await autenticar_empresa(db, data.email_contacto, data.password)
     if not empresa:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,12 +53,22 @@ def login_empresa(data: EmpresaLogin, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/listado-empresas", response_model=List[EmpresaResponse])
-def listar_empresas(db: Session = Depends(get_db)):
-    empresas = db.query(Empresa).all()
-    return empresas
+@router.get("/listado-empresas", response_model=Pagina[EmpresaResponse])
+@presupuesto_consultas(1)
+async def listar_empresas(pagina: Paginacion = Depends(), db=Depends(get_db)):
+    empresas, siguiente = await run_db(db, listar_empresas_service, pagina.cursor, pagina.limite)
+    return {"items": empresas, "siguiente_cursor": siguiente, "limite": pagina.limite}
 
-@router.get("/resumen", response_model=List[EmpresaListResponse])
-def obtener_lista_empresas(db: Session = Depends(get_db)):
-    empresas = db.query(Empresa.id, Empresa.nombre).all()
-    return [{"id": e.id, "nombre": e.nombre} for e in empresas]
+@router.get("/resumen", response_model=Pagina[EmpresaListResponse])
+@presupuesto_consultas(1)
+async def obtener_lista_empresas(pagina: Paginacion = Depends(), db=Depends(get_db)):
+    async def producir():
+        empresas, siguiente = await run_db(db, resumen_empresas, pagina.cursor, pagina.limite)
+        return {
+            "items": [{"id": e.id, "nombre": e.nombre} for e in empresas],
+            "siguiente_cursor": siguiente,
+            "limite": pagina.limite,
+        }
+    # Público y sin versión: lo invalidan las escrituras de empresas (y el TTL entre workers)
+    clave = calcular_etag("resumen", pagina.cursor, pagina.limite)
+    return await response_cache.responder(clave, (ETIQUETA_EMPRESAS,), producir, Pagina[EmpresaListResponse])
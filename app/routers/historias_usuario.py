@@ -1,80 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List
-from app.db.session import get_db
-from app.models.proyecto import Proyecto
-from app.models.historia_usuario import HistoriaUsuario
-from app.schemas.historia_usuario import HistoriaUsuarioCreate, HistoriaUsuarioResponse, HistoriaUsuarioBase
-from app.core.deps import get_current_empresa
+from app.db.session import get_db, run_db
+from app.schemas.historia_usuario import HistoriaUsuarioCreate, HistoriaUsuarioResponse, HistoriaUsuarioBase, HistoriaUsuarioBulkCreate, HistoriaUsuarioBulkResponse, EstadoHistoria
+from app.schemas.paginacion import Pagina
+from app.schemas.estadisticas import EstadisticasTickets
+from app.services import historia_usuario as historia_service
+from app.services import estadisticas as estadisticas_service
+from app.core.deps import get_current_empresa, Paginacion, FiltrosListado, ETagColeccion, filtros_listado
+from app.core.consultas import presupuesto_consultas
+from app.core.serializacion import contenido_pagina
 
 router = APIRouter(prefix="/historias-usuario", tags=["Historias de Usuario"])
 
+filtros_historias = filtros_listado(EstadoHistoria)
+
 
 @router.post("/", response_model=HistoriaUsuarioResponse, status_code=status.HTTP_201_CREATED)
-def crear_historia(data: HistoriaUsuarioCreate, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(3)
+async def crear_historia(data: HistoriaUsuarioCreate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    proyecto = db.query(Proyecto).filter_by(id=data.proyecto_id, empresa_id=empresa_id).first()
-    if not proyecto:
+    historia = await run_db(db, historia_service.crear_historia, empresa_id, data)
+    if not historia:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado o no pertenece a tu empresa")
-
-    historia = HistoriaUsuario(
-        proyecto_id=data.proyecto_id,
-        titulo=data.titulo,
-        descripcion=data.descripcion,
-        estado=data.estado,
-        prioridad=data.prioridad
-    )
-    db.add(historia)
-    db.commit()
-    db.refresh(historia)
     return historia
 
 
-@router.get("/proyecto/{proyecto_id}", response_model=List[HistoriaUsuarioResponse])
-def listar_por_proyecto(proyecto_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@router.post("/bulk", response_model=HistoriaUsuarioBulkResponse)
+@presupuesto_consultas(4)
+async def crear_historias_bulk(data: HistoriaUsuarioBulkCreate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    proyecto = db.query(Proyecto).filter_by(id=proyecto_id, empresa_id=empresa_id).first()
-    if not proyecto:
-        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no pertenece a tu empresa")
+    creados, errores = await run_db(db, historia_service.crear_historias_bulk, empresa_id, data.items)
+    return {"creados": creados, "errores": errores}
 
-    historias = db.query(HistoriaUsuario).filter_by(proyecto_id=proyecto_id).all()
-    return historias
+
+@router.get("/proyecto/{proyecto_id}", response_model=Pagina[HistoriaUsuarioResponse])
+@presupuesto_consultas(4)
+async def listar_por_proyecto(proyecto_id: int, pagina: Paginacion = Depends(), filtros: FiltrosListado = Depends(filtros_historias),
+                              db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                              lectura=Depends(ETagColeccion("proyectos", "historias"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        resultado = await run_db(db, historia_service.listar_por_proyecto, proyecto_id, empresa_id, pagina.cursor, pagina.limite, filtros, forma=historia_service.FORMA_RESPUESTA)
+        if resultado is None:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado o no pertenece a tu empresa")
+        historias, siguiente = resultado
+        return contenido_pagina(historia_service.FORMA_RESPUESTA, historias, siguiente, pagina.limite)
+    return await lectura.responder(producir, Pagina[HistoriaUsuarioResponse])
+
+
+# Búsqueda de texto en título y descripción, ordenada por relevancia
+@router.get("/buscar", response_model=Pagina[HistoriaUsuarioResponse])
+@presupuesto_consultas(3)
+async def buscar_historias(q: str = Query(..., min_length=1, max_length=200, description="Palabras a buscar, todas obligatorias; cada una puede ser un prefijo"),
+                           pagina: Paginacion = Depends(), db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                           lectura=Depends(ETagColeccion("historias"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        historias, siguiente = await run_db(db, historia_service.buscar_historias, empresa_id, q, pagina.cursor, pagina.limite, forma=historia_service.FORMA_RESPUESTA)
+        return contenido_pagina(historia_service.FORMA_RESPUESTA, historias, siguiente, pagina.limite)
+    return await lectura.responder(producir, Pagina[HistoriaUsuarioResponse])
 
 
 @router.get("/{historia_id}", response_model=HistoriaUsuarioResponse)
-def obtener_historia(historia_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
-    historia = db.query(HistoriaUsuario).join(Proyecto).filter(HistoriaUsuario.id == historia_id).first()
+@presupuesto_consultas(3)
+async def obtener_historia(historia_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                           lectura=Depends(ETagColeccion("historias"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    if not historia or historia.proyecto.empresa_id != getattr(current_actor, "empresa_id", current_actor.id):
-        raise HTTPException(status_code=404, detail="Historia no encontrada o no pertenece a tu empresa")
+    async def producir():
+        historia = await run_db(db, historia_service.obtener_historia, historia_id, empresa_id)
+        if not historia:
+            raise HTTPException(status_code=404, detail="Historia no encontrada o no pertenece a tu empresa")
+        return historia
+    return await lectura.responder(producir, HistoriaUsuarioResponse)
 
-    return historia
+
+@router.get("/{historia_id}/estadisticas", response_model=EstadisticasTickets)
+@presupuesto_consultas(4)
+async def estadisticas_historia(historia_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                                lectura=Depends(ETagColeccion("historias", "tickets"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        estadisticas = await run_db(db, estadisticas_service.estadisticas_historia, historia_id, empresa_id)
+        if estadisticas is None:
+            raise HTTPException(status_code=404, detail="Historia no encontrada o no pertenece a tu empresa")
+        return estadisticas
+    return await lectura.responder(producir, EstadisticasTickets)
 
 
 @router.put("/{historia_id}", response_model=HistoriaUsuarioResponse)
-def actualizar_historia(historia_id: int, data: HistoriaUsuarioBase, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
-    historia = db.query(HistoriaUsuario).join(Proyecto).filter(HistoriaUsuario.id == historia_id).first()
+@presupuesto_consultas(3)
+async def actualizar_historia(historia_id: int, data: HistoriaUsuarioBase, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    if not historia or historia.proyecto.empresa_id != getattr(current_actor, "empresa_id", current_actor.id):
+    historia = await run_db(db, historia_service.actualizar_historia, historia_id, empresa_id, data)
+    if not historia:
         raise HTTPException(status_code=404, detail="Historia no encontrada o no pertenece a tu empresa")
-
-    historia.titulo = data.titulo
-    historia.descripcion = data.descripcion
-    historia.estado = data.estado
-    historia.prioridad = data.prioridad
-    db.commit()
-    db.refresh(historia)
     return historia
 
 
 @router.delete("/{historia_id}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_historia(historia_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
-    historia = db.query(HistoriaUsuario).join(Proyecto).filter(HistoriaUsuario.id == historia_id).first()
+@presupuesto_consultas(7)
+async def eliminar_historia(historia_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    if not historia or historia.proyecto.empresa_id != getattr(current_actor, "empresa_id", current_actor.id):
+    if not await run_db(db, historia_service.eliminar_historia, historia_id, empresa_id):
         raise HTTPException(status_code=404, detail="Historia no encontrada o no pertenece a tu empresa")
-
-    db.delete(historia)
-    db.commit()
@@ -0,0 +1,80 @@
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.db.session import get_db, run_db
+from app.schemas.importacion import ImportacionResponse
+from app.services import importacion as importacion_service
+from app.core.deps import get_current_empresa
+from app.core.consultas import presupuesto_consultas
+
+router = APIRouter(tags=["Importaciones"])
+
+# Por encima de este tamaño el archivo recibido pasa de memoria a disco
+MAX_EN_MEMORIA = 8 * 1024 * 1024
+
+
+async def _recibir_archivo(request: Request):
+    archivo = tempfile.SpooledTemporaryFile(max_size=MAX_EN_MEMORIA)
+    async for parte in request.stream():
+        await run_in_threadpool(archivo.write, parte)
+    archivo.seek(0)
+    return archivo
+
+
+@router.post("/")
+@presupuesto_consultas(None)
+async def importar(request: Request,
+                   tipo: str = Query(..., pattern="^(proyectos|historias|tickets)$"),
+                   formato: str = Query(..., pattern="^(csv|ndjson)$"),
+                   importacion_id: Optional[int] = Query(None, description="Reanuda esta importación con el mismo archivo"),
+                   db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    """Importa el cuerpo del request (CSV con encabezado o NDJSON) por lotes.
+
+    La respuesta es NDJSON con el progreso tras cada lote confirmado. Si se
+    corta, se puede reanudar enviando el mismo archivo con `importacion_id`.
+    """
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    if importacion_id is None:
+        importacion = await run_db(db, importacion_service.crear_importacion, empresa_id, tipo, formato)
+    else:
+        importacion = await run_db(db, importacion_service.obtener_importacion, importacion_id, empresa_id)
+        if not importacion:
+            raise HTTPException(status_code=404, detail="Importación no encontrada")
+        if (importacion.tipo, importacion.formato) != (tipo, formato):
+            raise HTTPException(status_code=409, detail="El tipo o formato no coincide con la importación original")
+        if importacion.estado == "completada":
+            raise HTTPException(status_code=409, detail="La importación ya está completada")
+
+    archivo = await _recibir_archivo(request)
+    return StreamingResponse(
+        importacion_service.generar_progreso(importacion.id, empresa_id, archivo),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{importacion_id}", response_model=ImportacionResponse)
+@presupuesto_consultas(2)
+async def obtener_importacion(importacion_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+    importacion = await run_db(db, importacion_service.obtener_importacion, importacion_id, empresa_id)
+    if not importacion:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return importacion
+
+
+@router.get("/{importacion_id}/errores")
+@presupuesto_consultas(None)
+async def reporte_errores(importacion_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    """CSV con las filas rechazadas: número de registro, motivo y datos originales."""
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+    importacion = await run_db(db, importacion_service.obtener_importacion, importacion_id, empresa_id)
+    if not importacion:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return StreamingResponse(
+        importacion_service.generar_reporte_errores(importacion_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="errores_importacion_{importacion_id}.csv"'},
+    )
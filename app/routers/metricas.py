@@ -0,0 +1,60 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.actor_cache import actor_cache
+from app.core.config import DB_MODE, DB_POOL_MODE, METRICAS_TOKEN
+from app.core.consultas import infracciones, presupuesto_consultas
+from app.core.response_cache import response_cache
+from app.core.security import password_pool
+from app.db.pool import estado_pool
+from app.db.session import engine_activo
+
+router = APIRouter(tags=["Métricas"])
+
+
+@router.get("/pool")
+@presupuesto_consultas(0)
+async def metricas_pool():
+    return {
+        "db_mode": DB_MODE,
+        "pool_mode": DB_POOL_MODE,
+        **estado_pool(engine_activo()),
+    }
+
+
+@router.get("/cache-actores")
+@presupuesto_consultas(0)
+async def metricas_cache_actores():
+    return actor_cache.stats()
+
+
+@router.get("/passwords")
+@presupuesto_consultas(0)
+async def metricas_passwords():
+    return password_pool.stats()
+
+
+@router.get("/cache-respuestas")
+@presupuesto_consultas(0)
+async def metricas_cache_respuestas():
+    return response_cache.stats()
+
+
+def _token_interno(x_metricas_token: Optional[str] = Header(None)):
+    """Exige el header X-Metricas-Token igual a METRICAS_TOKEN (sin token configurado, nadie pasa)."""
+    if not METRICAS_TOKEN or not x_metricas_token or not hmac.compare_digest(
+        x_metricas_token.encode(), METRICAS_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Se requiere X-Metricas-Token")
+
+
+@router.get("/consultas", dependencies=[Depends(_token_interno)])
+@presupuesto_consultas(0)
+async def metricas_consultas():
+    """Requests que excedieron su presupuesto de consultas o repitieron sentencias (app/core/consultas.py).
+
+    Incluye el SQL y los lugares del código que lo ejecutaron: solo con el token interno.
+    """
+    return {"infracciones": infracciones()}
@@ -1,64 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
-from app.models.proyecto import Proyecto
-from app.models.historia_usuario import HistoriaUsuario
-from app.schemas.proyecto import ProyectoCreate, ProyectoResponse, ProyectoBase
-from app.schemas.historia_usuario import HistoriaUsuarioResponse
-from app.core.deps import get_current_empresa
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.db.session import get_db, run_db
+from app.schemas.proyecto import ProyectoCreate, ProyectoResponse, ProyectoBase, ProyectoTablero
+from app.schemas.paginacion import Pagina
+from app.schemas.estadisticas import EstadisticasTickets
+from app.schemas.enums import Prioridad
+from app.schemas.ticket import EstadoTicket
+from app.services import proyecto as proyecto_service
+from app.services import estadisticas as estadisticas_service
+from app.services.tablero import generar_tablero
+from app.services.exportacion import FORMATOS, generar_exportacion
+from app.core.deps import get_current_empresa, Paginacion, ETagColeccion
+from app.core.consultas import presupuesto_consultas
+from app.core.codificacion import acepta_codificacion
 
 router = APIRouter(prefix="/proyectos", tags=["Proyectos"])
 
 @router.post("/", response_model=ProyectoResponse, status_code=status.HTTP_201_CREATED)
-def crear_proyecto(data: ProyectoCreate, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(3)
+async def crear_proyecto(data: ProyectoCreate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+    return await run_db(db, proyecto_service.crear_proyecto, empresa_id, data)
+
+
+@router.get("/", response_model=Pagina[ProyectoResponse])
+@presupuesto_consultas(3)
+async def listar_proyectos(pagina: Paginacion = Depends(), db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                           lectura=Depends(ETagColeccion("proyectos"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        proyectos, siguiente = await run_db(db, proyecto_service.listar_proyectos, empresa_id, pagina.cursor, pagina.limite)
+        return {"items": proyectos, "siguiente_cursor": siguiente, "limite": pagina.limite}
+    return await lectura.responder(producir, Pagina[ProyectoResponse])
+
+
+@router.get("/estadisticas", response_model=EstadisticasTickets)
+@presupuesto_consultas(3)
+async def estadisticas_empresa(db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                               lectura=Depends(ETagColeccion("tickets"))):
+    """Conteo de tickets de toda la empresa por estado y prioridad."""
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        return await run_db(db, estadisticas_service.estadisticas_empresa, empresa_id)
+    return await lectura.responder(producir, EstadisticasTickets)
 
-    nuevo_proyecto = Proyecto(
-        nombre=data.nombre,
-        descripcion=data.descripcion,
-        empresa_id=empresa_id  # ✅ se extrae del token
-    )
-    db.add(nuevo_proyecto)
-    db.commit()
-    db.refresh(nuevo_proyecto)
-    return nuevo_proyecto
 
+@router.get("/exportar")
+@presupuesto_consultas(None)
+async def exportar(request: Request, formato: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+                   updated_since: Optional[datetime] = None, current_actor=Depends(get_current_empresa)):
+    """Todos los proyectos, historias y tickets de la empresa, una fila por entidad.
 
-@router.get("/", response_model=list[ProyectoResponse])
-def listar_proyectos(db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+    Se envía por partes leyendo con un cursor del lado del servidor; si
+    `Accept-Encoding` admite gzip (con q > 0) se comprime al vuelo.
+    """
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
-    return db.query(Proyecto).filter(Proyecto.empresa_id == empresa_id).all()
+    comprimir = acepta_codificacion(request.headers.get("accept-encoding"), "gzip")
+
+    headers = {"Content-Disposition": f'attachment; filename="exportacion.{formato}"', "Vary": "Accept-Encoding"}
+    if comprimir:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        generar_exportacion(empresa_id, formato, updated_since, comprimir),
+        media_type=FORMATOS[formato],
+        headers=headers,
+    )
 
 
 @router.get("/{proyecto_id}", response_model=ProyectoResponse)
-def obtener_proyecto(proyecto_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(3)
+async def obtener_proyecto(proyecto_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                           lectura=Depends(ETagColeccion("proyectos"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        proyecto = await run_db(db, proyecto_service.obtener_proyecto, proyecto_id, empresa_id)
+        if not proyecto:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+        return proyecto
+    return await lectura.responder(producir, ProyectoResponse)
+
+
+@router.get("/{proyecto_id}/tablero", response_model=ProyectoTablero)
+@presupuesto_consultas(None)
+async def obtener_tablero(proyecto_id: int, estado: Optional[EstadoTicket] = None, prioridad: Optional[Prioridad] = None,
+                          db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    """Proyecto con todas sus historias y tickets; `estado` y `prioridad` filtran los tickets."""
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
-    proyecto = db.query(Proyecto).filter_by(id=proyecto_id, empresa_id=empresa_id).first()
+    proyecto = await run_db(db, proyecto_service.obtener_proyecto, proyecto_id, empresa_id)
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    return proyecto
+
+    return StreamingResponse(generar_tablero(proyecto, empresa_id, estado, prioridad), media_type="application/json")
+
+
+@router.get("/{proyecto_id}/estadisticas", response_model=EstadisticasTickets)
+@presupuesto_consultas(4)
+async def estadisticas_proyecto(proyecto_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                                lectura=Depends(ETagColeccion("proyectos", "historias", "tickets"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        estadisticas = await run_db(db, estadisticas_service.estadisticas_proyecto, proyecto_id, empresa_id)
+        if estadisticas is None:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+        return estadisticas
+    return await lectura.responder(producir, EstadisticasTickets)
 
 
 @router.put("/{proyecto_id}", response_model=ProyectoResponse)
-def actualizar_proyecto(proyecto_id: int, data: ProyectoBase, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(3)
+async def actualizar_proyecto(proyecto_id: int, data: ProyectoBase, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
-    proyecto = db.query(Proyecto).filter_by(id=proyecto_id, empresa_id=empresa_id).first()
+    proyecto = await run_db(db, proyecto_service.actualizar_proyecto, proyecto_id, empresa_id, data)
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-
-    proyecto.nombre = data.nombre
-    proyecto.descripcion = data.descripcion
-    db.commit()
-    db.refresh(proyecto)
     return proyecto
 
 @router.delete("/{proyecto_id}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_proyecto(proyecto_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(9)
+async def eliminar_proyecto(proyecto_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
-    proyecto = db.query(Proyecto).filter_by(id=proyecto_id, empresa_id=empresa_id).first()
-    if not proyecto:
+    if not await run_db(db, proyecto_service.eliminar_proyecto, proyecto_id, empresa_id):
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-
-    db.delete(proyecto)
-    db.commit()
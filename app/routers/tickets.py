@@ -1,123 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List
 
-from app.db.session import get_db
-from app.models.ticket import Ticket
-from app.models.historia_usuario import HistoriaUsuario
-from app.schemas.ticket import TicketCreate, TicketResponse, TicketBase, TicketEstadoUpdate
-from app.core.deps import get_current_empresa
+from app.db.session import get_db, run_db
+from app.schemas.ticket import (
+    TicketCreate, TicketResponse, TicketBase, TicketEstadoUpdate, TicketBulkCreate, TicketBulkResponse,
+    TicketEstadoBulkUpdate, TicketEstadoBulkResponse, EstadoTicket,
+)
+from app.schemas.paginacion import Pagina
+from app.services import ticket as ticket_service
+from app.core.deps import get_current_empresa, Paginacion, FiltrosListado, ETagColeccion, filtros_listado
+from app.core.consultas import presupuesto_consultas
+from app.core.serializacion import contenido_pagina
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
+filtros_tickets = filtros_listado(EstadoTicket)
+
 # Crear un ticket
 @router.post("/", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
-def crear_ticket(data: TicketCreate, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(4)
+async def crear_ticket(data: TicketCreate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    historia = db.query(HistoriaUsuario).filter(HistoriaUsuario.id == data.historia_usuario_id).first()
-
-    if not historia:
+    ticket = await run_db(db, ticket_service.crear_ticket, empresa_id, data)
+    if not ticket:
         raise HTTPException(status_code=404, detail="Historia de usuario no encontrada")
+    return ticket
+
+
+# Listar los tickets de toda la empresa, con filtros
+@router.get("/", response_model=Pagina[TicketResponse])
+@presupuesto_consultas(3)
+async def listar_tickets(pagina: Paginacion = Depends(), filtros: FiltrosListado = Depends(filtros_tickets), db=Depends(get_db),
+                         current_actor=Depends(get_current_empresa), lectura=Depends(ETagColeccion("tickets"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        tickets, siguiente = await run_db(db, ticket_service.listar_tickets_empresa, empresa_id, pagina.cursor, pagina.limite, filtros, forma=ticket_service.FORMA_RESPUESTA)
+        return contenido_pagina(ticket_service.FORMA_RESPUESTA, tickets, siguiente, pagina.limite)
+    return await lectura.responder(producir, Pagina[TicketResponse])
 
-    if historia.proyecto.empresa_id != empresa_id:
-        raise HTTPException(status_code=403, detail="No tienes acceso a esta historia de usuario")
 
-    nuevo_ticket = Ticket(
-        historia_usuario_id=data.historia_usuario_id,
-        asunto=data.asunto,
-        descripcion=data.descripcion,
-        estado=data.estado,
-        prioridad=data.prioridad,
-    )
-    db.add(nuevo_ticket)
-    db.commit()
-    db.refresh(nuevo_ticket)
-    return nuevo_ticket
+# Crear tickets en lote
+@router.post("/bulk", response_model=TicketBulkResponse)
+@presupuesto_consultas(5)
+async def crear_tickets_bulk(data: TicketBulkCreate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    creados, errores = await run_db(db, ticket_service.crear_tickets_bulk, empresa_id, data.items)
+    return {"creados": creados, "errores": errores}
+
+
+# Cambiar el estado de varios tickets a la vez
+@router.patch("/estado", response_model=TicketEstadoBulkResponse)
+@presupuesto_consultas(5)
+async def actualizar_estado_tickets(data: TicketEstadoBulkUpdate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    ids, total = await run_db(db, ticket_service.actualizar_estado_bulk, empresa_id, data)
+    return {"ids": ids, "total": total, "dry_run": data.dry_run}
 
 
 # Listar tickets por historia de usuario
-@router.get("/historia/{historia_usuario_id}", response_model=List[TicketResponse])
-def listar_tickets_por_historia(historia_usuario_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@router.get("/historia/{historia_usuario_id}", response_model=Pagina[TicketResponse])
+@presupuesto_consultas(4)
+async def listar_tickets_por_historia(historia_usuario_id: int, pagina: Paginacion = Depends(), filtros: FiltrosListado = Depends(filtros_tickets),
+                                      db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                                      lectura=Depends(ETagColeccion("historias", "tickets"))):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    historia = db.query(HistoriaUsuario).filter(HistoriaUsuario.id == historia_usuario_id).first()
-    if not historia:
-        raise HTTPException(status_code=404, detail="Historia de usuario no encontrada")
+    async def producir():
+        resultado = await run_db(db, ticket_service.listar_tickets, historia_usuario_id, empresa_id, pagina.cursor, pagina.limite, filtros, forma=ticket_service.FORMA_RESPUESTA)
+        if resultado is None:
+            raise HTTPException(status_code=404, detail="Historia de usuario no encontrada")
+
+        tickets, siguiente = resultado
+        return contenido_pagina(ticket_service.FORMA_RESPUESTA, tickets, siguiente, pagina.limite)
+    return await lectura.responder(producir, Pagina[TicketResponse])
 
-    if historia.proyecto.empresa_id != empresa_id:
-        raise HTTPException(status_code=403, detail="No tienes permiso para ver estos tickets")
 
-    return historia.tickets
+# Búsqueda de texto en asunto y descripción, ordenada por relevancia
+@router.get("/buscar", response_model=Pagina[TicketResponse])
+@presupuesto_consultas(3)
+async def buscar_tickets(q: str = Query(..., min_length=1, max_length=200, description="Palabras a buscar, todas obligatorias; cada una puede ser un prefijo"),
+                         pagina: Paginacion = Depends(), db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                         lectura=Depends(ETagColeccion("tickets"))):
+    empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
+
+    async def producir():
+        tickets, siguiente = await run_db(db, ticket_service.buscar_tickets, empresa_id, q, pagina.cursor, pagina.limite, forma=ticket_service.FORMA_RESPUESTA)
+        return contenido_pagina(ticket_service.FORMA_RESPUESTA, tickets, siguiente, pagina.limite)
+    return await lectura.responder(producir, Pagina[TicketResponse])
 
 
 # Obtener un ticket específico
 @router.get("/{ticket_id}", response_model=TicketResponse)
-def obtener_ticket(ticket_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(3)
+async def obtener_ticket(ticket_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa),
+                         lectura=Depends(ETagColeccion("tickets"))):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket no encontrado")
-
-    if ticket.historia_usuario.proyecto.empresa_id != empresa_id:
-        raise HTTPException(status_code=403, detail="No tienes permiso para acceder a este ticket")
-
-    return ticket
+    async def producir():
+        ticket = await run_db(db, ticket_service.obtener_ticket, ticket_id, empresa_id)
+        if not ticket:
+            raise HTTPException(status_code=404, detail="Ticket no encontrado")
+        return ticket
+    return await lectura.responder(producir, TicketResponse)
 
 
 # Eliminar un ticket
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_ticket(ticket_id: int, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(5)
+async def eliminar_ticket(ticket_id: int, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
+    if not await run_db(db, ticket_service.eliminar_ticket, ticket_id, empresa_id):
         raise HTTPException(status_code=404, detail="Ticket no encontrado")
 
-    if ticket.historia_usuario.proyecto.empresa_id != empresa_id:
-        raise HTTPException(status_code=403, detail="No tienes permiso para eliminar este ticket")
-
-    db.delete(ticket)
-    db.commit()
-
 # Actualizar un ticket
 @router.put("/{ticket_id}", response_model=TicketResponse)
-def actualizar_ticket(ticket_id: int, data: TicketBase, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(5)
+async def actualizar_ticket(ticket_id: int, data: TicketBase, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await run_db(db, ticket_service.actualizar_ticket, ticket_id, empresa_id, data)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket no encontrado")
-
-    if ticket.historia_usuario.proyecto.empresa_id != empresa_id:
-        raise HTTPException(status_code=403, detail="No tienes permiso para modificar este ticket")
-
-    # Actualizar campos
-    ticket.asunto = data.asunto
-    ticket.descripcion = data.descripcion
-    ticket.estado = data.estado
-    ticket.prioridad = data.prioridad
-
-    db.commit()
-    db.refresh(ticket)
     return ticket
 
 # Actualizar el estado de un ticket
 @router.patch("/{ticket_id}/estado", response_model=TicketResponse)
-def actualizar_estado_ticket(ticket_id: int, data: TicketEstadoUpdate, db: Session = Depends(get_db), current_actor=Depends(get_current_empresa)):
+@presupuesto_consultas(5)
+async def actualizar_estado_ticket(ticket_id: int, data: TicketEstadoUpdate, db=Depends(get_db), current_actor=Depends(get_current_empresa)):
     empresa_id = getattr(current_actor, "empresa_id", current_actor.id)
 
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await run_db(db, ticket_service.actualizar_estado, ticket_id, empresa_id, data.estado)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket no encontrado")
-
-    if ticket.historia_usuario.proyecto.empresa_id != empresa_id:
-        raise HTTPException(status_code=403, detail="No tienes permiso para actualizar este ticket")
-
-    ticket.estado = data.estado
-
-    db.commit()
-    db.refresh(ticket)
     return ticket
 
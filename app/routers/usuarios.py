@@ -1,45 +1,32 @@
 # app/api/v1/endpoints/usuarios.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from fastapi.responses import JSONResponse
 
-from app.db.session import get_db
-from app.models.usuario import Usuario
-from app.models.empresa import Empresa
+from app.db.session import get_db, run_db
 from app.schemas.usuario import UsuarioCreate, UsuarioOut
-from app.core.security import hash_password, create_access_token, verify_password
+from app.services.usuario import obtener_empresa_activa, obtener_usuario_por_email, crear_usuario, actualizar_password_hash
+from app.core.security import hash_password_async, create_access_token, verify_and_update_password_async
+from app.core.consultas import presupuesto_consultas
 from app.schemas.usuario import UsuarioCreate, LoginRequest
 
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def registrar_usuario(data: UsuarioCreate, db: Session = Depends(get_db)):
+@presupuesto_consultas(4)
+async def registrar_usuario(data: UsuarioCreate, db=Depends(get_db)):
     # 1. Validar que la empresa exista y esté activa
-    empresa = db.query(Empresa).filter(
-        Empresa.id == data.empresa_id,
-        Empresa.activa == True
-    ).first()
+    empresa = await run_db(db, obtener_empresa_activa, data.empresa_id)
 
     if not empresa:
         raise HTTPException(status_code=404, detail="Empresa no encontrada o inactiva")
 
     # 2. Validar que el correo del usuario no exista
-    if db.query(Usuario).filter(Usuario.email == data.email).first():
+    if await run_db(db, obtener_usuario_por_email, data.email):
         raise HTTPException(status_code=400, detail="El correo ya está en uso")
 
     # 3. Crear el usuario
-    nuevo_usuario = Usuario(
-        nombre=data.nombre,
-        email=data.email,
-        password_hash=hash_password(data.password),
-        rol=data.rol,
-        empresa_id=data.empresa_id,
-        activo=True
-    )
-
-    db.add(nuevo_usuario)
-    db.commit()
-    db.refresh(nuevo_usuario)
+    password_hash = await hash_password_async(data.password)
+    nuevo_usuario = await run_db(db, crear_usuario, data, password_hash)
 
     # 4. Crear token de acceso (JWT)
     token_data = {
@@ -68,9 +55,10 @@ def registrar_usuario(data: UsuarioCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+@presupuesto_consultas(3)
+async def login(data: LoginRequest, db=Depends(get_db)):
     # Buscar usuario por email
-    usuario = db.query(Usuario).filter(Usuario.email == data.email).first()
+    usuario = await run_db(db, obtener_usuario_por_email, data.email)
 
     if not usuario:
         raise HTTPException(status_code=404, detail="El usuario no existe")
@@ -79,9 +67,14 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=403, detail="El usuario está inactivo")
 
     # Verificar contraseña
-    if not verify_password(data.password, usuario.password_hash):
+    valida, nuevo_hash = await verify_and_update_password_async(data.password, usuario.password_hash)
+    if not valida:
         raise HTTPException(status_code=401, detail="Contraseña incorrecta")
 
+    # Rehash si cambió el costo de bcrypt configurado
+    if nuevo_hash:
+        usuario = await run_db(db, actualizar_password_hash, usuario, nuevo_hash)
+
     # 🔥 Generar token JWT con type="usuario"
     token_data = {
         "sub": usuario.email,
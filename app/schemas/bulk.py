@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class ErrorItem(BaseModel):
+    # Posición del elemento dentro de `items` en la petición
+    indice: int
+    detalle: str
@@ -0,0 +1,31 @@
+import unicodedata
+from enum import StrEnum
+
+
+def normalizar(valor: str) -> str:
+    """'En Progreso ' -> 'en_progreso': minúsculas, sin tildes y con '_' como separador."""
+    sin_tildes = unicodedata.normalize("NFKD", valor).encode("ascii", "ignore").decode()
+    return "_".join(sin_tildes.lower().replace("-", " ").split())
+
+
+class EnumNormalizado(StrEnum):
+    """Enum de texto que acepta variantes de mayúsculas, tildes y espacios del mismo valor.
+
+    En la base se guarda como SMALLINT (ver app/db/tipos.py): el código de cada
+    miembro es su posición, así que los miembros nuevos van siempre al final.
+    """
+
+    @classmethod
+    def _missing_(cls, valor):
+        if isinstance(valor, str):
+            clave = normalizar(valor)
+            for miembro in cls:
+                if miembro.value == clave:
+                    return miembro
+        return None
+
+
+class Prioridad(EnumNormalizado):
+    baja = "baja"
+    media = "media"
+    alta = "alta"
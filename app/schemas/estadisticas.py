@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Dict, List
+from app.schemas.enums import Prioridad
+from app.schemas.ticket import EstadoTicket
+
+
+class ConteoTickets(BaseModel):
+    estado: EstadoTicket
+    prioridad: Prioridad
+    total: int
+
+class EstadisticasTickets(BaseModel):
+    total: int
+    por_estado: Dict[str, int]
+    por_prioridad: Dict[str, int]
+    # Conteo por cada combinación estado / prioridad con al menos un ticket
+    detalle: List[ConteoTickets]
@@ -1,12 +1,20 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
+from app.core.config import BULK_MAX_ITEMS
+from app.schemas.bulk import ErrorItem
+from app.schemas.enums import EnumNormalizado, Prioridad
+
+class EstadoHistoria(EnumNormalizado):
+    pendiente = "pendiente"
+    en_progreso = "en_progreso"
+    completado = "completado"
 
 class HistoriaUsuarioBase(BaseModel):
     titulo: str
     descripcion: Optional[str] = None
-    estado: Optional[str] = "pendiente"   # pendiente, en_progreso, completado
-    prioridad: Optional[str] = "media"    # baja, media, alta
+    estado: EstadoHistoria = EstadoHistoria.pendiente
+    prioridad: Prioridad = Prioridad.media
 
 class HistoriaUsuarioCreate(HistoriaUsuarioBase):
     proyecto_id: int
@@ -14,6 +22,14 @@ class HistoriaUsuarioCreate(HistoriaUsuarioBase):
 class HistoriaUsuarioResponse(HistoriaUsuarioBase):
     id: int
     fecha_creacion: datetime
+    clave_externa: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+class HistoriaUsuarioBulkCreate(BaseModel):
+    items: List[HistoriaUsuarioCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class HistoriaUsuarioBulkResponse(BaseModel):
+    creados: List[HistoriaUsuarioResponse]
+    errores: List[ErrorItem]
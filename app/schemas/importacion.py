@@ -0,0 +1,61 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from datetime import datetime
+from app.schemas.enums import Prioridad
+from app.schemas.historia_usuario import EstadoHistoria
+from app.schemas.ticket import EstadoTicket
+
+# --- Filas del archivo ---
+# Los padres se indican por id o por la clave_externa con la que se importaron
+
+class FilaProyecto(BaseModel):
+    clave_externa: str = Field(..., min_length=1, max_length=255)
+    nombre: str = Field(..., min_length=1, max_length=255)
+    descripcion: Optional[str] = Field(None, max_length=500)
+
+class FilaHistoria(BaseModel):
+    clave_externa: Optional[str] = Field(None, max_length=255)
+    proyecto_id: Optional[int] = None
+    proyecto_clave: Optional[str] = None
+    titulo: str = Field(..., min_length=1, max_length=255)
+    descripcion: Optional[str] = None
+    estado: EstadoHistoria = EstadoHistoria.pendiente
+    prioridad: Prioridad = Prioridad.media
+
+    @model_validator(mode="after")
+    def _con_proyecto(self):
+        if self.proyecto_id is None and not self.proyecto_clave:
+            raise ValueError("Se requiere proyecto_id o proyecto_clave")
+        return self
+
+class FilaTicket(BaseModel):
+    clave_externa: Optional[str] = Field(None, max_length=255)
+    historia_usuario_id: Optional[int] = None
+    historia_clave: Optional[str] = None
+    asunto: str = Field(..., min_length=1, max_length=255)
+    descripcion: Optional[str] = None
+    estado: EstadoTicket = EstadoTicket.abierto
+    prioridad: Prioridad = Prioridad.media
+
+    @model_validator(mode="after")
+    def _con_historia(self):
+        if self.historia_usuario_id is None and not self.historia_clave:
+            raise ValueError("Se requiere historia_usuario_id o historia_clave")
+        return self
+
+
+# --- Estado de una importación ---
+
+class ImportacionResponse(BaseModel):
+    id: int
+    tipo: str
+    formato: str
+    estado: str
+    filas_procesadas: int
+    filas_creadas: int
+    filas_existentes: int
+    filas_error: int
+    fecha_creacion: datetime
+
+    class Config:
+        from_attributes = True
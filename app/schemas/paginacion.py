@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    # Token opaco para pedir la siguiente página; None si no hay más resultados
+    siguiente_cursor: Optional[str] = None
+    limite: int
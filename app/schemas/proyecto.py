@@ -1,6 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from app.schemas.historia_usuario import HistoriaUsuarioResponse
+from app.schemas.ticket import TicketResponse
 
 class ProyectoBase(BaseModel):
     nombre: str
@@ -13,6 +15,14 @@ class ProyectoCreate(ProyectoBase):
 class ProyectoResponse(ProyectoBase):
     id: int
     fecha_registro: datetime
+    clave_externa: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+# Tablero: proyecto → historias → tickets en una sola respuesta
+class HistoriaTablero(HistoriaUsuarioResponse):
+    tickets: List[TicketResponse] = []
+
+class ProyectoTablero(ProyectoResponse):
+    historias: List[HistoriaTablero] = []
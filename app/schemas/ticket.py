@@ -1,15 +1,23 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
+from app.core.config import BULK_MAX_ITEMS
+from app.schemas.bulk import ErrorItem
+from app.schemas.enums import EnumNormalizado, Prioridad
+
+class EstadoTicket(EnumNormalizado):
+    abierto = "abierto"
+    en_progreso = "en_progreso"
+    cerrado = "cerrado"
 
 class TicketEstadoUpdate(BaseModel):
-    estado: str
+    estado: EstadoTicket
 
 class TicketBase(BaseModel):
     asunto: str
     descripcion: Optional[str] = None
-    estado: Optional[str] = "abierto"     # abierto, en_progreso, cerrado
-    prioridad: Optional[str] = "media"    # baja, media, alta
+    estado: EstadoTicket = EstadoTicket.abierto
+    prioridad: Prioridad = Prioridad.media
 
 class TicketCreate(TicketBase):
     historia_usuario_id: int
@@ -17,6 +25,33 @@ class TicketCreate(TicketBase):
 class TicketResponse(TicketBase):
     id: int
     fecha_creacion: datetime
+    clave_externa: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+class TicketBulkCreate(BaseModel):
+    items: List[TicketCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class TicketBulkResponse(BaseModel):
+    creados: List[TicketResponse]
+    errores: List[ErrorItem]
+
+class TicketEstadoBulkUpdate(BaseModel):
+    estado: EstadoTicket                          # estado destino
+    ids: Optional[List[int]] = Field(None, max_length=BULK_MAX_ITEMS)
+    historia_usuario_id: Optional[int] = None
+    estado_actual: Optional[EstadoTicket] = None  # solo tickets que estén en este estado
+    dry_run: bool = False                         # solo cuenta, no modifica
+
+    @model_validator(mode="after")
+    def requiere_seleccion(self):
+        # Sin ids ni historia se cambiarían todos los tickets de la empresa
+        if self.ids is None and self.historia_usuario_id is None:
+            raise ValueError("Indica 'ids' o 'historia_usuario_id'")
+        return self
+
+class TicketEstadoBulkResponse(BaseModel):
+    ids: List[int]
+    total: int
+    dry_run: bool
@@ -1,15 +1,29 @@
 from sqlalchemy.orm import Session
+from app.db.paginacion import paginar
+from app.db.session import run_db
 from app.models.empresa import Empresa
 from app.schemas.empresa import EmpresaCreate
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password_async, verify_and_update_password_async
 
 
-def crear_empresa(db: Session, data: EmpresaCreate):
+def obtener_empresa_por_email(db: Session, email: str):
+    return db.query(Empresa).filter(Empresa.email_contacto == email).first()
+
+
+def listar_empresas(db: Session, cursor=None, limite=50):
+    return paginar(db.query(Empresa), (Empresa.id,), cursor, limite)
+
+
+def resumen_empresas(db: Session, cursor=None, limite=50):
+    return paginar(db.query(Empresa.id, Empresa.nombre), (Empresa.id,), cursor, limite)
+
+
+def _insertar_empresa(db: Session, data: EmpresaCreate, hashed_password: str):
     empresa = Empresa(
         nombre=data.nombre,
         identificacion_tributaria=data.identificacion_tributaria,
         email_contacto=data.email_contacto,
-        hashed_password=hash_password(data.password),
+        hashed_password=hashed_password,
         telefono_contacto=data.telefono_contacto,
         direccion=data.direccion,
         pais=data.pais,
@@ -21,10 +35,26 @@ def crear_empresa(db: Session, data: EmpresaCreate):
     return empresa
 
 
-def autenticar_empresa(db: Session, email: str, password: str):
-    empresa = db.query(Empresa).filter(Empresa.email_contacto == email).first()
+def _actualizar_hash(db: Session, empresa: Empresa, nuevo_hash: str):
+    empresa.hashed_password = nuevo_hash
+    db.commit()
+    db.refresh(empresa)
+    return empresa
+
+
+async def crear_empresa(db, data: EmpresaCreate):
+    hashed_password = await hash_password_async(data.password)
+    return await run_db(db, _insertar_empresa, data, hashed_password)
+
+
+async def autenticar_empresa(db, email: str, password: str):
+    empresa = await run_db(db, obtener_empresa_por_email, email)
     if not empresa:
         return None
-    if not verify_password(password, empresa.hashed_password):
+    valida, nuevo_hash = await verify_and_update_password_async(password, empresa.hashed_password)
+    if not valida:
         return None
+    if nuevo_hash:
+        # El costo de bcrypt configurado cambió: se guarda el hash recalculado
+        await run_db(db, _actualizar_hash, empresa, nuevo_hash)
     return empresa
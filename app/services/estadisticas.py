@@ -0,0 +1,117 @@
+from collections import Counter
+from typing import Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.models.estadistica_ticket import EstadisticaTicket
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.ticket import Ticket
+from app.repositories.historia_usuario import historia_de_empresa
+from app.repositories.proyecto import proyecto_de_empresa
+
+
+def _resumen(filas) -> dict:
+    por_estado, por_prioridad, detalle = Counter(), Counter(), []
+    for estado, prioridad, total in filas:
+        if not total:
+            continue
+        por_estado[estado] += total
+        por_prioridad[prioridad] += total
+        detalle.append({"estado": estado, "prioridad": prioridad, "total": total})
+    return {
+        "total": sum(por_estado.values()),
+        "por_estado": dict(por_estado),
+        "por_prioridad": dict(por_prioridad),
+        "detalle": detalle,
+    }
+
+
+def _conteos(db: Session, *condiciones):
+    query = (
+        select(EstadisticaTicket.estado, EstadisticaTicket.prioridad, func.sum(EstadisticaTicket.total))
+        .where(*condiciones)
+        .group_by(EstadisticaTicket.estado, EstadisticaTicket.prioridad)
+        .order_by(EstadisticaTicket.estado, EstadisticaTicket.prioridad)
+    )
+    return _resumen(db.execute(query).all())
+
+
+def estadisticas_empresa(db: Session, empresa_id: int):
+    return _conteos(db, EstadisticaTicket.empresa_id == empresa_id)
+
+
+def estadisticas_proyecto(db: Session, proyecto_id: int, empresa_id: int):
+    """Conteos del proyecto o None si no es de la empresa."""
+    if not proyecto_de_empresa(db, proyecto_id, empresa_id):
+        return None
+    return _conteos(
+        db,
+        EstadisticaTicket.empresa_id == empresa_id,
+        EstadisticaTicket.historia_usuario_id.in_(
+            select(HistoriaUsuario.id).where(HistoriaUsuario.proyecto_id == proyecto_id)
+        ),
+    )
+
+
+def estadisticas_historia(db: Session, historia_id: int, empresa_id: int):
+    """Conteos de la historia o None si no es de la empresa."""
+    if not historia_de_empresa(db, historia_id, empresa_id):
+        return None
+    return _conteos(
+        db,
+        EstadisticaTicket.empresa_id == empresa_id,
+        EstadisticaTicket.historia_usuario_id == historia_id,
+    )
+
+
+# --- Recalcular desde tickets ---
+
+def _conteo_real(historia_ids=None):
+    query = (
+        select(Ticket.historia_usuario_id, Ticket.empresa_id, Ticket.estado, Ticket.prioridad, func.count())
+        .group_by(Ticket.historia_usuario_id, Ticket.empresa_id, Ticket.estado, Ticket.prioridad)
+    )
+    if historia_ids is not None:
+        query = query.where(Ticket.historia_usuario_id.in_(historia_ids))
+    return query
+
+
+def recalcular(db: Session, historia_ids: Optional[list] = None):
+    """Reemplaza los conteos (de las historias dadas o de todas) por un GROUP BY sobre tickets.
+
+    No hace commit: se usa dentro de la transacción que modificó los tickets.
+    """
+    borrar = delete(EstadisticaTicket)
+    if historia_ids is not None:
+        if not historia_ids:
+            return
+        borrar = borrar.where(EstadisticaTicket.historia_usuario_id.in_(historia_ids))
+    db.execute(borrar)
+    db.execute(
+        insert(EstadisticaTicket).from_select(
+            ["historia_usuario_id", "empresa_id", "estado", "prioridad", "total"],
+            _conteo_real(historia_ids),
+        )
+    )
+
+
+def verificar(db: Session) -> list:
+    """Diferencias entre estadisticas_tickets y el conteo real de tickets."""
+    reales = {tuple(fila[:4]): fila[4] for fila in db.execute(_conteo_real())}
+    guardados = {
+        (fila.historia_usuario_id, fila.empresa_id, fila.estado, fila.prioridad): fila.total
+        for fila in db.execute(select(EstadisticaTicket.__table__))
+    }
+    diferencias = []
+    for clave in sorted(reales.keys() | guardados.keys()):
+        real, guardado = reales.get(clave, 0), guardados.get(clave, 0)
+        if real != guardado:
+            historia_id, empresa_id, estado, prioridad = clave
+            diferencias.append({
+                "historia_usuario_id": historia_id,
+                "empresa_id": empresa_id,
+                "estado": estado,
+                "prioridad": prioridad,
+                "guardado": guardado,
+                "real": real,
+            })
+    return diferencias
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import literal, null, select
+from app.db.paginacion import valor_comparable
+from app.db.session import iterar_por_bloques, nueva_sesion
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.proyecto import Proyecto
+from app.models.ticket import Ticket
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Filas por bloque del cursor; cada bloque se serializa y se envía de una vez
+FILAS_POR_BLOQUE = 1000
+
+# Columnas comunes a los tres tipos de fila (CSV) en el orden de salida
+COLUMNAS = [
+    "tipo", "id", "proyecto_id", "historia_usuario_id", "titulo", "descripcion",
+    "estado", "prioridad", "fecha_creacion", "fecha_actualizacion",
+]
+
+
+def _consultas(empresa_id: int, updated_since):
+    """Un SELECT por tipo, con las columnas de COLUMNAS y solo datos de la empresa."""
+    consultas = [
+        select(
+            literal("proyecto").label("tipo"), Proyecto.id, Proyecto.id.label("proyecto_id"),
+            null().label("historia_usuario_id"), Proyecto.nombre.label("titulo"), Proyecto.descripcion,
+            null().label("estado"), null().label("prioridad"),
+            Proyecto.fecha_registro.label("fecha_creacion"), Proyecto.fecha_actualizacion,
+        ).where(Proyecto.empresa_id == empresa_id),
+        select(
+            literal("historia").label("tipo"), HistoriaUsuario.id, HistoriaUsuario.proyecto_id,
+            null().label("historia_usuario_id"), HistoriaUsuario.titulo, HistoriaUsuario.descripcion,
+            HistoriaUsuario.estado, HistoriaUsuario.prioridad,
+            HistoriaUsuario.fecha_creacion, HistoriaUsuario.fecha_actualizacion,
+        ).where(HistoriaUsuario.empresa_id == empresa_id),
+        select(
+            literal("ticket").label("tipo"), Ticket.id, null().label("proyecto_id"),
+            Ticket.historia_usuario_id, Ticket.asunto.label("titulo"), Ticket.descripcion,
+            Ticket.estado, Ticket.prioridad,
+            Ticket.fecha_creacion, Ticket.fecha_actualizacion,
+        ).where(Ticket.empresa_id == empresa_id),
+    ]
+    modelos = (Proyecto, HistoriaUsuario, Ticket)
+    if updated_since is not None:
+        consultas = [
+            consulta.where(modelo.fecha_actualizacion >= updated_since)
+            for consulta, modelo in zip(consultas, modelos)
+        ]
+    return [consulta.order_by(modelo.id) for consulta, modelo in zip(consultas, modelos)]
+
+
+def _valor_json(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def _ndjson(filas) -> str:
+    return "".join(
+        json.dumps({c: _valor_json(v) for c, v in zip(COLUMNAS, fila)}, ensure_ascii=False) + "\n"
+        for fila in filas
+    )
+
+
+def _csv(filas) -> str:
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerows([_valor_json(v) for v in fila] for fila in filas)
+    return salida.getvalue()
+
+
+async def generar_exportacion(empresa_id: int, formato: str, updated_since: Optional[datetime] = None,
+                              comprimir: bool = False):
+    """Genera la exportación completa de la empresa por bloques (bytes).
+
+    La memoria usada depende de FILAS_POR_BLOQUE, no de cuántas filas tenga la empresa.
+    """
+    serializar = _ndjson if formato == "ndjson" else _csv
+    # wbits=31: formato gzip (cabecera + CRC), compatible con Content-Encoding: gzip
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None
+
+    def salida(texto: str) -> bytes:
+        datos = texto.encode()
+        return compresor.compress(datos) if compresor else datos
+
+    if formato == "csv":
+        yield salida(_csv([COLUMNAS]))
+
+    async with nueva_sesion() as db:
+        desde = valor_comparable(db.bind.dialect.name, updated_since)
+        for consulta in _consultas(empresa_id, desde):
+            async for bloque in iterar_por_bloques(db, consulta, FILAS_POR_BLOQUE):
+                datos = salida(serializar(bloque))
+                if datos:
+                    yield datos
+
+    if compresor:
+        yield compresor.flush()
@@ -0,0 +1,111 @@
+from typing import List
+from sqlalchemy.orm import Session
+from app.core.serializacion import con_forma, forma_rapida
+from app.db.bulk import insertar_multifila
+from app.db.busqueda import buscar
+from app.db.escritura import actualizar_de_empresa, insertar_bajo_padre
+from app.db.filtros import filtrar_listado
+from app.db.paginacion import paginar
+from app.models.consistencia import incrementar_versiones
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.proyecto import Proyecto
+from app.repositories.historia_usuario import historia_de_empresa, query_historias_de_empresa
+from app.schemas.historia_usuario import HistoriaUsuarioCreate, HistoriaUsuarioBase, HistoriaUsuarioResponse
+from app.repositories.proyecto import ids_proyectos_de_empresa
+from app.services.proyecto import obtener_proyecto
+
+# Columnas de HistoriaUsuarioResponse para los listados con JSON_RAPIDO (None si está desactivado)
+FORMA_RESPUESTA = forma_rapida(HistoriaUsuarioResponse, HistoriaUsuario)
+
+
+def crear_historia(db: Session, empresa_id: int, data: HistoriaUsuarioCreate):
+    """Verifica el proyecto e inserta en un solo INSERT ... SELECT ... RETURNING.
+
+    Devuelve la fila creada o None si el proyecto no es de la empresa.
+    """
+    historia = insertar_bajo_padre(db, HistoriaUsuario.__table__, {
+        "proyecto_id": data.proyecto_id,
+        "titulo": data.titulo,
+        "descripcion": data.descripcion,
+        "estado": data.estado,
+        "prioridad": data.prioridad,
+    }, Proyecto.__table__, data.proyecto_id, empresa_id)
+    if not historia:
+        return None
+
+    incrementar_versiones(db.connection(), [(empresa_id, "historias")])
+    db.commit()
+    return historia
+
+
+def crear_historias_bulk(db: Session, empresa_id: int, items: List[HistoriaUsuarioCreate]):
+    """Valida todos los proyectos en una consulta e inserta con un INSERT multi-fila."""
+    propios = ids_proyectos_de_empresa(db, {item.proyecto_id for item in items}, empresa_id)
+
+    valores, errores = [], []
+    for indice, item in enumerate(items):
+        if item.proyecto_id not in propios:
+            errores.append({"indice": indice, "detalle": "Proyecto no encontrado o no pertenece a tu empresa"})
+            continue
+        valores.append({
+            "proyecto_id": item.proyecto_id,
+            "empresa_id": empresa_id,
+            "titulo": item.titulo,
+            "descripcion": item.descripcion,
+            "estado": item.estado,
+            "prioridad": item.prioridad,
+        })
+
+    creados = []
+    if valores:
+        creados = insertar_multifila(db, HistoriaUsuario.__table__, valores)
+        incrementar_versiones(db.connection(), [(empresa_id, "historias")])
+        db.commit()
+    return creados, errores
+
+
+def listar_por_proyecto(db: Session, proyecto_id: int, empresa_id: int, cursor=None, limite=50, filtros=None, forma=None):
+    """Devuelve (historias, siguiente_cursor) o None si el proyecto no es de la empresa.
+
+    Con `forma` las historias son filas con solo sus columnas, no objetos del ORM.
+    """
+    if not obtener_proyecto(db, proyecto_id, empresa_id):
+        return None
+    query = db.query(HistoriaUsuario).filter_by(proyecto_id=proyecto_id)
+    query, columnas, descendente = filtrar_listado(query, HistoriaUsuario, filtros)
+    return paginar(con_forma(query, forma), columnas, cursor, limite, descendente)
+
+
+def buscar_historias(db: Session, empresa_id: int, texto: str, cursor=None, limite=50, forma=None):
+    """Historias de la empresa cuyo título o descripción contienen todas las palabras de `texto`."""
+    return buscar(query_historias_de_empresa(db, empresa_id), HistoriaUsuario, texto, cursor, limite, forma)
+
+
+def obtener_historia(db: Session, historia_id: int, empresa_id: int):
+    return historia_de_empresa(db, historia_id, empresa_id)
+
+
+def actualizar_historia(db: Session, historia_id: int, empresa_id: int, data: HistoriaUsuarioBase):
+    """UPDATE ... RETURNING filtrado por empresa; None si la historia no es de la empresa."""
+    historia, _ = actualizar_de_empresa(db, HistoriaUsuario.__table__, historia_id, empresa_id, {
+        "titulo": data.titulo,
+        "descripcion": data.descripcion,
+        "estado": data.estado,
+        "prioridad": data.prioridad,
+    })
+    if not historia:
+        return None
+
+    incrementar_versiones(db.connection(), [(empresa_id, "historias")])
+    db.commit()
+    return historia
+
+
+def eliminar_historia(db: Session, historia_id: int, empresa_id: int) -> bool:
+    historia = obtener_historia(db, historia_id, empresa_id)
+    if not historia:
+        return False
+
+    db.delete(historia)
+    db.commit()
+    return True
@@ -0,0 +1,232 @@
+import csv
+import io
+import json
+from collections import Counter
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import IMPORT_LOTE
+from app.db.bulk import insertar_omitiendo_duplicados
+from app.db.session import iterar_por_bloques, nueva_sesion, run_db
+from app.models.consistencia import clave_estadistica, incrementar_versiones, sumar_estadisticas
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.importacion import Importacion, ErrorImportacion
+from app.models.proyecto import Proyecto
+from app.models.ticket import Ticket
+from app.schemas.importacion import FilaProyecto, FilaHistoria, FilaTicket, ImportacionResponse
+
+FILAS = {"proyectos": FilaProyecto, "historias": FilaHistoria, "tickets": FilaTicket}
+FORMATOS = ("csv", "ndjson")
+CLAVE_UNICA = ("empresa_id", "clave_externa")
+
+
+def crear_importacion(db: Session, empresa_id: int, tipo: str, formato: str):
+    importacion = Importacion(empresa_id=empresa_id, tipo=tipo, formato=formato, estado="en_curso")
+    db.add(importacion)
+    db.commit()
+    db.refresh(importacion)
+    return importacion
+
+
+def obtener_importacion(db: Session, importacion_id: int, empresa_id: int):
+    return db.query(Importacion).filter(Importacion.id == importacion_id, Importacion.empresa_id == empresa_id).first()
+
+
+# --- Lectura del archivo ---
+
+def leer_registros(texto, formato: str):
+    """Genera (datos, original, error) por registro; `datos` es None si no se pudo leer."""
+    if formato == "csv":
+        for fila in csv.DictReader(texto):
+            # En CSV una celda vacía equivale a un campo ausente
+            datos = {k: v for k, v in fila.items() if k is not None and v not in ("", None)}
+            yield datos, json.dumps(fila, ensure_ascii=False), None
+        return
+
+    for linea in texto:
+        if not linea.strip():
+            continue
+        try:
+            datos = json.loads(linea)
+        except ValueError as exc:
+            yield None, linea.rstrip("\n"), f"JSON inválido: {exc}"
+            continue
+        if not isinstance(datos, dict):
+            yield None, linea.rstrip("\n"), "Se esperaba un objeto JSON por línea"
+            continue
+        yield datos, linea.rstrip("\n"), None
+
+
+def _detalle(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'fila'}: {e['msg']}" for e in exc.errors())
+
+
+# --- Escritura por tipo ---
+# Cada función recibe [(linea, fila validada)] y devuelve (filas creadas,
+# insertadas o ya existentes, errores). Las filas cuyo padre no existe o es de
+# otra empresa se reportan como error.
+
+def _resolver(db: Session, modelo, empresa_id: int, ids: set, claves: set):
+    """ids y claves externas de `modelo` que existen en la empresa -> {id}, {clave: id}."""
+    propios, por_clave = set(), {}
+    if ids:
+        propios = set(db.scalars(select(modelo.id).where(modelo.empresa_id == empresa_id, modelo.id.in_(ids))))
+    if claves:
+        por_clave = dict(db.execute(
+            select(modelo.clave_externa, modelo.id).where(modelo.empresa_id == empresa_id, modelo.clave_externa.in_(claves))
+        ).all())
+    return propios, por_clave
+
+
+def _padres(db: Session, modelo, empresa_id: int, validas, campo_id: str, campo_clave: str, nombre: str):
+    propios, por_clave = _resolver(
+        db, modelo, empresa_id,
+        {getattr(f, campo_id) for _, f in validas if getattr(f, campo_id) is not None},
+        {getattr(f, campo_clave) for _, f in validas if getattr(f, campo_id) is None},
+    )
+    resueltas, errores = [], []
+    for linea, fila in validas:
+        padre_id = getattr(fila, campo_id)
+        padre_id = padre_id if padre_id in propios else por_clave.get(getattr(fila, campo_clave))
+        if padre_id is None:
+            errores.append((linea, f"{nombre} no encontrado"))
+        else:
+            resueltas.append((padre_id, fila))
+    return resueltas, errores
+
+
+def _importar_proyectos(db: Session, empresa_id: int, validas):
+    valores = [
+        {"empresa_id": empresa_id, "clave_externa": f.clave_externa, "nombre": f.nombre, "descripcion": f.descripcion}
+        for _, f in validas
+    ]
+    creados = insertar_omitiendo_duplicados(db, Proyecto.__table__, valores, CLAVE_UNICA)
+    if creados:
+        incrementar_versiones(db.connection(), [(empresa_id, "proyectos")])
+    return creados, len(valores), []
+
+
+def _importar_historias(db: Session, empresa_id: int, validas):
+    resueltas, errores = _padres(db, Proyecto, empresa_id, validas, "proyecto_id", "proyecto_clave", "Proyecto")
+    valores = [
+        {
+            "proyecto_id": proyecto_id, "empresa_id": empresa_id, "clave_externa": f.clave_externa,
+            "titulo": f.titulo, "descripcion": f.descripcion, "estado": f.estado, "prioridad": f.prioridad,
+        }
+        for proyecto_id, f in resueltas
+    ]
+    creados = insertar_omitiendo_duplicados(db, HistoriaUsuario.__table__, valores, CLAVE_UNICA)
+    if creados:
+        incrementar_versiones(db.connection(), [(empresa_id, "historias")])
+    return creados, len(valores), errores
+
+
+def _importar_tickets(db: Session, empresa_id: int, validas):
+    resueltas, errores = _padres(
+        db, HistoriaUsuario, empresa_id, validas, "historia_usuario_id", "historia_clave", "Historia de usuario"
+    )
+    valores = [
+        {
+            "historia_usuario_id": historia_id, "empresa_id": empresa_id, "clave_externa": f.clave_externa,
+            "asunto": f.asunto, "descripcion": f.descripcion, "estado": f.estado, "prioridad": f.prioridad,
+        }
+        for historia_id, f in resueltas
+    ]
+    creados = insertar_omitiendo_duplicados(db, Ticket.__table__, valores, CLAVE_UNICA)
+    if creados:
+        # Inserción Core: las estadísticas no pasan por los listeners del ORM
+        sumar_estadisticas(db.connection(), Counter(clave_estadistica(fila) for fila in creados))
+        incrementar_versiones(db.connection(), [(empresa_id, "tickets")])
+    return creados, len(valores), errores
+
+
+IMPORTADORES = {"proyectos": _importar_proyectos, "historias": _importar_historias, "tickets": _importar_tickets}
+
+
+# --- Proceso ---
+
+def _procesar_lote(db: Session, importacion: Importacion, bloque: list):
+    modelo = FILAS[importacion.tipo]
+    validas, originales, errores = [], {}, []
+    for linea, (datos, original, error) in bloque:
+        originales[linea] = original
+        if error is None:
+            try:
+                validas.append((linea, modelo.model_validate(datos)))
+                continue
+            except ValidationError as exc:
+                error = _detalle(exc)
+        errores.append((linea, error))
+
+    creados, intentadas, errores_padre = IMPORTADORES[importacion.tipo](db, importacion.empresa_id, validas)
+    errores.extend(errores_padre)
+
+    if errores:
+        db.execute(insert(ErrorImportacion), [
+            {"importacion_id": importacion.id, "linea": linea, "detalle": detalle, "datos": originales[linea]}
+            for linea, detalle in errores
+        ])
+    importacion.filas_procesadas += len(bloque)
+    importacion.filas_creadas += len(creados)
+    importacion.filas_existentes += intentadas - len(creados)
+    importacion.filas_error += len(errores)
+
+
+def _progreso(importacion: Importacion) -> dict:
+    return ImportacionResponse.model_validate(importacion).model_dump(mode="json")
+
+
+def procesar_importacion(db: Session, importacion: Importacion, texto, lote: int = IMPORT_LOTE):
+    """Importa `texto` por lotes y genera el progreso tras cada commit.
+
+    Cada lote y el avance de la importación se confirman juntos: si el proceso
+    se corta, al reanudar se saltan exactamente las filas ya procesadas.
+    """
+    registros = enumerate(leer_registros(texto, importacion.formato), start=1)
+    registros = islice(registros, importacion.filas_procesadas, None)
+    while bloque := list(islice(registros, lote)):
+        _procesar_lote(db, importacion, bloque)
+        db.commit()
+        yield _progreso(importacion)
+
+    importacion.estado = "completada"
+    db.commit()
+    yield _progreso(importacion)
+
+
+def _siguiente(db: Session, pasos):
+    return next(pasos, None)
+
+
+async def generar_progreso(importacion_id: int, empresa_id: int, archivo):
+    """Procesa un archivo ya recibido y envía una línea NDJSON de progreso por lote."""
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    try:
+        async with nueva_sesion() as db:
+            importacion = await run_db(db, obtener_importacion, importacion_id, empresa_id)
+            pasos = await run_db(db, procesar_importacion, importacion, texto)
+            while (progreso := await run_db(db, _siguiente, pasos)) is not None:
+                yield json.dumps(progreso) + "\n"
+    finally:
+        texto.close()
+
+
+async def generar_reporte_errores(importacion_id: int):
+    """CSV con las filas rechazadas de una importación (linea, detalle, datos)."""
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(["linea", "detalle", "datos"])
+    consulta = (
+        select(ErrorImportacion.linea, ErrorImportacion.detalle, ErrorImportacion.datos)
+        .where(ErrorImportacion.importacion_id == importacion_id)
+        .order_by(ErrorImportacion.linea)
+    )
+    async with nueva_sesion() as db:
+        async for bloque in iterar_por_bloques(db, consulta, 1000):
+            escritor.writerows(bloque)
+            yield salida.getvalue()
+            salida.seek(0)
+            salida.truncate()
+    if salida.getvalue():
+        yield salida.getvalue()
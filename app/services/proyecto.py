@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session, selectinload
+from app.db.escritura import actualizar_de_empresa, insertar_fila
+from app.db.paginacion import paginar
+from app.models.consistencia import incrementar_versiones
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.proyecto import Proyecto
+from app.repositories.proyecto import proyecto_de_empresa, query_proyectos_de_empresa
+from app.schemas.proyecto import ProyectoCreate, ProyectoBase
+
+
+def crear_proyecto(db: Session, empresa_id: int, data: ProyectoCreate):
+    """INSERT ... RETURNING: devuelve la fila creada, sin refresh tras el commit."""
+    nuevo_proyecto = insertar_fila(db, Proyecto.__table__, {
+        "nombre": data.nombre,
+        "descripcion": data.descripcion,
+        "empresa_id": empresa_id,  # ✅ se extrae del token
+    })
+    incrementar_versiones(db.connection(), [(empresa_id, "proyectos")])
+    db.commit()
+    return nuevo_proyecto
+
+
+def listar_proyectos(db: Session, empresa_id: int, cursor=None, limite=50):
+    return paginar(query_proyectos_de_empresa(db, empresa_id), (Proyecto.id,), cursor, limite)
+
+
+def obtener_proyecto(db: Session, proyecto_id: int, empresa_id: int):
+    return proyecto_de_empresa(db, proyecto_id, empresa_id)
+
+
+def actualizar_proyecto(db: Session, proyecto_id: int, empresa_id: int, data: ProyectoBase):
+    """UPDATE ... RETURNING filtrado por empresa; None si el proyecto no es de la empresa."""
+    proyecto, _ = actualizar_de_empresa(db, Proyecto.__table__, proyecto_id, empresa_id, {
+        "nombre": data.nombre,
+        "descripcion": data.descripcion,
+    })
+    if not proyecto:
+        return None
+
+    incrementar_versiones(db.connection(), [(empresa_id, "proyectos")])
+    db.commit()
+    return proyecto
+
+
+def eliminar_proyecto(db: Session, proyecto_id: int, empresa_id: int) -> bool:
+    # La cascada del ORM recorre historias y tickets (los listeners descuentan
+    # las estadísticas): se cargan con una consulta por nivel y no por historia
+    proyecto = (
+        query_proyectos_de_empresa(db, empresa_id)
+        .options(selectinload(Proyecto.historias_usuario).selectinload(HistoriaUsuario.tickets))
+        .filter(Proyecto.id == proyecto_id)
+        .first()
+    )
+    if not proyecto:
+        return False
+
+    db.delete(proyecto)
+    db.commit()
+    return True
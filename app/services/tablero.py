@@ -0,0 +1,89 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.serializacion import con_forma, forma_rapida
+from app.db.paginacion import paginar
+from app.db.session import nueva_sesion, run_db
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.ticket import Ticket
+from app.schemas.historia_usuario import HistoriaUsuarioResponse
+from app.schemas.proyecto import ProyectoResponse
+from app.schemas.ticket import TicketResponse
+
+# Tickets leídos por consulta mientras se arma el tablero
+TICKETS_POR_BLOQUE = 500
+
+# Con JSON_RAPIDO historias y tickets se leen como columnas y se serializan con orjson
+HISTORIAS_RAPIDO = forma_rapida(HistoriaUsuarioResponse, HistoriaUsuario)
+TICKETS_RAPIDO = forma_rapida(TicketResponse, Ticket, extras=("historia_usuario_id",))
+
+
+def historias_del_proyecto(db: Session, proyecto_id: int, empresa_id: int, forma=None):
+    return (
+        con_forma(db.query(HistoriaUsuario), forma)
+        .filter(HistoriaUsuario.proyecto_id == proyecto_id, HistoriaUsuario.empresa_id == empresa_id)
+        .order_by(HistoriaUsuario.id)
+        .all()
+    )
+
+
+def bloque_tickets_del_proyecto(db: Session, proyecto_id: int, empresa_id: int, estado: Optional[str],
+                                prioridad: Optional[str], cursor=None, limite=TICKETS_POR_BLOQUE, forma=None):
+    """Tickets del proyecto ordenados por (historia, id), paginados por keyset."""
+    query = db.query(Ticket).filter(
+        Ticket.empresa_id == empresa_id,
+        Ticket.historia_usuario_id.in_(
+            select(HistoriaUsuario.id).where(HistoriaUsuario.proyecto_id == proyecto_id)
+        ),
+    )
+    if estado is not None:
+        query = query.filter(Ticket.estado == estado)
+    if prioridad is not None:
+        query = query.filter(Ticket.prioridad == prioridad)
+    return paginar(con_forma(query, forma), (Ticket.historia_usuario_id, Ticket.id), cursor, limite)
+
+
+def _json(schema, forma, obj) -> str:
+    return forma.json(obj) if forma is not None else schema.model_validate(obj).model_dump_json()
+
+
+def _abrir_objeto(schema, obj, campo: str, forma=None) -> str:
+    # '{"id":1,...}' -> '{"id":1,...,"campo":['
+    return _json(schema, forma, obj)[:-1] + f',"{campo}":['
+
+
+async def generar_tablero(proyecto, empresa_id: int, estado: Optional[str] = None, prioridad: Optional[str] = None):
+    """Genera el JSON del tablero por partes, sin tener todo el árbol en memoria.
+
+    Historias y tickets vienen ordenados por id de historia, así que basta con
+    recorrer ambas secuencias a la vez. Las dos lecturas no comparten snapshot:
+    los tickets de una historia que no está en la lista (p. ej. movida al
+    proyecto entre una y otra) se saltan, sin cortar el recorrido.
+    """
+    async with nueva_sesion() as db:
+        historias = await run_db(db, historias_del_proyecto, proyecto.id, empresa_id, HISTORIAS_RAPIDO)
+
+        yield _abrir_objeto(ProyectoResponse, proyecto, "historias")
+
+        tickets, cursor, agotado = [], None, False
+        for indice, historia in enumerate(historias):
+            yield ("," if indice else "") + _abrir_objeto(HistoriaUsuarioResponse, historia, "tickets", HISTORIAS_RAPIDO)
+            primero = True
+            while True:
+                if not tickets and not agotado:
+                    tickets, cursor = await run_db(
+                        db, bloque_tickets_del_proyecto, proyecto.id, empresa_id, estado, prioridad, cursor,
+                        forma=TICKETS_RAPIDO,
+                    )
+                    tickets.reverse()  # pop() desde el final conserva el orden
+                    agotado = cursor is None
+                if tickets and tickets[-1].historia_usuario_id < historia.id:
+                    tickets.pop()
+                    continue
+                if not tickets or tickets[-1].historia_usuario_id != historia.id:
+                    break
+                yield ("" if primero else ",") + _json(TicketResponse, TICKETS_RAPIDO, tickets.pop())
+                primero = False
+            yield "]}"
+
+        yield "]}"
@@ -0,0 +1,177 @@
+from collections import Counter
+from typing import List
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core.serializacion import con_forma, forma_rapida
+from app.db.bulk import insertar_multifila
+from app.db.busqueda import buscar
+from app.db.escritura import actualizar_de_empresa, insertar_bajo_padre
+from app.db.filtros import filtrar_listado
+from app.db.paginacion import paginar
+from app.models.consistencia import clave_estadistica, incrementar_versiones, sumar_estadisticas
+from app.models.historia_usuario import HistoriaUsuario
+from app.models.ticket import Ticket
+from app.repositories.historia_usuario import historia_de_empresa, ids_historias_de_empresa
+from app.repositories.ticket import query_tickets_de_empresa, ticket_de_empresa
+from app.schemas.enums import Prioridad
+from app.schemas.ticket import EstadoTicket, TicketCreate, TicketBase, TicketEstadoBulkUpdate, TicketResponse
+from app.services.estadisticas import recalcular
+
+# Columnas de TicketResponse para los listados con JSON_RAPIDO (None si está desactivado)
+FORMA_RESPUESTA = forma_rapida(TicketResponse, Ticket)
+
+
+def obtener_ticket(db: Session, ticket_id: int, empresa_id: int):
+    return ticket_de_empresa(db, ticket_id, empresa_id)
+
+
+def crear_ticket(db: Session, empresa_id: int, data: TicketCreate):
+    """Verifica la historia e inserta en un solo INSERT ... SELECT ... RETURNING.
+
+    Devuelve la fila creada o None si la historia no es de la empresa.
+    """
+    nuevo_ticket = insertar_bajo_padre(db, Ticket.__table__, {
+        "historia_usuario_id": data.historia_usuario_id,
+        "asunto": data.asunto,
+        "descripcion": data.descripcion,
+        "estado": data.estado,
+        "prioridad": data.prioridad,
+    }, HistoriaUsuario.__table__, data.historia_usuario_id, empresa_id)
+    if not nuevo_ticket:
+        return None
+
+    # El INSERT Core no pasa por los listeners del ORM
+    sumar_estadisticas(db.connection(), Counter({clave_estadistica(nuevo_ticket): 1}))
+    incrementar_versiones(db.connection(), [(empresa_id, "tickets")])
+    db.commit()
+    return nuevo_ticket
+
+
+def crear_tickets_bulk(db: Session, empresa_id: int, items: List[TicketCreate]):
+    """Valida todas las historias en una consulta e inserta con un INSERT multi-fila.
+
+    Devuelve (filas creadas, errores por índice). Los elementos cuya historia no
+    existe o es de otra empresa se reportan y no se insertan.
+    """
+    propias = ids_historias_de_empresa(db, {item.historia_usuario_id for item in items}, empresa_id)
+
+    valores, errores = [], []
+    for indice, item in enumerate(items):
+        if item.historia_usuario_id not in propias:
+            errores.append({"indice": indice, "detalle": "Historia de usuario no encontrada"})
+            continue
+        valores.append({
+            "historia_usuario_id": item.historia_usuario_id,
+            "empresa_id": empresa_id,
+            "asunto": item.asunto,
+            "descripcion": item.descripcion,
+            "estado": item.estado,
+            "prioridad": item.prioridad,
+        })
+
+    creados = []
+    if valores:
+        creados = insertar_multifila(db, Ticket.__table__, valores)
+        # El INSERT Core no pasa por los listeners del ORM
+        sumar_estadisticas(db.connection(), Counter(clave_estadistica(fila) for fila in creados))
+        incrementar_versiones(db.connection(), [(empresa_id, "tickets")])
+        db.commit()
+    return creados, errores
+
+
+def listar_tickets(db: Session, historia_usuario_id: int, empresa_id: int, cursor=None, limite=50, filtros=None, forma=None):
+    """Devuelve (tickets, siguiente_cursor) o None si la historia no es de la empresa.
+
+    Con `forma` los tickets son filas con solo sus columnas, no objetos del ORM.
+    """
+    if not historia_de_empresa(db, historia_usuario_id, empresa_id):
+        return None
+    query = db.query(Ticket).filter(Ticket.historia_usuario_id == historia_usuario_id)
+    query, columnas, descendente = filtrar_listado(query, Ticket, filtros)
+    return paginar(con_forma(query, forma), columnas, cursor, limite, descendente)
+
+
+def listar_tickets_empresa(db: Session, empresa_id: int, cursor=None, limite=50, filtros=None, forma=None):
+    """Tickets de todos los proyectos de la empresa; devuelve (tickets, siguiente_cursor)."""
+    query, columnas, descendente = filtrar_listado(query_tickets_de_empresa(db, empresa_id), Ticket, filtros)
+    return paginar(con_forma(query, forma), columnas, cursor, limite, descendente)
+
+
+def buscar_tickets(db: Session, empresa_id: int, texto: str, cursor=None, limite=50, forma=None):
+    """Tickets de la empresa cuyo asunto o descripción contienen todas las palabras de `texto`."""
+    return buscar(query_tickets_de_empresa(db, empresa_id), Ticket, texto, cursor, limite, forma)
+
+
+def _actualizar(db: Session, ticket_id: int, empresa_id: int, valores: dict):
+    """UPDATE ... RETURNING filtrado por empresa que mueve el conteo de estadísticas del ticket."""
+    ticket, anterior = actualizar_de_empresa(
+        db, Ticket.__table__, ticket_id, empresa_id, valores, anteriores=("estado", "prioridad")
+    )
+    if not ticket:
+        return None
+
+    # El UPDATE Core no pasa por los listeners del ORM
+    nueva = clave_estadistica(ticket)
+    previa = (ticket.historia_usuario_id, ticket.empresa_id, EstadoTicket(anterior["estado"]), Prioridad(anterior["prioridad"]))
+    if previa != nueva:
+        sumar_estadisticas(db.connection(), Counter({previa: -1, nueva: 1}))
+    incrementar_versiones(db.connection(), [(empresa_id, "tickets")])
+    db.commit()
+    return ticket
+
+
+def actualizar_ticket(db: Session, ticket_id: int, empresa_id: int, data: TicketBase):
+    return _actualizar(db, ticket_id, empresa_id, {
+        "asunto": data.asunto,
+        "descripcion": data.descripcion,
+        "estado": data.estado,
+        "prioridad": data.prioridad,
+    })
+
+
+def actualizar_estado(db: Session, ticket_id: int, empresa_id: int, estado: str):
+    return _actualizar(db, ticket_id, empresa_id, {"estado": estado})
+
+
+def eliminar_ticket(db: Session, ticket_id: int, empresa_id: int) -> bool:
+    ticket = obtener_ticket(db, ticket_id, empresa_id)
+    if not ticket:
+        return False
+
+    db.delete(ticket)
+    db.commit()
+    return True
+
+
+def actualizar_estado_bulk(db: Session, empresa_id: int, data: TicketEstadoBulkUpdate):
+    """Cambia el estado de todos los tickets seleccionados con un único UPDATE ... RETURNING.
+
+    Devuelve (ids afectados, total). En dry_run solo cuenta y no devuelve ids.
+    """
+    condiciones = [Ticket.empresa_id == empresa_id]
+    if data.ids is not None:
+        condiciones.append(Ticket.id.in_(data.ids))
+    if data.historia_usuario_id is not None:
+        condiciones.append(Ticket.historia_usuario_id == data.historia_usuario_id)
+    if data.estado_actual is not None:
+        condiciones.append(Ticket.estado == data.estado_actual)
+
+    if data.dry_run:
+        total = db.scalar(select(func.count()).select_from(Ticket).where(*condiciones))
+        return [], total
+
+    stmt = (
+        update(Ticket)
+        .where(*condiciones)
+        .values(estado=data.estado)
+        .returning(Ticket.id, Ticket.historia_usuario_id)
+        .execution_options(synchronize_session=False)
+    )
+    filas = db.execute(stmt).all()
+    ids = sorted(fila.id for fila in filas)
+    # Sin el estado anterior de cada fila, se recuentan las historias afectadas
+    recalcular(db, sorted({fila.historia_usuario_id for fila in filas}))
+    if filas:
+        incrementar_versiones(db.connection(), [(empresa_id, "tickets")])
+    db.commit()
+    return ids, len(ids)
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from app.models.empresa import Empresa
+from app.models.usuario import Usuario
+from app.schemas.usuario import UsuarioCreate
+
+
+def obtener_empresa_activa(db: Session, empresa_id: int):
+    return db.query(Empresa).filter(
+        Empresa.id == empresa_id,
+        Empresa.activa == True
+    ).first()
+
+
+def obtener_usuario_por_email(db: Session, email: str):
+    return db.query(Usuario).filter(Usuario.email == email).first()
+
+
+def crear_usuario(db: Session, data: UsuarioCreate, password_hash: str):
+    nuevo_usuario = Usuario(
+        nombre=data.nombre,
+        email=data.email,
+        password_hash=password_hash,
+        rol=data.rol,
+        empresa_id=data.empresa_id,
+        activo=True
+    )
+
+    db.add(nuevo_usuario)
+    db.commit()
+    db.refresh(nuevo_usuario)
+    return nuevo_usuario
+
+
+def actualizar_password_hash(db: Session, usuario: Usuario, password_hash: str):
+    usuario.password_hash = password_hash
+    db.commit()
+    db.refresh(usuario)
+    return usuario
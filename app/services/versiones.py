@@ -0,0 +1,15 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.version_coleccion import VersionColeccion
+
+
+def versiones_colecciones(db: Session, empresa_id: int, colecciones) -> dict:
+    """Versión actual de cada colección de la empresa (0 si nunca se escribió)."""
+    filas = db.execute(
+        select(VersionColeccion.coleccion, VersionColeccion.version).where(
+            VersionColeccion.empresa_id == empresa_id,
+            VersionColeccion.coleccion.in_(colecciones),
+        )
+    )
+    actuales = dict(filas.all())
+    return {coleccion: actuales.get(coleccion, 0) for coleccion in colecciones}
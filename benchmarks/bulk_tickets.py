@@ -0,0 +1,50 @@
+"""Creación de N tickets: N llamadas a POST /tickets/ contra una a POST /tickets/bulk.
+
+    python -m benchmarks.bulk_tickets --items 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.comun import cliente_app, configurar_entorno, sembrar_empresa
+
+
+async def correr(args):
+    async with cliente_app() as client:
+        datos = await sembrar_empresa(client)
+        headers, historia_id = datos["headers"], datos["historia"]["id"]
+        items = [{"asunto": f"Ticket {i}", "historia_usuario_id": historia_id} for i in range(args.items)]
+
+        inicio = time.perf_counter()
+        for item in items:
+            respuesta = await client.post("/tickets/tickets/", json=item, headers=headers)
+            assert respuesta.status_code == 201, respuesta.text
+        individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        respuesta = await client.post("/tickets/tickets/bulk", json={"items": items}, headers=headers)
+        bulk = time.perf_counter() - inicio
+        assert len(respuesta.json()["creados"]) == args.items, respuesta.text
+
+    return {
+        "individual_s": round(individual, 3),
+        "individual_tickets_s": round(args.items / individual, 1),
+        "bulk_s": round(bulk, 3),
+        "bulk_tickets_s": round(args.items / bulk, 1),
+        "aceleracion": round(individual / bulk, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    args = parser.parse_args()
+
+    configurar_entorno(DB_MODE=args.db_mode, BULK_MAX_ITEMS=max(args.items, 1000))
+    print(json.dumps({"config": vars(args), "resultado": asyncio.run(correr(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
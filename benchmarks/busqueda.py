@@ -0,0 +1,149 @@
+"""Latencia de GET /tickets/buscar sobre un volumen grande de tickets.
+
+    python -m benchmarks.busqueda --tickets 1000000
+    DATABASE_URL=postgresql://... python -m benchmarks.busqueda --tickets 1000000
+
+Los tickets se reparten entre dos empresas y se insertan directamente con
+INSERT multi-fila (el índice de texto se mantiene igual que en producción).
+Como referencia se mide la misma búsqueda con LIKE '%palabra%', que es lo más
+parecido a filtrar en el cliente sin descargar todo.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.comun import cliente_app, configurar_entorno, percentil, sembrar_empresa
+
+SILABAS = ["ca", "de", "lo", "ma", "ne", "pi", "ro", "sa", "te", "vu", "xi", "zo", "cion", "tar", "ble", "mien"]
+
+
+def vocabulario(n: int, rnd: random.Random) -> list:
+    palabras = set()
+    while len(palabras) < n:
+        palabras.add("".join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 4))))
+    return sorted(palabras)
+
+
+def sembrar_tickets(total: int, historias: list, palabras: list, rnd: random.Random, bloque: int = 5000):
+    """Inserta `total` tickets repartidos entre `historias` [(historia_id, empresa_id)]."""
+    from sqlalchemy import insert
+    from app.db.session import engine
+    from app.models.ticket import Ticket
+
+    # Distribución sesgada: pocas palabras muy frecuentes y una cola larga de raras
+    pesos = [1 / (i + 1) for i in range(len(palabras))]
+    with engine.begin() as conexion:
+        for inicio in range(0, total, bloque):
+            filas = []
+            for _ in range(min(bloque, total - inicio)):
+                historia_id, empresa_id = rnd.choice(historias)
+                filas.append({
+                    "historia_usuario_id": historia_id,
+                    "empresa_id": empresa_id,
+                    "asunto": " ".join(rnd.choices(palabras, pesos, k=rnd.randint(3, 8))),
+                    "descripcion": " ".join(rnd.choices(palabras, pesos, k=rnd.randint(10, 40))),
+                })
+            conexion.execute(insert(Ticket), filas)
+
+
+def empresa_de_historia(historia_id: int) -> int:
+    from app.db.session import SessionLocal
+    from app.models.historia_usuario import HistoriaUsuario
+
+    with SessionLocal() as db:
+        return db.get(HistoriaUsuario, historia_id).empresa_id
+
+
+def busqueda_like(empresa_id: int, palabras: list, limite: int):
+    from sqlalchemy import or_, select
+    from app.db.session import engine
+    from app.models.ticket import Ticket
+
+    consulta = select(Ticket.id).where(Ticket.empresa_id == empresa_id).order_by(Ticket.id).limit(limite)
+    for palabra in palabras:
+        patron = f"%{palabra}%"
+        consulta = consulta.where(or_(Ticket.asunto.like(patron), Ticket.descripcion.like(patron)))
+    with engine.connect() as conexion:
+        return conexion.execute(consulta).all()
+
+
+async def correr(args):
+    rnd = random.Random(args.semilla)
+    palabras = vocabulario(args.vocabulario, rnd)
+
+    async with cliente_app() as client:
+        empresas = [await sembrar_empresa(client, str(i)) for i in (1, 2)]
+        historias = [(e["historia"]["id"], empresa_de_historia(e["historia"]["id"])) for e in empresas]
+
+        inicio = time.perf_counter()
+        sembrar_tickets(args.tickets, historias, palabras, rnd)
+        siembra = time.perf_counter() - inicio
+
+        # Consultas: palabras frecuentes, raras, dos palabras y prefijos
+        consultas = []
+        for _ in range(args.consultas):
+            tipo = rnd.choice(("frecuente", "rara", "dos", "prefijo"))
+            if tipo == "frecuente":
+                q = [rnd.choice(palabras[:20])]
+            elif tipo == "rara":
+                q = [rnd.choice(palabras[len(palabras) // 2:])]
+            elif tipo == "dos":
+                q = rnd.sample(palabras[:200], 2)
+            else:
+                q = [rnd.choice(palabras)[:3]]
+            consultas.append((tipo, q))
+
+        headers, empresa_id = empresas[0]["headers"], historias[0][1]
+        latencias, like, resultados = {}, {}, {}
+        for tipo, q in consultas:
+            inicio = time.perf_counter()
+            respuesta = await client.get(
+                "/tickets/tickets/buscar", params={"q": " ".join(q), "limite": args.limite}, headers=headers
+            )
+            latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+            assert respuesta.status_code == 200, respuesta.text
+            resultados.setdefault(tipo, []).append(len(respuesta.json()["items"]))
+
+            if args.like:
+                inicio = time.perf_counter()
+                busqueda_like(empresa_id, q, args.limite)
+                like.setdefault(tipo, []).append(time.perf_counter() - inicio)
+
+    def resumen(valores):
+        return {
+            "consultas": len(valores),
+            "p50_ms": round(percentil(valores, 50) * 1000, 2),
+            "p95_ms": round(percentil(valores, 95) * 1000, 2),
+            "p99_ms": round(percentil(valores, 99) * 1000, 2),
+        }
+
+    return {
+        "siembra_s": round(siembra, 1),
+        "busqueda": {
+            tipo: {**resumen(valores), "resultados_promedio": round(sum(resultados[tipo]) / len(resultados[tipo]), 1)}
+            for tipo, valores in latencias.items()
+        },
+        "like": {tipo: resumen(valores) for tipo, valores in like.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--vocabulario", type=int, default=5000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--limite", type=int, default=50)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--sin-like", dest="like", action="store_false", help="no medir la referencia con LIKE")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    args = parser.parse_args()
+
+    # Sin cache de respuestas: cada consulta debe llegar a la base
+    configurar_entorno(DB_MODE=args.db_mode, RESPONSE_CACHE_TTL=0)
+    print(json.dumps({"config": vars(args), "resultado": asyncio.run(correr(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
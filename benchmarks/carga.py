@@ -0,0 +1,220 @@
+"""Carga mixta de extremo a extremo: throughput y p50/p95/p99 por ruta.
+
+Levanta la app en el mismo proceso, siembra varias empresas a través de la API
+y lanza usuarios virtuales concurrentes que mezclan login, listado de
+proyectos, tableros, creación de tickets y cambios de estado:
+
+    python -m benchmarks.carga --duracion 30 --salida base.json
+    DATABASE_URL=postgresql://... python -m benchmarks.carga --db-mode async
+
+Para detectar regresiones entre commits se compara contra un resultado previo;
+sale con código 1 si alguna ruta empeora más que `--tolerancia`:
+
+    python -m benchmarks.carga --comparar base.json --tolerancia 20
+
+Con `--presupuestos` cada request debe respetar el presupuesto de consultas de
+su ruta (app/core/consultas.py): los que se exceden cuentan como errores 500,
+el reporte queda en "infracciones" y el código de salida es 1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.comun import cliente_app, configurar_entorno, resumen_latencias, sembrar_empresa
+
+# Operación -> peso por defecto en la mezcla de tráfico
+MEZCLA = {
+    "login": 5,
+    "proyectos": 30,
+    "tablero": 20,
+    "crear_ticket": 20,
+    "estado_ticket": 25,
+}
+ESTADOS = ["abierto", "en_progreso", "cerrado"]
+
+
+async def sembrar(client, indice: int, args) -> dict:
+    """Una empresa con `args.proyectos` proyectos, historias y tickets creados por la API."""
+    datos = await sembrar_empresa(client, f"carga{indice}")
+    headers = datos["headers"]
+    proyectos = [datos["proyecto"]["id"]]
+    for i in range(1, args.proyectos):
+        respuesta = await client.post("/proyectos/proyectos/", json={"nombre": f"Carga {i}"}, headers=headers)
+        proyectos.append(respuesta.json()["id"])
+
+    historias = [datos["historia"]["id"]]
+    for proyecto_id in proyectos:
+        faltan = args.historias - (1 if proyecto_id == proyectos[0] else 0)
+        respuesta = await client.post("/historias-usuario/historias-usuario/bulk", json={"items": [
+            {"titulo": f"Historia {i}", "proyecto_id": proyecto_id} for i in range(faltan)
+        ]}, headers=headers)
+        historias.extend(h["id"] for h in respuesta.json()["creados"])
+
+    tickets = []
+    for historia_id in historias:
+        respuesta = await client.post("/tickets/tickets/bulk", json={"items": [
+            {"asunto": f"Ticket {i}", "historia_usuario_id": historia_id} for i in range(args.tickets)
+        ]}, headers=headers)
+        tickets.extend(t["id"] for t in respuesta.json()["creados"])
+
+    return {**datos, "proyectos": proyectos, "historias": historias, "tickets": tickets}
+
+
+def operaciones(client, empresa: dict, rnd: random.Random) -> dict:
+    """Operación -> (ruta agrupada, corrutina que hace el request)."""
+    headers = empresa["headers"]
+
+    async def crear_ticket():
+        respuesta = await client.post("/tickets/tickets/", json={
+            "asunto": "Carga", "historia_usuario_id": rnd.choice(empresa["historias"]),
+        }, headers=headers)
+        if respuesta.status_code == 201:
+            empresa["tickets"].append(respuesta.json()["id"])
+        return respuesta
+
+    return {
+        "login": ("POST /auth/login", lambda: client.post("/auth/auth/login", json=empresa["credenciales"])),
+        "proyectos": ("GET /proyectos/", lambda: client.get("/proyectos/proyectos/", headers=headers)),
+        "tablero": ("GET /proyectos/{id}/tablero", lambda: client.get(
+            f"/proyectos/proyectos/{rnd.choice(empresa['proyectos'])}/tablero", headers=headers,
+        )),
+        "crear_ticket": ("POST /tickets/", crear_ticket),
+        "estado_ticket": ("PATCH /tickets/{id}/estado", lambda: client.patch(
+            f"/tickets/tickets/{rnd.choice(empresa['tickets'])}/estado",
+            json={"estado": rnd.choice(ESTADOS)}, headers=headers,
+        )),
+    }
+
+
+async def correr(args, mezcla: dict):
+    latencias, errores = defaultdict(list), defaultdict(Counter)
+    async with cliente_app() as client:
+        inicio = time.perf_counter()
+        empresas = [await sembrar(client, i, args) for i in range(args.empresas)]
+        siembra = time.perf_counter() - inicio
+
+        medir_desde = time.perf_counter() + args.calentamiento
+        fin = medir_desde + args.duracion
+
+        async def usuario(numero: int):
+            rnd = random.Random(args.semilla + numero)
+            ops = operaciones(client, empresas[numero % len(empresas)], rnd)
+            nombres, pesos = list(mezcla), list(mezcla.values())
+            while (ahora := time.perf_counter()) < fin:
+                ruta, peticion = ops[rnd.choices(nombres, pesos)[0]]
+                respuesta = await peticion()
+                if ahora < medir_desde:
+                    continue
+                latencias[ruta].append(time.perf_counter() - ahora)
+                if respuesta.status_code >= 400:
+                    errores[ruta][respuesta.status_code] += 1
+
+        await asyncio.gather(*(usuario(i) for i in range(args.usuarios)))
+
+    rutas = resumen_latencias(latencias, args.duracion)
+    for ruta, resumen in rutas.items():
+        resumen["errores"] = dict(errores[ruta])
+    total = sum(len(v) for v in latencias.values())
+    return {
+        "siembra_s": round(siembra, 1),
+        "total": {"requests": total, "rps": round(total / args.duracion, 1)},
+        "rutas": rutas,
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(base: dict, actual: dict, tolerancia: float, minimo_ms: float) -> list:
+    """Rutas cuyo p95 o rps empeoró más que `tolerancia` (%) respecto a `base`."""
+    regresiones = []
+    for ruta, antes in base["rutas"].items():
+        ahora = actual["rutas"].get(ruta)
+        if ahora is None:
+            continue
+        limite = antes["p95_ms"] * (1 + tolerancia / 100)
+        # Diferencias de pocos ms en rutas muy rápidas son ruido
+        if ahora["p95_ms"] > limite and ahora["p95_ms"] - antes["p95_ms"] > minimo_ms:
+            regresiones.append({"ruta": ruta, "metrica": "p95_ms", "base": antes["p95_ms"], "actual": ahora["p95_ms"]})
+        if ahora["rps"] < antes["rps"] / (1 + tolerancia / 100):
+            regresiones.append({"ruta": ruta, "metrica": "rps", "base": antes["rps"], "actual": ahora["rps"]})
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duracion", type=float, default=20.0, help="segundos medidos")
+    parser.add_argument("--calentamiento", type=float, default=3.0, help="segundos iniciales sin medir")
+    parser.add_argument("--usuarios", type=int, default=32, help="usuarios virtuales concurrentes")
+    parser.add_argument("--empresas", type=int, default=4)
+    parser.add_argument("--proyectos", type=int, default=5, help="proyectos por empresa")
+    parser.add_argument("--historias", type=int, default=10, help="historias por proyecto")
+    parser.add_argument("--tickets", type=int, default=20, help="tickets por historia")
+    parser.add_argument("--mezcla", type=json.loads, default={},
+                        help='pesos que reemplazan a los de MEZCLA, en JSON: \'{"login": 0}\'')
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--sin-cache", action="store_true", help="desactiva el cache de respuestas")
+    parser.add_argument("--password-workers", type=int, default=2)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--salida", help="guarda el resultado en este archivo además de imprimirlo")
+    parser.add_argument("--comparar", help="resultado previo (JSON) contra el que buscar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=20.0, help="empeoramiento admitido, en %%")
+    parser.add_argument("--minimo-ms", type=float, default=2.0, help="aumento de p95 que se ignora")
+    parser.add_argument("--presupuestos", action="store_true",
+                        help="responde 500 y sale con 1 si una ruta excede su presupuesto de consultas")
+    args = parser.parse_args()
+
+    mezcla = {**MEZCLA, **args.mezcla}
+    desconocidas = set(mezcla) - set(MEZCLA)
+    if desconocidas or not any(mezcla.values()):
+        parser.error(f"--mezcla admite pesos para: {', '.join(MEZCLA)}")
+
+    configurar_entorno(
+        DB_MODE=args.db_mode,
+        PASSWORD_WORKERS=args.password_workers,
+        BCRYPT_ROUNDS=args.bcrypt_rounds,
+        RESPONSE_CACHE_TTL=0 if args.sin_cache else None,
+        PRESUPUESTO_CONSULTAS="error" if args.presupuestos else None,
+    )
+    from app.db.session import engine
+
+    resultado = {
+        "config": {**vars(args), "mezcla": mezcla},
+        "commit": commit_actual(),
+        "base_datos": engine.dialect.name,
+        **asyncio.run(correr(args, mezcla)),
+    }
+
+    codigo = 0
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            resultado["regresiones"] = comparar(json.load(archivo), resultado, args.tolerancia, args.minimo_ms)
+        codigo = 1 if resultado["regresiones"] else 0
+    if args.presupuestos:
+        from app.core.consultas import infracciones
+
+        resultado["infracciones"] = infracciones()
+        codigo = 1 if resultado["infracciones"] else codigo
+
+    texto = json.dumps(resultado, indent=2)
+    print(texto)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+    sys.exit(codigo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Utilidades compartidas por los benchmarks: app en proceso y siembra de datos."""
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+
+def configurar_entorno(**variables):
+    """Fija la configuración antes de importar la app (se lee al importar)."""
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+    for nombre, valor in variables.items():
+        if valor is not None:
+            os.environ[nombre] = str(valor)
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def resumen_latencias(latencias, duracion):
+    return {
+        ruta: {
+            "requests": len(valores),
+            "rps": round(len(valores) / duracion, 1),
+            "p50_ms": round(percentil(valores, 50) * 1000, 2),
+            "p95_ms": round(percentil(valores, 95) * 1000, 2),
+            "p99_ms": round(percentil(valores, 99) * 1000, 2),
+        }
+        for ruta, valores in latencias.items()
+    }
+
+
+@asynccontextmanager
+async def cliente_app():
+    """AsyncClient de httpx contra la app ASGI, con el esquema creado."""
+    import httpx
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app
+    from app import models  # noqa: F401  registra las tablas
+
+    Base.metadata.create_all(engine)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        yield client
+
+
+async def sembrar_empresa(client, sufijo="1"):
+    """Registra una empresa con un proyecto y una historia; devuelve sus datos."""
+    credenciales = {"email_contacto": f"bench{sufijo}@empresa.com", "password": "bench-123"}
+    await client.post("/auth/auth/registro", json={
+        "nombre": f"Bench {sufijo}", "identificacion_tributaria": f"900000000-{sufijo}", **credenciales,
+    })
+    token = (await client.post("/auth/auth/login", json=credenciales)).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    proyecto = (await client.post("/proyectos/proyectos/", json={"nombre": "Bench"}, headers=headers)).json()
+    historia = (await client.post("/historias-usuario/historias-usuario/", json={
+        "titulo": "Bench", "proyecto_id": proyecto["id"],
+    }, headers=headers)).json()
+    return {
+        "credenciales": credenciales,
+        "headers": headers,
+        "proyecto": proyecto,
+        "historia": historia,
+    }
@@ -0,0 +1,212 @@
+"""Micro-benchmarks de las consultas de los routers, medidas en la capa de servicios.
+
+Sobre una base ya generada con `python -m app.cli.generar`:
+
+    DATABASE_URL=postgresql://... python -m benchmarks.consultas --salida consultas.json
+    DATABASE_URL=sqlite:///./volumen.db python -m benchmarks.consultas --salida consultas.json
+
+o generando antes una empresa en una SQLite temporal:
+
+    python -m benchmarks.consultas --generar --proyectos 1000 --historias 50000 --tickets 500000
+
+Cada forma de consulta se repite con ids elegidos al azar (con semilla) de la
+empresa con más tickets. Con `--salida` el resultado se guarda bajo el nombre
+de la base, así un mismo archivo acumula SQLite y PostgreSQL para compararlos.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from benchmarks.comun import configurar_entorno, percentil
+
+# forma -> repeticiones por defecto (las más caras se repiten menos)
+FORMAS = {
+    "propiedad_ticket": 500,
+    "propiedad_historia": 500,
+    "tickets_por_historia": 300,
+    "tickets_por_historia_filtrado": 300,
+    "historias_por_proyecto": 300,
+    "tickets_empresa_filtrado": 300,
+    "estadisticas_empresa": 100,
+    "escaneo_empresa": 3,
+    "borrado_proyecto": 20,
+}
+
+
+def _muestra(db, modelo, empresa_id: int, rnd: random.Random, n: int) -> list:
+    """`n` ids de la empresa elegidos con `rnd` (saltos aleatorios sobre el índice empresa_id, id)."""
+    from sqlalchemy import func, select
+
+    minimo, maximo = db.execute(
+        select(func.min(modelo.id), func.max(modelo.id)).where(modelo.empresa_id == empresa_id)
+    ).one()
+    consulta = select(modelo.id).where(modelo.empresa_id == empresa_id).order_by(modelo.id).limit(1)
+    return [
+        db.execute(consulta.where(modelo.id >= rnd.randint(minimo, maximo))).scalar_one()
+        for _ in range(n)
+    ]
+
+
+def preparar(db, args, rnd: random.Random) -> dict:
+    from sqlalchemy import func, select
+    from app.models.historia_usuario import HistoriaUsuario
+    from app.models.proyecto import Proyecto
+    from app.models.ticket import Ticket
+
+    empresa_id = args.empresa_id or db.execute(
+        select(Ticket.empresa_id).group_by(Ticket.empresa_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    if empresa_id is None:
+        raise SystemExit("la base no tiene tickets: usa --generar o python -m app.cli.generar")
+
+    def contar(modelo):
+        return db.execute(select(func.count()).select_from(modelo).where(modelo.empresa_id == empresa_id)).scalar()
+
+    return {
+        "empresa_id": empresa_id,
+        "filas": {"proyectos": contar(Proyecto), "historias": contar(HistoriaUsuario), "tickets": contar(Ticket)},
+        "max_ticket_id": db.execute(select(func.max(Ticket.id))).scalar(),
+        "max_historia_id": db.execute(select(func.max(HistoriaUsuario.id))).scalar(),
+        "proyectos": _muestra(db, Proyecto, empresa_id, rnd, 200),
+        "historias": _muestra(db, HistoriaUsuario, empresa_id, rnd, 500),
+    }
+
+
+def formas(ctx: dict, rnd: random.Random) -> dict:
+    """forma -> función(db) que ejecuta una vez la consulta, como lo hace el router."""
+    from sqlalchemy import select
+    from app.core.deps import FiltrosListado
+    from app.models.ticket import Ticket
+    from app.repositories.historia_usuario import historia_de_empresa
+    from app.repositories.ticket import ticket_de_empresa
+    from app.services.estadisticas import estadisticas_empresa
+    from app.services.historia_usuario import listar_por_proyecto
+    from app.services.proyecto import eliminar_proyecto
+    from app.services.ticket import listar_tickets, listar_tickets_empresa
+
+    empresa_id = ctx["empresa_id"]
+
+    def escaneo(db):
+        # Recorrido completo por keyset, como la exportación
+        consulta = (
+            select(Ticket.id, Ticket.estado, Ticket.prioridad, Ticket.fecha_creacion)
+            .where(Ticket.empresa_id == empresa_id).order_by(Ticket.id).limit(1000)
+        )
+        ultimo = 0
+        while filas := db.execute(consulta.where(Ticket.id > ultimo)).all():
+            ultimo = filas[-1].id
+
+    return {
+        # Ids de toda la tabla: la mayoría de las veces de otra empresa si hay varias
+        "propiedad_ticket": lambda db: ticket_de_empresa(db, rnd.randint(1, ctx["max_ticket_id"]), empresa_id),
+        "propiedad_historia": lambda db: historia_de_empresa(db, rnd.randint(1, ctx["max_historia_id"]), empresa_id),
+        "tickets_por_historia": lambda db: listar_tickets(db, rnd.choice(ctx["historias"]), empresa_id),
+        "tickets_por_historia_filtrado": lambda db: listar_tickets(
+            db, rnd.choice(ctx["historias"]), empresa_id,
+            filtros=FiltrosListado(estado=["abierto", "en_progreso"], orden="-fecha_creacion"),
+        ),
+        "historias_por_proyecto": lambda db: listar_por_proyecto(db, rnd.choice(ctx["proyectos"]), empresa_id),
+        "tickets_empresa_filtrado": lambda db: listar_tickets_empresa(
+            db, empresa_id, filtros=FiltrosListado(estado=["abierto"], prioridad=["alta"], orden="-fecha_creacion"),
+        ),
+        "estadisticas_empresa": lambda db: estadisticas_empresa(db, empresa_id),
+        "escaneo_empresa": escaneo,
+        "borrado_proyecto": lambda db: eliminar_proyecto(db, rnd.choice(ctx["proyectos"]), empresa_id),
+    }
+
+
+def medir(forma, repeticiones: int) -> dict:
+    """Corre `forma` en una sesión nueva por repetición; el borrado se deshace al terminar."""
+    from sqlalchemy.orm import Session
+    from app.db.session import engine
+
+    tiempos = []
+    for _ in range(repeticiones):
+        with engine.connect() as conexion:
+            transaccion = conexion.begin()
+            # rollback_only: el commit del servicio no confirma la transacción externa
+            with Session(bind=conexion, join_transaction_mode="rollback_only") as db:
+                inicio = time.perf_counter()
+                forma(db)
+                tiempos.append(time.perf_counter() - inicio)
+            transaccion.rollback()
+    return {
+        "repeticiones": repeticiones,
+        "media_ms": round(sum(tiempos) / len(tiempos) * 1000, 3),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 3),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 3),
+        "p99_ms": round(percentil(tiempos, 99) * 1000, 3),
+    }
+
+
+def correr(args) -> dict:
+    from app.db.session import SessionLocal, engine
+
+    rnd = random.Random(args.semilla)
+    with SessionLocal() as db:
+        ctx = preparar(db, args, rnd)
+
+    disponibles = formas(ctx, rnd)
+    resultados = {}
+    for nombre in args.formas or list(FORMAS):
+        forma = disponibles[nombre]
+        # Calentamiento: planes y caches del driver fuera de la medición
+        medir(forma, min(3, FORMAS[nombre]))
+        resultados[nombre] = medir(forma, max(1, int(FORMAS[nombre] * args.escala_repeticiones)))
+
+    with engine.connect() as conexion:
+        version = ".".join(map(str, conexion.dialect.server_version_info or ()))
+    return {
+        "base_datos": engine.dialect.name,
+        "version": version,
+        "empresa_id": ctx["empresa_id"],
+        "filas": ctx["filas"],
+        "formas": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--empresa-id", type=int, help="por defecto, la empresa con más tickets")
+    parser.add_argument("--formas", nargs="+", choices=list(FORMAS), help="solo estas consultas")
+    parser.add_argument("--escala-repeticiones", type=float, default=1.0, help="multiplica las repeticiones de FORMAS")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON donde acumular resultados por base de datos")
+    generacion = parser.add_argument_group("generación previa (app.cli.generar)")
+    generacion.add_argument("--generar", action="store_true", help="crea el esquema y genera una empresa antes de medir")
+    generacion.add_argument("--proyectos", type=int, default=100)
+    generacion.add_argument("--historias", type=int, default=5000)
+    generacion.add_argument("--tickets", type=int, default=50000)
+    args = parser.parse_args()
+
+    # Sin bcrypt caro: solo se hashea la contraseña de la empresa generada
+    configurar_entorno(BCRYPT_ROUNDS=4 if args.generar else None)
+    if args.generar:
+        from app.cli import generar
+        from app.db.base import Base
+        from app.db.session import engine
+
+        Base.metadata.create_all(engine)
+        generar.main([
+            "--proyectos", str(args.proyectos), "--historias", str(args.historias),
+            "--tickets", str(args.tickets), "--semilla", str(args.semilla),
+        ])
+
+    resultado = correr(args)
+    texto = json.dumps(resultado, indent=2)
+    print(texto)
+    if args.salida:
+        acumulado = {}
+        if os.path.exists(args.salida):
+            with open(args.salida, encoding="utf-8") as archivo:
+                acumulado = json.load(archivo)
+        acumulado[resultado["base_datos"]] = resultado
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(acumulado, archivo, indent=2)
+            archivo.write("\n")
+
+
+if __name__ == "__main__":
+    main()
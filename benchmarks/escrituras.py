@@ -0,0 +1,226 @@
+"""Escrituras de una fila: ORM (SELECT + flush + commit + refresh) vs. INSERT/UPDATE ... RETURNING.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.escrituras
+    python -m benchmarks.escrituras --rtt-ms 1       # SQLite temporal + latencia de red simulada
+
+Mide en la capa de servicios las escrituras de los routers (crear y
+actualizar proyecto, historia y ticket, y cambiar el estado de un ticket)
+por los dos caminos:
+
+- orm: el camino anterior, reproducido aquí: SELECT de pertenencia, cambios
+  en el objeto, commit (flush con los listeners de consistencia) y refresh.
+- returning: los servicios actuales (app/db/escritura.py).
+
+Por cada operación se cuentan las sentencias y los commits de una ejecución.
+Lo que se gana es sobre todo latencia de red: contra un PostgreSQL remoto cada
+sentencia es un viaje de ida y vuelta. `--rtt-ms` agrega esa espera a cada
+sentencia y a cada commit para estimarla sin un servidor remoto.
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.comun import configurar_entorno, percentil
+
+
+def _orm(ctx) -> dict:
+    """Las escrituras como eran antes de usar RETURNING."""
+    from app.models.historia_usuario import HistoriaUsuario
+    from app.models.proyecto import Proyecto
+    from app.models.ticket import Ticket
+    from app.repositories.historia_usuario import historia_de_empresa
+    from app.repositories.proyecto import proyecto_de_empresa
+    from app.repositories.ticket import ticket_de_empresa
+
+    empresa_id = ctx["empresa_id"]
+
+    def crear(db, objeto):
+        db.add(objeto)
+        db.commit()
+        db.refresh(objeto)
+        return objeto
+
+    def actualizar(db, objeto, **valores):
+        for atributo, valor in valores.items():
+            setattr(objeto, atributo, valor)
+        db.commit()
+        db.refresh(objeto)
+        return objeto
+
+    def crear_historia(db, i):
+        if proyecto_de_empresa(db, ctx["proyecto_id"], empresa_id):
+            return crear(db, HistoriaUsuario(proyecto_id=ctx["proyecto_id"], empresa_id=empresa_id, titulo=f"H{i}"))
+
+    def crear_ticket(db, i):
+        if historia_de_empresa(db, ctx["historia_id"], empresa_id):
+            return crear(db, Ticket(historia_usuario_id=ctx["historia_id"], empresa_id=empresa_id, asunto=f"T{i}"))
+
+    return {
+        "crear_proyecto": lambda db, i: crear(db, Proyecto(nombre=f"P{i}", empresa_id=empresa_id)),
+        "actualizar_proyecto": lambda db, i: actualizar(
+            db, proyecto_de_empresa(db, ctx["proyecto_id"], empresa_id), nombre=f"P{i}"),
+        "crear_historia": crear_historia,
+        "actualizar_historia": lambda db, i: actualizar(
+            db, historia_de_empresa(db, ctx["historia_id"], empresa_id), titulo=f"H{i}"),
+        "crear_ticket": crear_ticket,
+        "actualizar_ticket": lambda db, i: actualizar(
+            db, ticket_de_empresa(db, ctx["ticket_id"], empresa_id), asunto=f"T{i}", prioridad=ctx["prioridades"][i % 3]),
+        "actualizar_estado_ticket": lambda db, i: actualizar(
+            db, ticket_de_empresa(db, ctx["ticket_id"], empresa_id), estado=ctx["estados"][i % 3]),
+    }
+
+
+def _returning(ctx) -> dict:
+    from app.schemas.historia_usuario import HistoriaUsuarioBase, HistoriaUsuarioCreate
+    from app.schemas.proyecto import ProyectoBase, ProyectoCreate
+    from app.schemas.ticket import TicketBase, TicketCreate
+    from app.services import historia_usuario, proyecto, ticket
+
+    empresa_id = ctx["empresa_id"]
+    return {
+        "crear_proyecto": lambda db, i: proyecto.crear_proyecto(db, empresa_id, ProyectoCreate(nombre=f"P{i}")),
+        "actualizar_proyecto": lambda db, i: proyecto.actualizar_proyecto(
+            db, ctx["proyecto_id"], empresa_id, ProyectoBase(nombre=f"P{i}")),
+        "crear_historia": lambda db, i: historia_usuario.crear_historia(
+            db, empresa_id, HistoriaUsuarioCreate(proyecto_id=ctx["proyecto_id"], titulo=f"H{i}")),
+        "actualizar_historia": lambda db, i: historia_usuario.actualizar_historia(
+            db, ctx["historia_id"], empresa_id, HistoriaUsuarioBase(titulo=f"H{i}")),
+        "crear_ticket": lambda db, i: ticket.crear_ticket(
+            db, empresa_id, TicketCreate(historia_usuario_id=ctx["historia_id"], asunto=f"T{i}")),
+        "actualizar_ticket": lambda db, i: ticket.actualizar_ticket(
+            db, ctx["ticket_id"], empresa_id, TicketBase(asunto=f"T{i}", prioridad=ctx["prioridades"][i % 3])),
+        "actualizar_estado_ticket": lambda db, i: ticket.actualizar_estado(
+            db, ctx["ticket_id"], empresa_id, ctx["estados"][i % 3]),
+    }
+
+
+OPERACIONES = [
+    "crear_proyecto", "actualizar_proyecto", "crear_historia", "actualizar_historia",
+    "crear_ticket", "actualizar_ticket", "actualizar_estado_ticket",
+]
+
+
+def preparar() -> dict:
+    """Empresa con un proyecto, una historia y un ticket sobre los que escribir."""
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.empresa import Empresa
+    from app.schemas.enums import Prioridad
+    from app.schemas.historia_usuario import HistoriaUsuarioCreate
+    from app.schemas.proyecto import ProyectoCreate
+    from app.schemas.ticket import EstadoTicket, TicketCreate
+    from app.services import historia_usuario, proyecto, ticket
+    from app import models  # noqa: F401  registra las tablas
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        empresa = Empresa(nombre="Bench escrituras", identificacion_tributaria=f"bench-escrituras-{time.time_ns()}",
+                          hashed_password="-")
+        db.add(empresa)
+        db.commit()
+        empresa_id = empresa.id
+        proyecto_id = proyecto.crear_proyecto(db, empresa_id, ProyectoCreate(nombre="Bench")).id
+        historia_id = historia_usuario.crear_historia(
+            db, empresa_id, HistoriaUsuarioCreate(proyecto_id=proyecto_id, titulo="Bench")).id
+        ticket_id = ticket.crear_ticket(db, empresa_id, TicketCreate(historia_usuario_id=historia_id, asunto="Bench")).id
+    return {
+        "empresa_id": empresa_id, "proyecto_id": proyecto_id, "historia_id": historia_id, "ticket_id": ticket_id,
+        "estados": list(EstadoTicket), "prioridades": list(Prioridad),
+    }
+
+
+class Contador:
+    """Sentencias y commits del engine; con `rtt` espera ese tiempo en cada uno."""
+
+    def __init__(self, engine, rtt: float):
+        from sqlalchemy import event
+
+        self.sentencias = self.commits = 0
+        self.rtt = rtt
+        event.listen(engine, "before_cursor_execute", self._sentencia)
+        event.listen(engine, "commit", self._commit)
+
+    def _sentencia(self, *args):
+        self.sentencias += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def _commit(self, *args):
+        self.commits += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+
+def medir(operacion, contador: Contador, repeticiones: int) -> dict:
+    from app.db.session import SessionLocal
+
+    tiempos, sentencias, commits = [], [], []
+    for i in range(repeticiones + 3):
+        with SessionLocal() as db:
+            contador.sentencias = contador.commits = 0
+            inicio = time.perf_counter()
+            if operacion(db, i) is None:
+                raise RuntimeError("la escritura no encontró su fila")
+            if i >= 3:  # calentamiento fuera de la medición
+                tiempos.append(time.perf_counter() - inicio)
+                sentencias.append(contador.sentencias)
+                commits.append(contador.commits)
+    return {
+        "sentencias": max(sentencias),
+        "commits": max(commits),
+        "media_ms": round(sum(tiempos) / len(tiempos) * 1000, 3),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 3),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 3),
+    }
+
+
+def correr(args) -> dict:
+    from app.db.session import engine
+
+    ctx = preparar()
+    contador = Contador(engine, args.rtt_ms / 1000)
+    caminos = {"orm": _orm(ctx), "returning": _returning(ctx)}
+    resultados = {}
+    for nombre in args.operaciones or OPERACIONES:
+        resultado = {camino: medir(operaciones[nombre], contador, args.repeticiones) for camino, operaciones in caminos.items()}
+        resultado["aceleracion"] = round(resultado["orm"]["p50_ms"] / max(resultado["returning"]["p50_ms"], 1e-3), 2)
+        resultados[nombre] = resultado
+
+    from app.services.estadisticas import verificar
+    from app.db.session import SessionLocal
+    with SessionLocal() as db:
+        diferencias = verificar(db)
+    return {
+        "base_datos": engine.dialect.name,
+        "rtt_simulado_ms": args.rtt_ms,
+        "operaciones": resultados,
+        "estadisticas_consistentes": not diferencias,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="latencia simulada por sentencia y por commit")
+    parser.add_argument("--operaciones", nargs="+", choices=OPERACIONES, help="solo estas escrituras")
+    parser.add_argument("--salida", help="archivo JSON donde acumular resultados por base de datos")
+    args = parser.parse_args()
+
+    configurar_entorno()
+    resultado = correr(args)
+    texto = json.dumps(resultado, indent=2)
+    print(texto)
+    if args.salida:
+        acumulado = {}
+        if os.path.exists(args.salida):
+            with open(args.salida, encoding="utf-8") as archivo:
+                acumulado = json.load(archivo)
+        acumulado[resultado["base_datos"]] = resultado
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(acumulado, archivo, indent=2)
+            archivo.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Latencia de /auth/login bajo carga mixta (logins + lectura de tickets).
+
+Levanta la app en el mismo proceso contra una SQLite temporal y mide p50/p95/p99
+de cada ruta. Sirve para comparar bcrypt en el threadpool contra el process pool:
+
+    python -m benchmarks.login_mixto --password-workers 0
+    python -m benchmarks.login_mixto --password-workers 2
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+from benchmarks.comun import cliente_app, configurar_entorno, resumen_latencias, sembrar_empresa
+
+
+async def correr(args):
+    latencias = defaultdict(list)
+    async with cliente_app() as client:
+        datos = await sembrar_empresa(client)
+        credenciales, headers, historia = datos["credenciales"], datos["headers"], datos["historia"]
+        await client.post("/tickets/tickets/bulk", json={"items": [
+            {"asunto": f"Ticket {i}", "historia_usuario_id": historia["id"]} for i in range(args.tickets)
+        ]}, headers=headers)
+
+        fin = time.perf_counter() + args.duracion
+
+        async def bucle(ruta, peticion):
+            while time.perf_counter() < fin:
+                inicio = time.perf_counter()
+                respuesta = await peticion()
+                latencias[f"{ruta} {respuesta.status_code}"].append(time.perf_counter() - inicio)
+
+        tareas = [
+            bucle("POST /auth/login", lambda: client.post("/auth/auth/login", json=credenciales))
+            for _ in range(args.logins)
+        ] + [
+            bucle("GET /tickets/historia", lambda: client.get(f"/tickets/tickets/historia/{historia['id']}", headers=headers))
+            for _ in range(args.lectores)
+        ]
+        await asyncio.gather(*tareas)
+
+    return resumen_latencias(latencias, args.duracion)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos de carga")
+    parser.add_argument("--logins", type=int, default=8, help="clientes concurrentes haciendo login")
+    parser.add_argument("--lectores", type=int, default=16, help="clientes concurrentes leyendo tickets")
+    parser.add_argument("--tickets", type=int, default=50, help="tickets sembrados en la historia")
+    parser.add_argument("--password-workers", type=int, default=2)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    args = parser.parse_args()
+
+    configurar_entorno(
+        DB_MODE=args.db_mode,
+        PASSWORD_WORKERS=args.password_workers,
+        BCRYPT_ROUNDS=args.bcrypt_rounds,
+    )
+    resultado = {
+        "config": vars(args),
+        "rutas": asyncio.run(correr(args)),
+    }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
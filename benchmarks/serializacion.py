@@ -0,0 +1,157 @@
+"""Listados grandes: serialización con Pydantic vs. JSON_RAPIDO (columnas + orjson).
+
+Sobre una base ya generada con `python -m app.cli.generar`:
+
+    DATABASE_URL=sqlite:///./volumen.db python -m benchmarks.serializacion --filas 10000
+
+o generando antes una empresa en una SQLite temporal:
+
+    python -m benchmarks.serializacion --generar --historias 20000 --tickets 50000
+
+Para tickets e historias se arma una `Pagina` de `--filas` elementos de la
+empresa con más tickets por los dos caminos:
+
+- pydantic: objetos del ORM + `serializar` (validación from_attributes y dump)
+- rapido: solo las columnas del schema + `contenido_pagina` (orjson)
+
+"total" es consulta + serialización en una sesión nueva; "serializacion" es
+solo la serialización de filas ya leídas. Además se comprueba que los dos
+caminos produzcan exactamente los mismos bytes.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.comun import configurar_entorno, percentil
+
+
+def _resumen(tiempos) -> dict:
+    return {
+        "media_ms": round(sum(tiempos) / len(tiempos) * 1000, 3),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 3),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 3),
+    }
+
+
+def _medir(fn, repeticiones: int) -> dict:
+    fn()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return _resumen(tiempos)
+
+
+def caso(modelo, schema, empresa_id: int, filas: int, repeticiones: int) -> dict:
+    from app.core.response_cache import serializar
+    from app.core.serializacion import Forma, con_forma, contenido_pagina
+    from app.db.session import SessionLocal
+    from app.schemas.paginacion import Pagina
+
+    forma = Forma(schema, modelo)
+    pagina = Pagina[schema]
+
+    def query(db):
+        return db.query(modelo).filter(modelo.empresa_id == empresa_id).order_by(modelo.id).limit(filas)
+
+    def por_pydantic(objetos) -> bytes:
+        return serializar(pagina, {"items": objetos, "siguiente_cursor": None, "limite": filas})
+
+    def por_orjson(tuplas) -> bytes:
+        return contenido_pagina(forma, tuplas, None, filas)
+
+    # Sesión nueva por repetición: sin identity map de la vuelta anterior
+    def total_pydantic():
+        with SessionLocal() as db:
+            return por_pydantic(query(db).all())
+
+    def total_rapido():
+        with SessionLocal() as db:
+            return por_orjson(con_forma(query(db), forma).all())
+
+    with SessionLocal() as db:
+        objetos = query(db).all()
+        tuplas = con_forma(query(db), forma).all()
+        esperado, obtenido = por_pydantic(objetos), por_orjson(tuplas)
+        resultado = {
+            "filas": len(objetos),
+            "bytes": len(esperado),
+            "iguales": esperado == obtenido,
+            "pydantic": {
+                "total": _medir(total_pydantic, repeticiones),
+                "serializacion": _medir(lambda: por_pydantic(objetos), repeticiones),
+            },
+            "rapido": {
+                "total": _medir(total_rapido, repeticiones),
+                "serializacion": _medir(lambda: por_orjson(tuplas), repeticiones),
+            },
+        }
+    for parte in ("total", "serializacion"):
+        resultado[f"aceleracion_{parte}"] = round(
+            resultado["pydantic"][parte]["p50_ms"] / max(resultado["rapido"][parte]["p50_ms"], 1e-3), 2
+        )
+    return resultado
+
+
+def correr(args) -> dict:
+    from sqlalchemy import func, select
+    from app.db.session import SessionLocal, engine
+    from app.models.historia_usuario import HistoriaUsuario
+    from app.models.ticket import Ticket
+    from app.schemas.historia_usuario import HistoriaUsuarioResponse
+    from app.schemas.ticket import TicketResponse
+
+    with SessionLocal() as db:
+        empresa_id = args.empresa_id or db.execute(
+            select(Ticket.empresa_id).group_by(Ticket.empresa_id).order_by(func.count().desc()).limit(1)
+        ).scalar()
+    if empresa_id is None:
+        raise SystemExit("la base no tiene tickets: usa --generar o python -m app.cli.generar")
+
+    return {
+        "base_datos": engine.dialect.name,
+        "empresa_id": empresa_id,
+        "casos": {
+            "tickets": caso(Ticket, TicketResponse, empresa_id, args.filas, args.repeticiones),
+            "historias": caso(HistoriaUsuario, HistoriaUsuarioResponse, empresa_id, args.filas, args.repeticiones),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=10000, help="elementos por página serializada")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--empresa-id", type=int, help="por defecto, la empresa con más tickets")
+    parser.add_argument("--salida", help="archivo JSON con el resultado")
+    generacion = parser.add_argument_group("generación previa (app.cli.generar)")
+    generacion.add_argument("--generar", action="store_true", help="crea el esquema y genera una empresa antes de medir")
+    generacion.add_argument("--proyectos", type=int, default=100)
+    generacion.add_argument("--historias", type=int, default=10000)
+    generacion.add_argument("--tickets", type=int, default=20000)
+    generacion.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    configurar_entorno(BCRYPT_ROUNDS=4 if args.generar else None)
+    if args.generar:
+        from app.cli import generar
+        from app.db.base import Base
+        from app.db.session import engine
+
+        Base.metadata.create_all(engine)
+        generar.main([
+            "--proyectos", str(args.proyectos), "--historias", str(args.historias),
+            "--tickets", str(args.tickets), "--semilla", str(args.semilla),
+        ])
+
+    resultado = correr(args)
+    texto = json.dumps(resultado, indent=2)
+    print(texto)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+
+
+if __name__ == "__main__":
+    main()
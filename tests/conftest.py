@@ -0,0 +1,132 @@
+"""Fixtures de los tests: app en proceso sobre una SQLite temporal.
+
+La configuración se lee al importar la app, así que el entorno se fija aquí
+antes de cualquier import de `app`. Los presupuestos de consultas corren en
+modo "error": un endpoint que se excede responde 500 y el test falla. Las
+claves foráneas se aplican, como en PostgreSQL.
+"""
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='tests-')}/tests.db"
+os.environ["DB_MODE"] = "sync"
+os.environ["PRESUPUESTO_CONSULTAS"] = "error"
+os.environ["CONSULTAS_DEBUG"] = "true"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_WORKERS"] = "0"
+# Sin caches: cada request consulta la base y los conteos no dependen del orden de los tests
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+os.environ["ACTOR_CACHE_TTL"] = "0"
+os.environ["PERFILES_MAX_POR_MINUTO"] = "0"
+os.environ["METRICAS_TOKEN"] = "token-de-tests"
+
+_secuencia = itertools.count(1)
+
+
+class Api:
+    """TestClient con el prefijo que main.py vuelve a aplicar: /tickets/... -> /tickets/tickets/...
+
+    Las rutas de importaciones y métricas no tienen prefijo propio y se usan tal cual.
+    """
+
+    SIN_PREFIJO = ("importaciones", "metricas", "metrics", "test")
+
+    def __init__(self, client):
+        self.client = client
+
+    def ruta(self, path: str) -> str:
+        segmento = path.split("/")[1].split("?")[0]
+        return path if segmento in self.SIN_PREFIJO else f"/{segmento}{path}"
+
+    def __getattr__(self, metodo):
+        def llamar(path, *args, **kwargs):
+            return getattr(self.client, metodo)(self.ruta(path), *args, **kwargs)
+        return llamar
+
+
+def esperar(respuesta, codigo: int = 200):
+    assert respuesta.status_code == codigo, (respuesta.status_code, respuesta.text)
+    return respuesta.json() if respuesta.content else None
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app as aplicacion
+    from app import models  # noqa: F401  registra las tablas
+    from sqlalchemy import event
+
+    # SQLite no aplica las FKs por defecto; PostgreSQL siempre lo hace
+    @event.listens_for(engine, "connect")
+    def _claves_foraneas(conexion, registro):
+        conexion.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    return aplicacion
+
+
+@pytest.fixture(scope="session")
+def api(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield Api(client)
+
+
+def registrar_empresa(api) -> dict:
+    """Registra una empresa nueva; devuelve su id, credenciales y headers con su token."""
+    n = next(_secuencia)
+    credenciales = {"email_contacto": f"empresa{n}@tests.com", "password": "secreto-123"}
+    empresa = esperar(api.post("/auth/registro", json={
+        "nombre": f"Empresa {n}", "identificacion_tributaria": f"tests-{n}", **credenciales,
+    }))
+    token = esperar(api.post("/auth/login", json=credenciales))["access_token"]
+    return {"id": empresa["id"], "credenciales": credenciales, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+@pytest.fixture(scope="session")
+def nueva_empresa(api):
+    """Registra una empresa nueva y devuelve los headers de su token."""
+    return lambda: registrar_empresa(api)["headers"]
+
+
+def sembrar(api, headers, historias: int, tickets_por_historia: int) -> dict:
+    """Un proyecto con `historias` historias de `tickets_por_historia` tickets cada una."""
+    proyecto = esperar(api.post("/proyectos/", json={"nombre": "proyecto"}, headers=headers), 201)
+    creadas = esperar(api.post("/historias-usuario/bulk", json={"items": [
+        {"titulo": f"historia {i}", "proyecto_id": proyecto["id"]} for i in range(historias)
+    ]}, headers=headers))["creados"]
+    tickets = esperar(api.post("/tickets/bulk", json={"items": [
+        {"asunto": f"ticket {i}", "historia_usuario_id": historia["id"]}
+        for historia in creadas for i in range(tickets_por_historia)
+    ]}, headers=headers))["creados"]
+    return {
+        "headers": headers,
+        "proyecto_id": proyecto["id"],
+        "historia_id": creadas[0]["id"],
+        "ticket_id": tickets[0]["id"],
+    }
+
+
+@contextmanager
+def contar_consultas():
+    """Lista de las sentencias SQL ejecutadas dentro del bloque."""
+    from sqlalchemy import event
+    from app.db.session import engine_activo
+
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    engine = engine_activo()
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
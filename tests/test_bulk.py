@@ -0,0 +1,153 @@
+"""COPY de app/db/bulk.py: registros y CSV que recibe el driver de PostgreSQL.
+
+No hace falta un servidor: una conexión falsa captura lo que `_copiar_a_temporal`
+le pasaría a psycopg2 (CSV por copy_expert) o a asyncpg (registros por
+copy_records_to_table).
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.util import greenlet_spawn
+
+from app.db.bulk import _copiar_a_temporal
+
+
+class Mayusculas(TypeDecorator):
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else value.upper()
+
+
+TABLA = Table(
+    "copia_prueba", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("nombre", String(50)),
+    Column("codigo", Mayusculas(10)),
+    Column("creado", DateTime),
+)
+
+FILAS = [
+    {"nombre": 'dice "hola", chau', "codigo": "abc", "creado": datetime(2026, 1, 2, 3, 4, 5)},
+    {"nombre": None, "codigo": None, "creado": None},
+]
+
+
+class _Cursor:
+    def __init__(self, capturado):
+        self.capturado = capturado
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, buffer):
+        self.capturado["sql"], self.capturado["csv"] = sql, buffer.read()
+
+
+class _CrudoPsycopg:
+    def __init__(self, capturado):
+        self.capturado = capturado
+
+    def cursor(self):
+        return _Cursor(self.capturado)
+
+
+class _CrudoAsyncpg:
+    def __init__(self, capturado):
+        self.capturado = capturado
+
+    async def copy_records_to_table(self, temporal, records, columns):
+        self.capturado.update(temporal=temporal, records=records, columns=columns)
+
+
+def sesion_falsa(dialect, crudo):
+    conexion = SimpleNamespace(
+        dialect=dialect,
+        exec_driver_sql=lambda sql: None,
+        connection=SimpleNamespace(driver_connection=crudo),
+    )
+    return SimpleNamespace(connection=lambda: conexion)
+
+
+def copiar_psycopg2(tabla, valores) -> dict:
+    capturado = {}
+    _copiar_a_temporal(sesion_falsa(psycopg2.dialect(), _CrudoPsycopg(capturado)), tabla, list(valores[0]), valores)
+    return capturado
+
+
+def copiar_asyncpg(tabla, valores) -> dict:
+    capturado = {}
+    db = sesion_falsa(asyncpg.dialect(), _CrudoAsyncpg(capturado))
+    # await_only necesita correr dentro de un greenlet, como en run_db
+    asyncio.run(greenlet_spawn(_copiar_a_temporal, db, tabla, list(valores[0]), valores))
+    return capturado
+
+
+def test_csv_de_psycopg2():
+    capturado = copiar_psycopg2(TABLA, FILAS)
+    assert capturado["sql"] == (
+        "COPY _copia_copia_prueba (nombre, codigo, creado) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    assert capturado["csv"] == (
+        '"dice ""hola"", chau","ABC","2026-01-02 03:04:05"\n'
+        "\\N,\\N,\\N\n"
+    )
+
+
+def test_registros_de_asyncpg():
+    capturado = copiar_asyncpg(TABLA, FILAS)
+    assert capturado["temporal"] == "_copia_copia_prueba"
+    assert capturado["columns"] == ["nombre", "codigo", "creado"]
+    assert capturado["records"] == [
+        ('dice "hola", chau', "ABC", datetime(2026, 1, 2, 3, 4, 5)),
+        (None, None, None),
+    ]
+
+
+
+# --- Columnas CodigoEnum de las importaciones (SMALLINT en la base) ---
+
+def filas_de_importacion():
+    """Filas de historias y tickets con la forma que arman _importar_historias / _importar_tickets."""
+    from app.schemas.importacion import FilaHistoria, FilaTicket
+
+    historia = FilaHistoria(clave_externa="h-1", titulo="historia", proyecto_id=1, estado="completado", prioridad="alta")
+    ticket = FilaTicket(clave_externa="t-1", asunto="ticket", historia_usuario_id=1, estado="en_progreso", prioridad="baja")
+    return {
+        "historias_usuario": {
+            "proyecto_id": 1, "empresa_id": 1, "clave_externa": historia.clave_externa, "titulo": historia.titulo,
+            "descripcion": historia.descripcion, "estado": historia.estado, "prioridad": historia.prioridad,
+        },
+        "tickets": {
+            "historia_usuario_id": 1, "empresa_id": 1, "clave_externa": ticket.clave_externa, "asunto": ticket.asunto,
+            "descripcion": ticket.descripcion, "estado": ticket.estado, "prioridad": ticket.prioridad,
+        },
+    }
+
+
+def test_estados_y_prioridades_de_importacion_viajan_como_codigos():
+    from app.models.historia_usuario import HistoriaUsuario
+    from app.models.ticket import Ticket
+
+    filas = filas_de_importacion()
+    # completado = 3 y alta = 3 en la historia; en_progreso = 2 y baja = 1 en el ticket
+    esperados = {"historias_usuario": (3, 3), "tickets": (2, 1)}
+    for tabla in (HistoriaUsuario.__table__, Ticket.__table__):
+        fila = filas[tabla.name]
+        columnas = list(fila)
+        estado, prioridad = columnas.index("estado"), columnas.index("prioridad")
+
+        registro = copiar_asyncpg(tabla, [fila])["records"][0]
+        assert (registro[estado], registro[prioridad]) == esperados[tabla.name]
+        assert all(type(valor) is int for valor in (registro[estado], registro[prioridad]))
+
+        campos = copiar_psycopg2(tabla, [fila])["csv"].rstrip("\n").split(",")
+        assert (campos[estado], campos[prioridad]) == tuple(f'"{codigo}"' for codigo in esperados[tabla.name])
@@ -0,0 +1,48 @@
+"""Búsqueda de texto: mismas coincidencias con y sin tildes en las dos bases."""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from conftest import esperar, sembrar
+
+
+@pytest.fixture(scope="module")
+def datos(api, nueva_empresa):
+    datos = sembrar(api, nueva_empresa(), historias=1, tickets_por_historia=1)
+    esperar(api.put(f"/tickets/{datos['ticket_id']}", json={"asunto": "Revisar la acción de cobro"},
+                    headers=datos["headers"]))
+    return datos
+
+
+@pytest.mark.parametrize("texto", ["acción", "accion", "ACCION", "acci"])
+def test_tildes_y_mayusculas_no_cambian_el_resultado(api, datos, texto):
+    pagina = esperar(api.get("/tickets/buscar", params={"q": texto}, headers=datos["headers"]))
+    assert [ticket["id"] for ticket in pagina["items"]] == [datos["ticket_id"]]
+
+
+def test_postgresql_usa_la_configuracion_sin_tildes():
+    from app.db.busqueda import CONFIG_POSTGRESQL, _ddl_postgresql, ddl_config_postgresql
+
+    configuracion = " ".join(ddl_config_postgresql())
+    assert "CREATE EXTENSION IF NOT EXISTS unaccent" in configuracion
+    assert f"CREATE TEXT SEARCH CONFIGURATION {CONFIG_POSTGRESQL} (COPY = simple)" in configuracion
+    assert "WITH unaccent, simple" in configuracion
+
+    columna = next(s for s in _ddl_postgresql("tickets", ("asunto", "descripcion")) if "ADD COLUMN busqueda" in s)
+    assert columna.count(f"to_tsvector('{CONFIG_POSTGRESQL}'") == 2
+
+
+def test_postgresql_consulta_con_la_misma_configuracion(app):
+    from sqlalchemy.orm import Query
+    from app.db import busqueda
+    from app.models.ticket import Ticket
+
+    class Sesion:
+        def get_bind(self):
+            return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+    query = Query(Ticket, session=Sesion())
+    query, _ = busqueda._coincidencias(query, Ticket, ["accion"])
+    compilada = query.statement.compile(dialect=postgresql.dialect())
+    assert "to_tsquery(" in str(compilada)
+    assert busqueda.CONFIG_POSTGRESQL in compilada.params.values()
+    assert compilada.params["busqueda"] == "accion:*"
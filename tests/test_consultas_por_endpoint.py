@@ -0,0 +1,84 @@
+"""Consultas SQL por endpoint: fijas y sin crecer con la cantidad de filas.
+
+Cada endpoint se mide sobre una empresa chica (una historia con un ticket) y
+sobre una grande (varias historias con varios tickets). Un lazy-load por fila
+o una verificación de pertenencia encadenada hace crecer el conteo o lo
+aleja del esperado. Los conteos incluyen la autenticación (una consulta: los
+tests corren sin cache de actores) y, en los GET con ETag, la lectura de las
+versiones de las colecciones.
+"""
+import pytest
+
+from conftest import contar_consultas, sembrar
+
+# (método, ruta) -> consultas esperadas
+ESPERADAS = {
+    ("GET", "/proyectos/"): 3,
+    ("GET", "/proyectos/{proyecto_id}"): 3,
+    ("GET", "/proyectos/{proyecto_id}/estadisticas"): 4,
+    ("GET", "/proyectos/{proyecto_id}/tablero"): 4,
+    ("GET", "/historias-usuario/proyecto/{proyecto_id}"): 4,
+    ("GET", "/historias-usuario/{historia_id}"): 3,
+    ("GET", "/historias-usuario/{historia_id}/estadisticas"): 4,
+    ("GET", "/historias-usuario/buscar?q=historia"): 3,
+    ("GET", "/tickets/"): 3,
+    ("GET", "/tickets/historia/{historia_id}"): 4,
+    ("GET", "/tickets/buscar?q=ticket"): 3,
+    ("GET", "/tickets/{ticket_id}"): 3,
+    ("PUT", "/tickets/{ticket_id}"): 5,
+    ("PATCH", "/tickets/{ticket_id}/estado"): 5,
+    ("PUT", "/historias-usuario/{historia_id}"): 3,
+    ("PUT", "/proyectos/{proyecto_id}"): 3,
+}
+
+CUERPOS = {
+    ("PUT", "/tickets/{ticket_id}"): {"asunto": "ticket editado", "estado": "en_progreso"},
+    ("PATCH", "/tickets/{ticket_id}/estado"): {"estado": "cerrado"},
+    ("PUT", "/historias-usuario/{historia_id}"): {"titulo": "historia editada"},
+    ("PUT", "/proyectos/{proyecto_id}"): {"nombre": "proyecto editado"},
+}
+
+
+@pytest.fixture(scope="module")
+def empresas(api, nueva_empresa):
+    return {
+        "chica": sembrar(api, nueva_empresa(), historias=1, tickets_por_historia=1),
+        "grande": sembrar(api, nueva_empresa(), historias=8, tickets_por_historia=15),
+    }
+
+
+def consultas(api, metodo: str, ruta: str, datos: dict, headers=None, codigo: int = 200) -> int:
+    with contar_consultas() as sentencias:
+        respuesta = api.client.request(
+            metodo, api.ruta(ruta.format(**datos)),
+            json=CUERPOS.get((metodo, ruta)), headers=headers or datos["headers"],
+        )
+    assert respuesta.status_code == codigo, (respuesta.status_code, respuesta.text)
+    return len(sentencias)
+
+
+@pytest.mark.parametrize("metodo,ruta", list(ESPERADAS), ids=[f"{m} {r}" for m, r in ESPERADAS])
+def test_consultas_fijas(api, empresas, metodo, ruta):
+    chica = consultas(api, metodo, ruta, empresas["chica"])
+    grande = consultas(api, metodo, ruta, empresas["grande"])
+    assert (chica, grande) == (ESPERADAS[metodo, ruta], ESPERADAS[metodo, ruta])
+
+
+@pytest.mark.parametrize("ruta,entidad", [
+    ("/tickets/{ticket_id}", "ticket_id"),
+    ("/historias-usuario/{historia_id}", "historia_id"),
+    ("/proyectos/{proyecto_id}", "proyecto_id"),
+])
+def test_ajeno_e_inexistente_responden_404_con_las_mismas_consultas(api, empresas, ruta, entidad):
+    propia = empresas["chica"]
+    ajena = {**propia, entidad: empresas["grande"][entidad]}
+    inexistente = {**propia, entidad: 10**9}
+    esperadas = ESPERADAS["GET", ruta]
+    assert consultas(api, "GET", ruta, ajena, codigo=404) == esperadas
+    assert consultas(api, "GET", ruta, inexistente, codigo=404) == esperadas
+
+
+def test_borrar_ticket(api, nueva_empresa):
+    datos = sembrar(api, nueva_empresa(), historias=1, tickets_por_historia=3)
+    assert consultas(api, "DELETE", "/tickets/{ticket_id}", datos, codigo=204) == 5
+    assert consultas(api, "GET", "/tickets/{ticket_id}", datos, codigo=404) == 3
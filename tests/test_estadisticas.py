@@ -0,0 +1,49 @@
+"""Las estadísticas de tickets siguen al conteo real tras borrar en cascada."""
+import pytest
+from sqlalchemy import select
+
+from conftest import esperar, sembrar
+
+
+@pytest.fixture
+def db(app):
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as sesion:
+        yield sesion
+
+
+def estadisticas_de(db, historias) -> list:
+    from app.models.estadistica_ticket import EstadisticaTicket
+
+    return db.execute(
+        select(EstadisticaTicket.__table__).where(EstadisticaTicket.historia_usuario_id.in_(historias))
+    ).all()
+
+
+def historias_de(api, datos) -> list:
+    pagina = esperar(api.get(f"/historias-usuario/proyecto/{datos['proyecto_id']}", headers=datos["headers"]))
+    return [historia["id"] for historia in pagina["items"]]
+
+
+def test_borrar_historia_con_tickets(api, nueva_empresa, db):
+    from app.services.estadisticas import verificar
+
+    datos = sembrar(api, nueva_empresa(), historias=2, tickets_por_historia=3)
+    esperar(api.delete(f"/historias-usuario/{datos['historia_id']}", headers=datos["headers"]), 204)
+
+    assert estadisticas_de(db, [datos["historia_id"]]) == []
+    assert verificar(db) == []
+    restante = esperar(api.get(f"/proyectos/{datos['proyecto_id']}/estadisticas", headers=datos["headers"]))
+    assert restante["total"] == 3
+
+
+def test_borrar_proyecto_con_tickets(api, nueva_empresa, db):
+    from app.services.estadisticas import verificar
+
+    datos = sembrar(api, nueva_empresa(), historias=3, tickets_por_historia=2)
+    historias = historias_de(api, datos)
+    esperar(api.delete(f"/proyectos/{datos['proyecto_id']}", headers=datos["headers"]), 204)
+
+    assert estadisticas_de(db, historias) == []
+    assert verificar(db) == []
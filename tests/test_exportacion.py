@@ -0,0 +1,55 @@
+"""Exportación: compresión gzip según Accept-Encoding, con sus valores q."""
+import gzip
+
+import pytest
+
+from app.core.codificacion import acepta_codificacion
+from conftest import sembrar
+
+
+@pytest.mark.parametrize("header,acepta", [
+    (None, False),
+    ("", False),
+    ("gzip", True),
+    ("GZIP", True),
+    ("deflate, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0", False),
+    ("gzip;q=0.001", True),
+    ("br, deflate", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("identity, *;q=0.1", True),
+    ("gzip;q=abc", False),
+    ("x-gzip", False),
+])
+def test_acepta_codificacion(header, acepta):
+    assert acepta_codificacion(header, "gzip") is acepta
+
+
+@pytest.fixture(scope="module")
+def datos(api, nueva_empresa):
+    return sembrar(api, nueva_empresa(), historias=2, tickets_por_historia=2)
+
+
+def exportar(api, datos, accept_encoding):
+    # El cliente de httpx descomprime solo: se lee el cuerpo crudo
+    with api.client.stream("GET", "/proyectos/proyectos/exportar", headers={
+        **datos["headers"], "Accept-Encoding": accept_encoding,
+    }) as respuesta:
+        assert respuesta.status_code == 200
+        return respuesta.headers, b"".join(respuesta.iter_raw())
+
+
+def test_gzip_con_q_positivo_comprime(api, datos):
+    headers, cuerpo = exportar(api, datos, "gzip;q=0.8")
+    assert headers["content-encoding"] == "gzip"
+    assert b"ticket" in gzip.decompress(cuerpo)
+
+
+def test_gzip_con_q_cero_no_comprime(api, datos):
+    headers, cuerpo = exportar(api, datos, "gzip;q=0, identity")
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert b"ticket" in cuerpo
@@ -0,0 +1,200 @@
+"""Cada ruta de la app corre con PRESUPUESTO_CONSULTAS=error.
+
+Un presupuesto que no cubre el peor caso (sin cache de actores, rehash de la
+contraseña en los logins) responde 500 y el test de esa ruta falla. Las rutas
+nuevas tienen que agregarse a LLAMADAS: `test_todas_las_rutas_tienen_llamada`
+compara la tabla con las rutas registradas en la app.
+"""
+import itertools
+import json
+
+import bcrypt
+import pytest
+from fastapi.routing import APIRoute
+
+from conftest import esperar, registrar_empresa, sembrar
+
+METRICAS = {"X-Metricas-Token": "token-de-tests"}
+
+_secuencia = itertools.count(1)
+
+
+def _registro(datos):
+    n = next(_secuencia)
+    return {"json": {
+        "nombre": f"Registro {n}", "identificacion_tributaria": f"presupuestos-{n}",
+        "email_contacto": f"registro{n}@tests.com", "password": "secreto-123",
+    }}
+
+
+def _usuario(datos):
+    n = next(_secuencia)
+    return {"json": {
+        "nombre": f"Usuario {n}", "email": f"nuevo{n}@tests.com", "password": "secreto-123",
+        "empresa_id": datos["empresa_id"],
+    }}
+
+
+def _importacion(datos):
+    return {
+        "params": {"tipo": "proyectos", "formato": "ndjson"},
+        "content": json.dumps({"clave_externa": f"imp-{next(_secuencia)}", "nombre": "importado"}).encode(),
+    }
+
+
+# (método, ruta registrada) -> (ruta a llamar, argumentos del request, código esperado)
+LLAMADAS = {
+    ("GET", "/test"): ("/test", None, 200),
+    ("GET", "/metrics"): ("/metrics", None, 200),
+    ("POST", "/auth/auth/registro"): ("/auth/auth/registro", _registro, 200),
+    ("POST", "/auth/auth/login"): ("/auth/auth/login", lambda d: {"json": d["credenciales"]}, 200),
+    ("GET", "/auth/auth/listado-empresas"): ("/auth/auth/listado-empresas", None, 200),
+    ("GET", "/auth/auth/resumen"): ("/auth/auth/resumen", None, 200),
+    ("POST", "/usuarios/usuarios/"): ("/usuarios/usuarios/", _usuario, 201),
+    ("POST", "/usuarios/usuarios/login"): ("/usuarios/usuarios/login", lambda d: {"json": d["usuario"]}, 200),
+
+    ("POST", "/proyectos/proyectos/"): ("/proyectos/proyectos/", lambda d: {"json": {"nombre": "otro"}}, 201),
+    ("GET", "/proyectos/proyectos/"): ("/proyectos/proyectos/", None, 200),
+    ("GET", "/proyectos/proyectos/estadisticas"): ("/proyectos/proyectos/estadisticas", None, 200),
+    ("GET", "/proyectos/proyectos/exportar"): ("/proyectos/proyectos/exportar", None, 200),
+    ("GET", "/proyectos/proyectos/{proyecto_id}"): ("/proyectos/proyectos/{proyecto_id}", None, 200),
+    ("GET", "/proyectos/proyectos/{proyecto_id}/tablero"): ("/proyectos/proyectos/{proyecto_id}/tablero", None, 200),
+    ("GET", "/proyectos/proyectos/{proyecto_id}/estadisticas"): (
+        "/proyectos/proyectos/{proyecto_id}/estadisticas", None, 200),
+    ("PUT", "/proyectos/proyectos/{proyecto_id}"): (
+        "/proyectos/proyectos/{proyecto_id}", lambda d: {"json": {"nombre": "editado"}}, 200),
+    ("DELETE", "/proyectos/proyectos/{proyecto_id}"): ("/proyectos/proyectos/{proyecto_id}", None, 204),
+
+    ("POST", "/historias-usuario/historias-usuario/"): (
+        "/historias-usuario/historias-usuario/",
+        lambda d: {"json": {"titulo": "otra", "proyecto_id": d["proyecto_id"]}}, 201),
+    ("POST", "/historias-usuario/historias-usuario/bulk"): (
+        "/historias-usuario/historias-usuario/bulk",
+        lambda d: {"json": {"items": [{"titulo": f"otra {i}", "proyecto_id": d["proyecto_id"]} for i in range(3)]}},
+        200),
+    ("GET", "/historias-usuario/historias-usuario/proyecto/{proyecto_id}"): (
+        "/historias-usuario/historias-usuario/proyecto/{proyecto_id}", None, 200),
+    ("GET", "/historias-usuario/historias-usuario/buscar"): (
+        "/historias-usuario/historias-usuario/buscar?q=historia", None, 200),
+    ("GET", "/historias-usuario/historias-usuario/{historia_id}"): (
+        "/historias-usuario/historias-usuario/{historia_id}", None, 200),
+    ("GET", "/historias-usuario/historias-usuario/{historia_id}/estadisticas"): (
+        "/historias-usuario/historias-usuario/{historia_id}/estadisticas", None, 200),
+    ("PUT", "/historias-usuario/historias-usuario/{historia_id}"): (
+        "/historias-usuario/historias-usuario/{historia_id}", lambda d: {"json": {"titulo": "editada"}}, 200),
+    ("DELETE", "/historias-usuario/historias-usuario/{historia_id}"): (
+        "/historias-usuario/historias-usuario/{historia_id}", None, 204),
+
+    ("POST", "/tickets/tickets/"): (
+        "/tickets/tickets/", lambda d: {"json": {"asunto": "otro", "historia_usuario_id": d["historia_id"]}}, 201),
+    ("GET", "/tickets/tickets/"): ("/tickets/tickets/", None, 200),
+    ("POST", "/tickets/tickets/bulk"): (
+        "/tickets/tickets/bulk",
+        lambda d: {"json": {"items": [{"asunto": f"otro {i}", "historia_usuario_id": d["historia_id"]} for i in range(3)]}},
+        200),
+    ("PATCH", "/tickets/tickets/estado"): (
+        "/tickets/tickets/estado",
+        lambda d: {"json": {"estado": "cerrado", "historia_usuario_id": d["historia_id"]}}, 200),
+    ("GET", "/tickets/tickets/historia/{historia_usuario_id}"): (
+        "/tickets/tickets/historia/{historia_id}", None, 200),
+    ("GET", "/tickets/tickets/buscar"): ("/tickets/tickets/buscar?q=ticket", None, 200),
+    ("GET", "/tickets/tickets/{ticket_id}"): ("/tickets/tickets/{ticket_id}", None, 200),
+    ("DELETE", "/tickets/tickets/{ticket_id}"): ("/tickets/tickets/{ticket_id}", None, 204),
+    ("PUT", "/tickets/tickets/{ticket_id}"): (
+        "/tickets/tickets/{ticket_id}", lambda d: {"json": {"asunto": "editado", "estado": "en_progreso"}}, 200),
+    ("PATCH", "/tickets/tickets/{ticket_id}/estado"): (
+        "/tickets/tickets/{ticket_id}/estado", lambda d: {"json": {"estado": "cerrado"}}, 200),
+
+    ("POST", "/importaciones/"): ("/importaciones/", _importacion, 200),
+    ("GET", "/importaciones/{importacion_id}"): ("/importaciones/{importacion_id}", None, 200),
+    ("GET", "/importaciones/{importacion_id}/errores"): ("/importaciones/{importacion_id}/errores", None, 200),
+
+    ("GET", "/metricas/pool"): ("/metricas/pool", None, 200),
+    ("GET", "/metricas/cache-actores"): ("/metricas/cache-actores", None, 200),
+    ("GET", "/metricas/passwords"): ("/metricas/passwords", None, 200),
+    ("GET", "/metricas/cache-respuestas"): ("/metricas/cache-respuestas", None, 200),
+    ("GET", "/metricas/consultas"): ("/metricas/consultas", lambda d: {"headers": METRICAS}, 200),
+}
+
+
+@pytest.fixture
+def datos(api):
+    """Empresa con datos, un usuario y una importación; una nueva por test (las rutas DELETE los consumen)."""
+    empresa = registrar_empresa(api)
+    datos = sembrar(api, empresa["headers"], historias=2, tickets_por_historia=2)
+    usuario = {"email": f"usuario{empresa['id']}@tests.com", "password": "secreto-123"}
+    esperar(api.post("/usuarios/", json={"nombre": "Usuario", "empresa_id": empresa["id"], **usuario}), 201)
+    progreso = api.client.post("/importaciones/", **_importacion(None), headers=empresa["headers"])
+    importacion = json.loads(progreso.text.splitlines()[-1])
+    return {
+        **datos,
+        "empresa_id": empresa["id"],
+        "credenciales": empresa["credenciales"],
+        "usuario": usuario,
+        "importacion_id": importacion["id"],
+    }
+
+
+def test_todas_las_rutas_tienen_llamada(app):
+    rutas = {(metodo, ruta.path) for ruta in app.routes if isinstance(ruta, APIRoute) for metodo in ruta.methods}
+    assert rutas == set(LLAMADAS)
+
+
+@pytest.mark.parametrize("metodo,ruta", list(LLAMADAS), ids=[f"{m} {r}" for m, r in LLAMADAS])
+def test_ruta_dentro_del_presupuesto(api, datos, metodo, ruta):
+    concreta, argumentos, codigo = LLAMADAS[metodo, ruta]
+    argumentos = argumentos(datos) if argumentos else {}
+    headers = {**datos["headers"], **argumentos.pop("headers", {})}
+    respuesta = api.client.request(metodo, concreta.format(**datos), headers=headers, **argumentos)
+    assert respuesta.status_code == codigo, (respuesta.status_code, respuesta.text)
+
+
+# --- Logins con rehash: el costo de bcrypt guardado difiere de BCRYPT_ROUNDS ---
+
+def _hash_con_otro_costo(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=5)).decode()
+
+
+def _guardar_hash(modelo, columna: str, fila_id: int, valor: str):
+    from sqlalchemy import update
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        db.execute(update(modelo).where(modelo.id == fila_id).values({columna: valor}))
+        db.commit()
+
+
+def _leer_hash(modelo, columna: str, fila_id: int) -> str:
+    from sqlalchemy import select
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        return db.scalar(select(getattr(modelo, columna)).where(modelo.id == fila_id))
+
+
+def test_login_empresa_con_rehash(api, datos):
+    from app.models.empresa import Empresa
+
+    _guardar_hash(Empresa, "hashed_password", datos["empresa_id"], _hash_con_otro_costo("secreto-123"))
+    esperar(api.post("/auth/login", json=datos["credenciales"]))
+    assert _leer_hash(Empresa, "hashed_password", datos["empresa_id"]).startswith("$2b$04$")
+
+
+def test_login_usuario_con_rehash(api, datos):
+    from sqlalchemy import select
+    from app.db.session import SessionLocal
+    from app.models.usuario import Usuario
+
+    with SessionLocal() as db:
+        usuario_id = db.scalar(select(Usuario.id).where(Usuario.email == datos["usuario"]["email"]))
+    _guardar_hash(Usuario, "password_hash", usuario_id, _hash_con_otro_costo("secreto-123"))
+    esperar(api.post("/usuarios/login", json=datos["usuario"]))
+    assert _leer_hash(Usuario, "password_hash", usuario_id).startswith("$2b$04$")
+
+
+# --- /metricas/consultas expone SQL: solo con el token interno ---
+
+@pytest.mark.parametrize("headers", [{}, {"X-Metricas-Token": "otro"}], ids=["sin token", "token incorrecto"])
+def test_metricas_consultas_requiere_token(api, datos, headers):
+    respuesta = api.get("/metricas/consultas", headers={**datos["headers"], **headers})
+    assert respuesta.status_code == 403
@@ -0,0 +1,23 @@
+"""Tablero: historias y tickets se leen por separado y se recorren a la vez."""
+from functools import partial
+
+from conftest import esperar, sembrar
+
+
+def test_tickets_de_una_historia_desconocida_no_cortan_el_tablero(api, nueva_empresa, monkeypatch):
+    from app.services import tablero
+
+    datos = sembrar(api, nueva_empresa(), historias=3, tickets_por_historia=3)
+    ruta = f"/proyectos/{datos['proyecto_id']}/tablero"
+    completo = esperar(api.get(ruta, headers=datos["headers"]))
+
+    # La primera historia no está en la lista leída (como si hubiera llegado al
+    # proyecto después), pero sus tickets sí aparecen en las páginas de tickets
+    historias_del_proyecto = tablero.historias_del_proyecto
+    monkeypatch.setattr(tablero, "historias_del_proyecto", lambda *args: historias_del_proyecto(*args)[1:])
+    # Bloques chicos: la historia desconocida ocupa más de una página
+    monkeypatch.setattr(tablero, "bloque_tickets_del_proyecto", partial(tablero.bloque_tickets_del_proyecto, limite=2))
+
+    parcial = esperar(api.get(ruta, headers=datos["headers"]))
+    assert parcial["historias"] == completo["historias"][1:]
+    assert all(len(historia["tickets"]) == 3 for historia in parcial["historias"])